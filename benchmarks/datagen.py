@@ -0,0 +1,71 @@
+"""Synthetic name/score/grade datasets for benchmarks.
+
+Usage: python -m benchmarks.datagen OUT.csv [--rows 1000000] [--width 0] [--cardinality 1000] [--seed 0]
+"""
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), '.data')
+CHUNK_ROWS = 1_000_000
+
+
+def make_frame(rows: int, width: int = 0, cardinality: int = 1000, seed: int = 0) -> pd.DataFrame:
+    """``name`` (``cardinality`` distinct strings), ``score`` (int 0-100), ``grade`` (A/B/C from score)
+    and ``width`` extra numeric columns ``f0``.. alternating int and float."""
+    rng = np.random.default_rng(seed)
+    score = rng.integers(0, 101, rows)
+    names = np.array([f"name{i}" for i in range(cardinality)], dtype=object)
+    columns = {
+        'name': names[rng.integers(0, cardinality, rows)],
+        'score': score,
+        'grade': np.select([score >= 90, score >= 80], ['A', 'B'], default='C'),
+    }
+    for i in range(width):
+        columns[f"f{i}"] = rng.integers(0, 1_000_000, rows) if i % 2 == 0 else rng.random(rows)
+    return pd.DataFrame(columns)
+
+
+def write_csv(path: str, rows: int, width: int = 0, cardinality: int = 1000, seed: int = 0,
+              chunk_rows: int = CHUNK_ROWS) -> str:
+    """Write a dataset of ``rows`` rows to ``path`` in chunks, so sizes up to tens of millions of rows fit in memory."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    chunk_seed = seed
+    with open(tmp_path, 'w', newline='') as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            make_frame(n, width, cardinality, chunk_seed).to_csv(f, index=False, header=written == 0)
+            written += n
+            chunk_seed += 1
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset(rows: int, width: int = 0, cardinality: int = 1000, seed: int = 0,
+            data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """Path of a generated CSV with these parameters, generating it on first use."""
+    path = os.path.join(data_dir, f"bench_r{rows}_w{width}_c{cardinality}_s{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} rows into {path}")
+        write_csv(path, rows, width, cardinality, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--width', type=int, default=0, help='Extra numeric columns')
+    parser.add_argument('--cardinality', type=int, default=1000, help='Distinct names')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.width, args.cardinality, args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
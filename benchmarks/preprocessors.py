@@ -0,0 +1,92 @@
+"""Per-row throughput of the shipped preprocessors, before and after vectorization.
+
+Usage: python -m benchmarks.preprocessors [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.preprocessors.double_score_preprocessor import DoubleScorePreprocessor
+from shared.preprocessors.score_to_letter_preprocessor import ScoreToLetterPreprocessor
+from shared.preprocessors.uppercase_name_preprocessor import UppercaseNamePreprocessor
+
+
+# Previous implementations: full frame copy plus per-element Python callbacks
+def legacy_double_score(data):
+    data = data.copy()
+    data['score'] = data['score'] * 2
+    return data
+
+def legacy_uppercase_name(data):
+    data = data.copy()
+    data['name'] = data['name'].str.upper()
+    return data
+
+def legacy_score_to_letter(data):
+    data = data.copy()
+    def grade(s):
+        if s >= 90:
+            return 'A'
+        elif s >= 80:
+            return 'B'
+        else:
+            return 'C'
+    data['grade'] = data['score'].apply(grade)
+    return data
+
+
+CASES = [
+    ('DoubleScorePreprocessor', legacy_double_score, DoubleScorePreprocessor().process),
+    ('UppercaseNamePreprocessor', legacy_uppercase_name, UppercaseNamePreprocessor().process),
+    ('ScoreToLetterPreprocessor', legacy_score_to_letter, ScoreToLetterPreprocessor().process),
+]
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'name': pd.Series(rng.integers(0, 1000, rows)).map('name{}'.format),
+        'score': rng.integers(0, 101, rows),
+    })
+
+
+def best_time(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(rows, repeat):
+    df = make_frame(rows)
+    results = []
+    for name, before, after in CASES:
+        pd.testing.assert_frame_equal(before(df), after(df), check_dtype=False)
+        t_before = best_time(before, df, repeat)
+        t_after = best_time(after, df, repeat)
+        results.append({
+            'preprocessor': name,
+            'rows': rows,
+            'before_rows_per_sec': rows / t_before,
+            'after_rows_per_sec': rows / t_after,
+            'speedup': t_before / t_after,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'preprocessor':<28}{'before rows/s':>16}{'after rows/s':>16}{'speedup':>10}")
+    for r in run(args.rows, args.repeat):
+        print(f"{r['preprocessor']:<28}{r['before_rows_per_sec']:>16,.0f}{r['after_rows_per_sec']:>16,.0f}{r['speedup']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Sketch-based models against the exact pandas answers: time, peak memory and error.
+
+Usage: python -m benchmarks.sketches [--rows 1000000] [--cardinality 100000] [--chunksize 100000]
+                                     [--repeat 3] [--error 0.01] [--output results.json]
+"""
+import os
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datagen import make_frame
+from common.src.dataloader.batching import iter_batches
+from common.src.model.sketches import HyperLogLog, KLLSketch, SpaceSaving
+
+QUANTILES = [0.01, 0.1, 0.5, 0.9, 0.99]
+TOP_K = 10
+
+
+def _sketch(make, column: pd.Series, chunksize: int):
+    """Fold ``column`` chunk by chunk into one sketch, as streaming runs and workers do."""
+    sketch = make()
+    for chunk in iter_batches(column, chunksize):
+        sketch = sketch.merge(make().update(chunk))
+    return sketch
+
+
+def rank_error(sorted_values: np.ndarray, estimates, qs) -> float:
+    """Largest distance between the requested and the actual rank of the estimated quantiles."""
+    n = len(sorted_values)
+    errors = []
+    for q, estimate in zip(qs, estimates):
+        low = np.searchsorted(sorted_values, estimate, side='left') / n
+        high = np.searchsorted(sorted_values, estimate, side='right') / n
+        errors.append(0.0 if low <= q <= high else min(abs(q - low), abs(q - high)))
+    return max(errors)
+
+
+def build_cases(frame: pd.DataFrame, chunksize: int, error: float):
+    """(name, exact, approximate, error of an approximate answer against the exact one) per sketch."""
+    score = frame['score'].astype(np.float64) + np.random.default_rng(0).random(len(frame))
+    name = frame['name']
+    sorted_score = np.sort(score.to_numpy())
+    top_error = min(error, 1 / (10 * TOP_K))
+    return [
+        ('quantiles/KLLSketch', lambda: score.quantile(QUANTILES).tolist(),
+         lambda: _sketch(lambda: KLLSketch(error), score, chunksize).quantiles(QUANTILES),
+         lambda exact, approx: rank_error(sorted_score, approx, QUANTILES)),
+        ('distinct/HyperLogLog', lambda: name.nunique(),
+         lambda: _sketch(lambda: HyperLogLog(error), name, chunksize).count(),
+         lambda exact, approx: abs(approx - exact) / exact),
+        ('top_k/SpaceSaving', lambda: name.value_counts().head(TOP_K),
+         lambda: _sketch(lambda: SpaceSaving(top_error), name, chunksize).top(TOP_K),
+         # Overcount of the reported values, relative to the row count
+         lambda exact, approx: float((approx['count'].to_numpy()
+                                      - name.value_counts().reindex(approx['value']).fillna(0).to_numpy()).max()
+                                     / len(name))),
+    ]
+
+
+def measure(fn, repeat: int):
+    """Result, best wall time over ``repeat`` runs and the peak traced allocation of one extra run (MB)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, min(timings), peak / 1024 ** 2
+
+
+def run(rows: int, cardinality: int = 100_000, chunksize: int = 100_000, repeat: int = 3,
+        error: float = 0.01, seed: int = 0) -> dict:
+    frame = make_frame(rows, cardinality=cardinality, seed=seed)
+    results = []
+    for name, exact_fn, approx_fn, error_fn in build_cases(frame, chunksize, error):
+        exact, exact_s, exact_mb = measure(exact_fn, repeat)
+        approx, approx_s, approx_mb = measure(approx_fn, repeat)
+        results.append({'name': name, 'rows': rows, 'exact_seconds': exact_s, 'sketch_seconds': approx_s,
+                        'exact_peak_mem_mb': exact_mb, 'sketch_peak_mem_mb': approx_mb,
+                        'error': error_fn(exact, approx)})
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows, 'cardinality': cardinality, 'chunksize': chunksize, 'repeat': repeat,
+            'error': error, 'seed': seed,
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--cardinality', type=int, default=100_000, help='Distinct names')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per sketched chunk')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--error', type=float, default=0.01, help='Error bound the sketches are built for')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None, help='Write results as JSON')
+    args = parser.parse_args()
+    results = run(args.rows, args.cardinality, args.chunksize, args.repeat, args.error, args.seed)
+    print(f"{'benchmark':<24}{'exact s':>10}{'sketch s':>10}{'exact MB':>10}{'sketch MB':>11}{'error':>10}")
+    for r in results['results']:
+        print(f"{r['name']:<24}{r['exact_seconds']:>10.3f}{r['sketch_seconds']:>10.3f}"
+              f"{r['exact_peak_mem_mb']:>10.1f}{r['sketch_peak_mem_mb']:>11.1f}{r['error']:>10.4f}")
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Cold-start benchmarks for the entrypoint and the run path, with JSON results and baseline comparison.
+
+Usage:
+    python -m benchmarks.startup run [--repeat 5] [--config CONFIG] [--output startup.json]
+    python -m benchmarks.startup compare BASELINE.json CURRENT.json [--threshold 0.2]
+
+Every case runs in a fresh interpreter. ``run`` exits non-zero when a command
+that should start light (``--help``, ``--check-config``) imports pandas,
+numpy or pydantic.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join('pipelines', 'test_pipeline', 'test_config_1.yml')
+DEFAULT_THRESHOLD = 0.2
+# Differences below this are interpreter noise
+MIN_CHANGE_MS = 20.0
+HEAVY_MODULES = ('pandas', 'numpy', 'pydantic')
+
+_RESOLVE = """
+import sys, yaml
+from common.src.workflow.registry import import_class
+with open(sys.argv[1]) as f:
+    config = yaml.safe_load(f)
+paths = [conf['class'] for conf in config.get('preprocessors') or []]
+paths += [config[section]['class'] for section in ('dataloader', 'model', 'evaluator')]
+for path in paths:
+    import_class(path)
+"""
+
+
+def build_cases(config: str) -> List[Tuple[str, List[str], bool]]:
+    """(name, interpreter arguments, must stay light) for each benchmark."""
+    return [
+        ('entrypoint/help', ['entrypoint.py', '--help'], True),
+        ('entrypoint/check_config', ['entrypoint.py', '--check-config', '--config', config], True),
+        ('import/registry', ['-c', 'import common.src.workflow.registry'], True),
+        ('import/orchestrator', ['-c', 'import common.src.workflow.orchestrator'], False),
+        ('resolve_components', ['-c', _RESOLVE, config], False),
+    ]
+
+
+def _run(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if done.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{done.stderr[-2000:]}")
+    return seconds, done.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds of each top-level import from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented beyond the single leading space
+        if name.startswith('  '):
+            continue
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure(args: List[str], repeat: int) -> dict:
+    """Best wall time over ``repeat`` runs, plus one ``-X importtime`` run's import total and heavy imports."""
+    timings = [_run(args)[0] for _ in range(repeat)]
+    _, stderr = _run(args, importtime=True)
+    imported = {line.split('|')[-1].strip() for line in stderr.splitlines() if line.startswith('import time:')}
+    top_level = parse_importtime(stderr)
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:5]
+    return {'ms': min(timings) * 1000, 'import_ms': sum(top_level.values()) / 1000,
+            'heavy_imports': sorted(name for name in HEAVY_MODULES if name in imported),
+            'slowest_imports': [{'module': name, 'ms': us / 1000} for name, us in slowest]}
+
+
+def run(repeat: int = 5, config: str = DEFAULT_CONFIG) -> dict:
+    results = []
+    for name, args, light in build_cases(config):
+        result = measure(args, repeat)
+        result.update(name=name, light=light)
+        results.append(result)
+        heavy = f"  imports {', '.join(result['heavy_imports'])}" if result['heavy_imports'] else ""
+        print(f"{name:<32}{result['ms']:>10.1f} ms{result['import_ms']:>10.1f} ms in imports{heavy}")
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'repeat': repeat, 'config': config,
+            'python': platform.python_version(), 'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def violations(results: dict) -> List[str]:
+    """Light cases that imported a heavy module."""
+    return [f"{r['name']} imports {', '.join(r['heavy_imports'])}"
+            for r in results['results'] if r['light'] and r['heavy_imports']]
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Per-case change against ``baseline``; start-up slower by more than ``threshold`` is a regression."""
+    base = {r['name']: r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        b = base.get(r['name'])
+        if b is None or not b['ms']:
+            continue
+        change = r['ms'] / b['ms'] - 1
+        slower = change > threshold and r['ms'] - b['ms'] > MIN_CHANGE_MS
+        rows.append({'name': r['name'], 'time_change': change,
+                     'regression': slower or bool(r['light'] and r['heavy_imports'])})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--config', type=str, default=DEFAULT_CONFIG, help='Config to check and resolve')
+    run_parser.add_argument('--output', type=str, default=None, help='Write results as JSON')
+    compare_parser = sub.add_parser('compare', help='Compare results against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Relative slowdown counted as a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(args.repeat, args.config)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {args.output}")
+        problems = violations(results)
+        for problem in problems:
+            print(f"Start-up regression: {problem}")
+        sys.exit(1 if problems else 0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<32}{row['time_change']:>+10.1%}  {flag}")
+    sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
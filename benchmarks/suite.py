@@ -0,0 +1,196 @@
+"""Repeatable benchmarks for every pipeline stage, with JSON results and baseline comparison.
+
+Usage:
+    python -m benchmarks.suite run [--rows 100000] [--width 0] [--cardinality 1000] [--repeat 3]
+                                   [--only PATTERN] [--output results.json]
+    python -m benchmarks.suite compare BASELINE.json CURRENT.json [--threshold 0.1]
+"""
+import os
+import sys
+import json
+import time
+import fnmatch
+import pkgutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from importlib import import_module
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import shared.models
+import shared.preprocessors
+from benchmarks.datagen import dataset
+from common.src.model.base_model import BaseModel
+from common.src.model.fused_model import FusedModel
+from common.src.preprocessor.base_preprocessor import BasePreprocessor
+from common.src.schema_utils import generate_io_models_from_dataloader as gimfd
+from common.src.schema_utils.bulk_validation import validate_bulk
+from common.src.schema_utils.yaml_validator import load_schema
+from shared.dataloaders.my_csv_dataloader import MyCsvDataloader
+
+DEFAULT_THRESHOLD = 0.1
+# Memory changes smaller than this are noise for the tiny allocations of cheap stages
+MIN_MEMORY_CHANGE_MB = 1.0
+
+
+def _subclasses(package, base) -> List[type]:
+    """Concrete ``base`` subclasses defined in the modules of ``package``."""
+    found = []
+    for info in pkgutil.iter_modules(package.__path__):
+        module = import_module(f"{package.__name__}.{info.name}")
+        for value in vars(module).values():
+            if isinstance(value, type) and issubclass(value, base) and value is not base \
+                    and value.__module__ == module.__name__:
+                found.append(value)
+    return sorted(found, key=lambda cls: cls.__name__)
+
+
+def build_cases(csv_path: str, frame: pd.DataFrame, workdir: str) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, zero-argument callable) for each benchmark; each call processes ``len(frame)`` rows."""
+    cases = []
+
+    def load():
+        MyCsvDataloader(filepath=csv_path).load_data('train')
+    cases.append(('load/MyCsvDataloader', load))
+
+    for cls in _subclasses(shared.preprocessors, BasePreprocessor):
+        cases.append((f"preprocess/{cls.__name__}", lambda p=cls(): p.process(frame)))
+
+    holder = MyCsvDataloader(filepath=csv_path)
+    holder.data = frame
+    for cls in _subclasses(shared.models, BaseModel):
+        def train_predict(model=cls(holder, split='train')):
+            model._train()
+            return model._predict()
+        cases.append((f"model/{cls.__name__}", train_predict))
+    # Every shared model at once, computed in one pass
+    fused = FusedModel(holder, models=[{'class': f"{cls.__module__}.{cls.__name__}"}
+                                       for cls in _subclasses(shared.models, BaseModel)])
+    cases.append(('model/FusedModel', lambda: (fused._train(), fused._predict())))
+
+    schema_path = os.path.join(workdir, 'MyCsvDataloader.yaml')
+    gimfd.generate_yaml_schema_from_df(frame, 'MyCsvDataloader', schema_path)
+    schema = load_schema(schema_path, 'MyCsvDataloader')
+    cases.append(('validate_dataframe_with_yaml', lambda: schema.check(frame)))
+    output_model = gimfd.generate_pydantic_model_from_df(frame, 'MyCsvDataloader')
+    cases.append(('validate_output', lambda: validate_bulk(frame, output_model)))
+
+    generated_path = os.path.join(workdir, 'generated', 'MyCsvDataloader.yaml')
+    os.makedirs(os.path.dirname(generated_path), exist_ok=True)
+
+    def generate_schema():
+        gimfd.generate_io_models_from_dataloader('shared.dataloaders.my_csv_dataloader', 'MyCsvDataloader',
+                                                 {'filepath': csv_path}, generated_path)
+    cases.append(('schema_generation', generate_schema))
+    return cases
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """Best wall time over ``repeat`` runs, and the peak traced allocation of one extra run (MB)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    # Traced separately: tracemalloc slows the code it traces
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak / 1024 ** 2
+
+
+def run(rows: int, width: int = 0, cardinality: int = 1000, repeat: int = 3, only: Optional[str] = None,
+        seed: int = 0) -> dict:
+    csv_path = dataset(rows, width, cardinality, seed)
+    loader = MyCsvDataloader(filepath=csv_path)
+    loader.load_data('train')
+    frame = loader.data
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn in build_cases(csv_path, frame, workdir):
+            if only and not fnmatch.fnmatch(name, only):
+                continue
+            seconds, peak_mb = measure(fn, repeat)
+            results.append({'name': name, 'rows': rows, 'seconds': seconds,
+                            'rows_per_sec': rows / seconds if seconds > 0 else None, 'peak_mem_mb': peak_mb})
+            print(f"{name:<40}{rows / seconds:>16,.0f} rows/s{peak_mb:>12.1f} MB")
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows, 'width': width, 'cardinality': cardinality, 'repeat': repeat, 'seed': seed,
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Per-benchmark change against ``baseline``; throughput drops or memory growth beyond ``threshold`` are regressions."""
+    base = {r['name']: r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        b = base.get(r['name'])
+        if b is None or not b.get('rows_per_sec') or not r.get('rows_per_sec'):
+            continue
+        speed = r['rows_per_sec'] / b['rows_per_sec'] - 1
+        memory = r['peak_mem_mb'] / b['peak_mem_mb'] - 1 if b['peak_mem_mb'] else 0.0
+        memory_grew = memory > threshold and r['peak_mem_mb'] - b['peak_mem_mb'] > MIN_MEMORY_CHANGE_MB
+        rows.append({'name': r['name'], 'throughput_change': speed, 'memory_change': memory,
+                     'regression': speed < -threshold or memory_grew})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('--rows', type=int, default=100_000)
+    run_parser.add_argument('--width', type=int, default=0, help='Extra numeric columns')
+    run_parser.add_argument('--cardinality', type=int, default=1000, help='Distinct names')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--only', type=str, default=None, help="Glob over benchmark names, e.g. 'model/*'")
+    run_parser.add_argument('--output', type=str, default=None, help='Write results as JSON')
+    compare_parser = sub.add_parser('compare', help='Compare results against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='Relative change counted as a regression (default 0.1)')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.rows, args.width, args.cardinality, args.repeat, args.only, args.seed)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline['meta']['rows'] != current['meta']['rows']:
+        print(f"Warning: baseline has {baseline['meta']['rows']} rows, current {current['meta']['rows']}")
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':<40}{'throughput':>12}{'memory':>10}")
+    for r in rows:
+        flag = '  REGRESSION' if r['regression'] else ''
+        print(f"{r['name']:<40}{r['throughput_change']:>+11.1%}{r['memory_change']:>+10.1%}{flag}")
+    regressions = sum(r['regression'] for r in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
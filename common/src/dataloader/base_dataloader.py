@@ -1,35 +1,329 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional, Iterator, Any
+from typing import Callable, List, Optional, Iterator, Any
+
+from common.src.dataloader.batching import iter_batches, prefetch
+from common.src.workflow.instrumentation import count_rows, measure
 
 logger = logging.getLogger(__name__)
 
 class BaseDataloader(ABC):
+    # True when read_chunks can stream a split without materializing all of it
+    supports_streaming = False
+
     def __init__(self, preprocessors: Optional[List[Any]] = None):
         self.preprocessors = preprocessors or []
         self.data = None
+        # Dataset cache key of ``data``, and the SpilledFrame standing in for it once the memory budget spilled it
+        self._data_key = None
+        self._spilled_data = None
+        self.cache = None
+        self.cache_params = {}
+        self.preprocessors_key = None
+        self.stage_listeners: List[Callable[[str, Optional[int], Any], None]] = []
+        self.stage_cache = None
+        self.stage_keys = None
+        # Column projection and dtype pushdown (see set_projection)
+        self.columns: Optional[List[str]] = None
+        self.dtypes: dict = {}
+        self.optimize_dtypes = False
+        self.category_threshold = 0.5
+        # RunInstrumentation of the current run, if any (see common.src.workflow.instrumentation)
+        self.instrumentation = None
+        # Batch iteration settings (see setup and batch_iter)
+        self.batch_size: Optional[int] = None
+        self.shuffle = False
+        self.seed: Optional[int] = None
+        self.drop_last = False
+        self.prefetch = 0
+        self._epoch = 0
+        self._batches: Optional[Iterator] = None
+        # Runs under a memory budget turn these off so intermediates are not held past their last use;
+        # without keep_raw the raw split bypasses the dataset cache
+        self.keep_stage_outputs = True
+        self.keep_raw = True
+
+    @property
+    def data(self) -> Any:
+        if self._spilled_data is not None:
+            # Spilled by the memory budget: every read maps it back from disk
+            return self._spilled_data.load()
+        return self._data
+
+    @data.setter
+    def data(self, value: Any):
+        self._data = value
+        self._spilled_data = None
+
+    def _data_spilled(self, key, spilled):
+        # Drop the in-memory frame, or spilling it would free nothing
+        if key == self._data_key:
+            self._data = None
+            self._spilled_data = spilled
 
     @abstractmethod
     def load_data(self, split: str) -> None:
         pass
 
+    def attach_cache(self, cache, params: Optional[dict] = None, preprocessors_key: Any = None):
+        """Share loaded data through a DatasetCache keyed by this class, params and split.
+
+        Raw data is cached separately from preprocessed data, so dataloaders
+        with the same class and params share one load even when their
+        preprocessor chains (identified by ``preprocessors_key``, e.g. the
+        preprocessors config) differ.
+        """
+        self.cache = cache
+        self.cache_params = params or {}
+        self.preprocessors_key = preprocessors_key
+
+    def set_projection(self, columns: Optional[List[str]] = None, dtypes: Optional[dict] = None,
+                       optimize: bool = False, category_threshold: float = 0.5):
+        """Ask the dataloader to read only ``columns`` (None = all) with the given ``dtypes``.
+
+        Implementations honour what they can (e.g. read_csv usecols/dtype) and
+        pass loaded frames through finalize_frame.
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.dtypes = dict(dtypes or {})
+        self.optimize_dtypes = optimize
+        self.category_threshold = category_threshold
+
+    def projection_key(self) -> dict:
+        return {'columns': self.columns, 'dtypes': self.dtypes, 'optimize': self.optimize_dtypes,
+                'category_threshold': self.category_threshold}
+
+    def finalize_frame(self, data: Any) -> Any:
+        """Apply the requested dtype optimizations to a freshly read frame or chunk."""
+        if not self.optimize_dtypes:
+            return data
+        from common.src.dataloader.projection import optimize_dtypes
+        return optimize_dtypes(data, self.category_threshold)
+
+    def attach_stage_cache(self, stage_cache, stage_keys):
+        """Persist raw and preprocessed outputs in a StageCache under keys from PipelineStageKeys."""
+        self.stage_cache = stage_cache
+        self.stage_keys = stage_keys
+
+    def fingerprint(self, split: str, content_hash: bool = False) -> Optional[dict]:
+        """Identify the source data of a split for the stage cache; None disables caching."""
+        return None
+
+    def add_stage_listener(self, listener: Callable[[str, Optional[int], Any], None]):
+        """Register ``listener(stage, index, data)``, called with the raw loader output
+        (stage 'dataloader', index None) and with each preprocessor's output
+        (stage 'preprocessor', index into the chain)."""
+        self.stage_listeners.append(listener)
+
+    def _emit(self, stage: str, index: Optional[int], data: Any):
+        if not self.stage_listeners:
+            return
+        # Time the listeners as a validation stage only when one of them (a
+        # stage validator) has a schema for this stage
+        if not any(getattr(listener, 'has_schema', None) and listener.has_schema(stage, index)
+                   for listener in self.stage_listeners):
+            for listener in self.stage_listeners:
+                listener(stage, index, data)
+            return
+        name = stage if index is None else f"{stage}:{index}"
+        with measure(self.instrumentation, 'validation', name, rows_in=count_rows(data)):
+            for listener in self.stage_listeners:
+                listener(stage, index, data)
+
+    def preprocess(self, data: Any, start: int = 0, keys: Optional[List[str]] = None) -> Any:
+        """Apply the preprocessor chain once to freshly loaded data.
+
+        Each stage's output is kept on the preprocessor as ``output_data``
+        unless ``keep_stage_outputs`` is off.
+        Preprocessors replace only the columns they change (see
+        BasePreprocessor.with_columns), so the recorded outputs share all
+        untouched columns instead of each holding a full copy.
+
+        ``start`` skips preprocessors whose output was restored from the stage
+        cache; with ``keys``, each new output is written to the stage cache.
+        """
+        if start == 0:
+            self._emit('dataloader', None, data)
+        for idx in range(start, len(self.preprocessors)):
+            preproc = self.preprocessors[idx]
+            with measure(self.instrumentation, 'preprocess', type(preproc).__name__,
+                         rows_in=count_rows(data)) as record:
+                data = preproc.process(data)
+                record.rows_out = count_rows(data)
+            if self.keep_stage_outputs:
+                preproc.output_data = data
+            self._emit('preprocessor', idx, data)
+            if keys:
+                self.stage_cache.put(keys[idx + 1], data)
+        return data
+
+    def _cache_key(self, split: str, preprocessed: bool):
+        # The source fingerprint keeps long-lived caches from serving stale data
+        params = dict(self.cache_params, projection=self.projection_key(), source=self.fingerprint(split))
+        if preprocessed:
+            params['preprocessing'] = self.preprocessors_key
+        return self.cache.make_key(type(self), params, split)
+
+    def _read_raw(self, split: str, keys: Optional[List[str]]) -> Any:
+        if keys:
+            hit, data = self.stage_cache.get(keys[0], 0)
+            if hit:
+                print(f"Restored {split} data from stage cache (stage 0)")
+                return data
+        with measure(self.instrumentation, 'load', type(self).__name__) as record:
+            self.load_data(split)
+            record.rows_out = count_rows(self.data)
+        if keys:
+            self.stage_cache.put(keys[0], self.data)
+        return self.data
+
+    def _load_raw(self, split: str, keys: Optional[List[str]]) -> Any:
+        if self.cache is None or not self.preprocessors or not self.keep_raw:
+            return self._read_raw(split, keys)
+        return self.cache.get_or_load(self._cache_key(split, preprocessed=False),
+                                      lambda: self._read_raw(split, keys), label=self._label(split, 'raw'))
+
+    def _label(self, split: str, stage: str) -> str:
+        return f"{type(self).__name__} {split} {stage}"
+
+    def _load_and_preprocess(self, split: str) -> Any:
+        keys = self.stage_keys.data_keys(split) if self.stage_cache is not None else None
+        if keys:
+            # Resume after the deepest preprocessor whose output is already on disk
+            for depth in range(len(keys) - 1, 0, -1):
+                hit, data = self.stage_cache.get(keys[depth], depth)
+                if hit:
+                    print(f"Restored {split} data from stage cache (stage {depth})")
+                    self.data = self.preprocess(data, start=depth, keys=keys)
+                    return self.data
+        self.data = self.preprocess(self._load_raw(split, keys), keys=keys)
+        return self.data
+
+    def load_raw(self, split: str) -> Any:
+        """Load a split without preprocessing (through the stage and dataset caches), e.g. to hand it to workers."""
+        keys = self.stage_keys.data_keys(split) if self.stage_cache is not None else None
+        return self._load_raw(split, keys)
+
+    def load(self, split: str) -> Any:
+        """Load and preprocess a split, reusing the attached cache when possible, and return the data."""
+        if self.cache is None:
+            return self._load_and_preprocess(split)
+        key = self._cache_key(split, preprocessed=bool(self.preprocessors))
+        self.data, self._data_key = None, key
+        data = self.cache.get_or_load(key, lambda: self._load_and_preprocess(split),
+                                      label=self._label(split, 'preprocessed' if self.preprocessors else 'raw'),
+                                      on_spill=self._data_spilled)
+        if self._spilled_data is None:
+            self.data = data
+        return data
+
+    def release(self, split: str, reason: str = 'not needed downstream'):
+        """Drop this run's loaded ``split`` once nothing later reads it; unlike invalidate, other splits stay cached."""
+        if self.cache is not None:
+            self.cache.release(self._cache_key(split, preprocessed=bool(self.preprocessors)), reason)
+        self.data, self._data_key = None, None
+        self._batches = None
+
+    def invalidate(self, split: Optional[str] = None):
+        """Forget cached data for this dataloader (one split, or all of them)."""
+        if self.cache is not None:
+            self.cache.invalidate(type(self), split)
+        self.data, self._data_key = None, None
+        self._batches = None
+
     def __iter__(self) -> Iterator:
+        """Batches of ``batch_size`` rows as configured by setup; without a batch size, iterate the data itself."""
         if self.data is None:
             raise ValueError("Data not loaded. Call load_data(split) first.")
-        return iter(self.data)
+        if self.batch_size is None:
+            return iter(self.data)
+        return self.batch_iter()
 
     def __next__(self):
-        if self.data is None:
-            raise ValueError("Data not loaded. Call load_data(split) first.")
-        return next(self.data)
+        """The next batch of the current pass; a new pass (epoch) starts after StopIteration."""
+        if self._batches is None:
+            self._batches = iter(self)
+        try:
+            return next(self._batches)
+        except StopIteration:
+            self._batches = None
+            raise
+
+    def read_chunks(self, split: str, chunksize: int) -> Iterator:
+        """Yield raw (not yet preprocessed) chunks; implemented by streaming dataloaders."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def _read_chunks_measured(self, split: str, chunksize: int) -> Iterator:
+        chunks = self.read_chunks(split, chunksize)
+        while True:
+            with measure(self.instrumentation, 'load', type(self).__name__) as record:
+                chunk = next(chunks, None)
+                record.rows_out = count_rows(chunk)
+                record.discard = chunk is None
+            if chunk is None:
+                return
+            yield chunk
+
+    def iter_chunks(self, split: str, chunksize: int, prefetch_depth: int = 0) -> Iterator:
+        """Yield the preprocessed split in chunks of at most ``chunksize`` rows.
+
+        Streaming dataloaders read incrementally through read_chunks; others
+        load the full split and slice it. With ``prefetch_depth``, streamed
+        chunks are read and preprocessed on a background thread, up to that
+        many chunks ahead of the consumer.
+        """
+        if self.supports_streaming:
+            yield from prefetch(self._read_chunks_measured(split, chunksize), prefetch_depth, self.preprocess)
+            return
+        yield from iter_batches(self.load(split), chunksize)
+
+    def partitions(self, split: str, partition_size: int) -> Optional[List[Any]]:
+        """Describe the split as picklable partitions of roughly ``partition_size`` bytes.
+
+        Returns None when the dataloader cannot be partitioned; otherwise each
+        item can be passed to load_partition in another process.
+        """
+        return None
+
+    def load_partition(self, partition: Any) -> Any:
+        """Load one raw (not yet preprocessed) partition."""
+        raise NotImplementedError(f"{type(self).__name__} does not support partitioned loading")
+
+    def partition_fingerprint(self, partition: Any, content_hash: bool = False) -> Optional[dict]:
+        """Identify the source data of one partition, so its partial result can be checkpointed; None disables it."""
+        return None
+
+    def batch_iter(self, batch_size: Optional[int] = None, shuffle: Optional[bool] = None,
+                   seed: Optional[int] = None, drop_last: Optional[bool] = None, prefetch_depth: Optional[int] = None,
+                   transform: Optional[Callable[[Any], Any]] = None) -> Iterator:
+        """Iterate the loaded data in batches of rows; unset arguments default to the setup values.
 
-    def batch_iter(self, batch_size: int) -> Iterator:
+        Batches are positional: in order they are views of the data, shuffled
+        they are gathered through a permutation index. A seeded shuffle is
+        reproducible and differs per pass (epoch). ``transform`` is applied to
+        every batch and, with ``prefetch_depth``, runs on a background thread
+        that prepares up to that many batches ahead.
+        """
         if self.data is None:
             raise ValueError("Data not loaded. Call load_data(split) first.")
-        for i in range(0, len(self.data), batch_size):
-            yield self.data[i:i+batch_size] 
+        batch_size = batch_size or self.batch_size or len(self.data) or 1
+        shuffle = self.shuffle if shuffle is None else shuffle
+        seed = self.seed if seed is None else seed
+        if shuffle and seed is not None:
+            seed = [seed, self._epoch]
+            self._epoch += 1
+        batches = iter_batches(self.data, batch_size, shuffle, seed, self.drop_last if drop_last is None else drop_last)
+        return prefetch(batches, self.prefetch if prefetch_depth is None else prefetch_depth, transform)
 
-    def setup(self, **kwargs):
+    def setup(self, split: Optional[str] = None, batch_size: Optional[int] = None, shuffle: bool = False,
+              seed: Optional[int] = None, drop_last: bool = False, prefetch: int = 0, **kwargs):
         """Optional setup method for dataloader. E.g., to set batch size, shuffle, etc before each stage"""
-        return
+        self.split = split
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        self.prefetch = prefetch
+        self._epoch = 0
+        self._batches = None
     
@@ -0,0 +1,148 @@
+import queue
+import logging
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH = 2
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def take_rows(data: Any, rows) -> Any:
+    """Rows of ``data`` by position: a slice stays a view, an index array gathers just those rows."""
+    if hasattr(data, 'iloc'):
+        return data.iloc[rows]
+    if isinstance(data, np.ndarray):
+        return data[rows]
+    if isinstance(rows, slice):
+        return data[rows]
+    return [data[i] for i in rows]
+
+
+def batch_positions(n: int, batch_size: int, shuffle: bool = False, seed: Any = None,
+                    drop_last: bool = False) -> Iterator:
+    """Row positions of each batch: slices in order, or slices of one seeded permutation when shuffling.
+
+    ``seed`` is anything numpy.random.default_rng accepts, e.g. ``[seed, epoch]``.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    order = np.random.default_rng(seed).permutation(n) if shuffle else None
+    stop = n - n % batch_size if drop_last else n
+    for start in range(0, stop, batch_size):
+        rows = slice(start, min(start + batch_size, n))
+        yield rows if order is None else order[rows]
+
+
+def iter_batches(data: Any, batch_size: int, shuffle: bool = False, seed: Any = None,
+                 drop_last: bool = False) -> Iterator:
+    """Batches of ``data`` by row position.
+
+    In order, each batch is a positional slice and shares memory with
+    ``data``. Shuffled, only the permutation index (8 bytes per row) is
+    allocated up front; each batch gathers its own rows when it is produced.
+    """
+    for rows in batch_positions(len(data), batch_size, shuffle, seed, drop_last):
+        yield take_rows(data, rows)
+
+
+class Prefetcher:
+    """Iterate ``source`` on a background thread, at most ``depth`` items ahead of the consumer.
+
+    ``transform`` (e.g. preprocessing) runs on the background thread too, so
+    the next batches are prepared while the current one is consumed. The
+    bounded queue caps memory at ``depth`` prepared items. Errors are raised
+    in the consumer; closing the iterator (or leaving a ``with`` block) early
+    stops the background thread.
+    """
+
+    def __init__(self, source: Iterable, depth: int = 2, transform: Optional[Callable[[Any], Any]] = None,
+                 name: str = 'prefetch'):
+        if depth < 1:
+            raise ValueError(f"Prefetch depth must be at least 1, got {depth}")
+        self._source = source
+        self._transform = transform
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self._started = False
+        self._finished = False
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            for item in self._source:
+                if self._transform is not None:
+                    item = self._transform(item)
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._put(_Failure(e))
+            return
+        finally:
+            close = getattr(self._source, 'close', None)
+            if close is not None and self._stop.is_set():
+                close()
+        self._put(_DONE)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        if not self._started:
+            self._started = True
+            self._thread.start()
+        item = self._queue.get()
+        if item is _DONE:
+            self._finished = True
+            self._thread.join()
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self._finished = True
+            self._thread.join()
+            raise item.error
+        return item
+
+    def close(self):
+        """Stop the background thread and drop the prefetched items."""
+        self._finished = True
+        self._stop.set()
+        if self._started:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self._stop.set()
+
+
+def prefetch(source: Iterable, depth: int = 0, transform: Optional[Callable[[Any], Any]] = None) -> Iterator:
+    """``source`` (with ``transform`` applied) prefetched ``depth`` items ahead; inline when depth is 0."""
+    if depth and depth > 0:
+        return Prefetcher(source, depth, transform)
+    if transform is None:
+        return iter(source)
+    return (transform(item) for item in source)
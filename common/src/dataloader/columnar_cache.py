@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLUMNAR_DIR = os.path.join('outputs', '.columnar_cache')
+FORMAT_VERSION = 1
+
+
+class ColumnarCache:
+    """Binary, column-per-file copy of CSV inputs for fast repeated loads.
+
+    A CSV is converted on first read into ``<dir>/<hash of path>/``: numeric
+    and bool columns as ``.npy`` files that are memory-mapped on load, string
+    columns dictionary-encoded (int32 codes plus a JSON list of values). The
+    conversion is redone automatically when the source size or mtime changes,
+    and only the requested columns are read.
+    """
+
+    def __init__(self, directory: str = DEFAULT_COLUMNAR_DIR):
+        self.directory = directory
+
+    def _entry_dir(self, csv_path: str) -> str:
+        digest = hashlib.sha256(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, digest)
+
+    @staticmethod
+    def _source_info(csv_path: str) -> dict:
+        stat = os.stat(csv_path)
+        return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _read_meta(self, csv_path: str) -> Optional[dict]:
+        meta_path = os.path.join(self._entry_dir(csv_path), 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION or meta.get('source') != self._source_info(csv_path):
+            return None
+        return meta
+
+    def is_fresh(self, csv_path: str) -> bool:
+        return self._read_meta(csv_path) is not None
+
+    def write(self, csv_path: str, df: pd.DataFrame):
+        """Store ``df`` (the parsed content of ``csv_path``) in columnar form."""
+        entry_dir = self._entry_dir(csv_path)
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            entry = {'name': col, 'dtype': str(series.dtype), 'file': f"{i}.npy"}
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                entry['kind'] = 'array'
+                np.save(os.path.join(tmp_dir, entry['file']), series.to_numpy())
+            else:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                if all(isinstance(u, str) for u in uniques):
+                    entry['kind'] = 'dictionary'
+                    entry['values_file'] = f"{i}.json"
+                    np.save(os.path.join(tmp_dir, entry['file']), codes.astype(np.int32))
+                    with open(os.path.join(tmp_dir, entry['values_file']), 'w') as f:
+                        json.dump(list(uniques), f)
+                else:
+                    # Mixed Python objects: no zero-copy form, keep them pickled
+                    entry['kind'] = 'pickle'
+                    entry['file'] = f"{i}.pkl"
+                    series.reset_index(drop=True).to_pickle(os.path.join(tmp_dir, entry['file']))
+            columns.append(entry)
+        meta = {'version': FORMAT_VERSION, 'source': self._source_info(csv_path), 'rows': len(df), 'columns': columns}
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        logger.info(f"Wrote columnar cache for {csv_path} to {entry_dir}")
+
+    def read(self, csv_path: str, columns: Optional[List[str]] = None,
+             categorical_strings: bool = False) -> Optional[pd.DataFrame]:
+        """Load the cached form of ``csv_path`` (only ``columns`` if given), or None if missing or stale.
+
+        With ``categorical_strings`` string columns come back as ``category``
+        built directly on the stored codes instead of being decoded.
+        """
+        meta = self._read_meta(csv_path)
+        if meta is None:
+            return None
+        entry_dir = self._entry_dir(csv_path)
+        wanted = None if columns is None else set(columns)
+        data = {}
+        for entry in meta['columns']:
+            if wanted is not None and entry['name'] not in wanted:
+                continue
+            path = os.path.join(entry_dir, entry['file'])
+            if entry['kind'] == 'array':
+                data[entry['name']] = np.load(path, mmap_mode='r')
+            elif entry['kind'] == 'dictionary':
+                codes = np.load(path, mmap_mode='r')
+                with open(os.path.join(entry_dir, entry['values_file']), 'r') as f:
+                    values = json.load(f)
+                if categorical_strings:
+                    data[entry['name']] = pd.Categorical.from_codes(codes, categories=values)
+                    continue
+                # code -1 (missing) indexes the trailing NaN
+                values = np.array(values + [np.nan], dtype=object)
+                data[entry['name']] = pd.Series(values.take(codes), dtype=entry['dtype'])
+            else:
+                data[entry['name']] = pd.read_pickle(path)
+        # copy=False keeps the memory-mapped arrays as the column storage
+        return pd.DataFrame(data, copy=False)
+
+    def load(self, csv_path: str, columns: Optional[List[str]] = None,
+             categorical_strings: bool = False) -> pd.DataFrame:
+        """Read ``csv_path`` through the cache, converting it on first use or after it changes."""
+        df = self.read(csv_path, columns, categorical_strings=categorical_strings)
+        if df is not None:
+            return df
+        df = pd.read_csv(csv_path)
+        self.write(csv_path, df)
+        if columns is not None:
+            df = df[[col for col in df.columns if col in set(columns)]]
+        if categorical_strings:
+            df = df.astype({col: 'category' for col in df.columns if pd.api.types.is_string_dtype(df[col])})
+        return df
@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from common.src.dataloader.spill import SpilledFrame
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """Per-run cache of materialized datasets.
+
+    Entries are keyed by (dataloader class, params, split) so validation,
+    training and prediction can share one loaded frame instead of each
+    re-reading the source. It is thread-safe: concurrent requests for the
+    same key wait for a single load. With ``max_entries`` the least recently
+    used entries are dropped once the cache is full, which bounds long-lived
+    caches (e.g. the --serve daemon's).
+
+    With a MemoryBudget attached, loaded entries are admitted to it; an entry
+    the budget spills stays cached as a SpilledFrame and is reloaded from
+    disk on every later hit. Callers that keep a reference to an entry (a
+    dataloader's ``data``) pass ``on_spill`` to swap it for the SpilledFrame
+    too, otherwise the spill would free nothing.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        # key -> on_spill callbacks of the callers holding that entry
+        self._holders: Dict[Hashable, List[Callable[[Hashable, SpilledFrame], None]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.budget = None
+
+    def attach_budget(self, budget):
+        self.budget = budget
+
+    def detach_budget(self):
+        """Drop the entries the budget spilled (their files go with it) and stop admitting new ones."""
+        with self._lock:
+            for key in [key for key, value in self._entries.items() if isinstance(value, SpilledFrame)]:
+                del self._entries[key]
+                self._holders.pop(key, None)
+        self.budget = None
+
+    def _spilled(self, key: Hashable, spilled: SpilledFrame):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = spilled
+            holders = list(self._holders.get(key, ()))
+        for on_spill in holders:
+            on_spill(key, spilled)
+
+    def _resolve(self, key: Hashable, value: Any, on_spill: Optional[Callable] = None) -> Any:
+        if self.budget is not None:
+            self.budget.touch(key)
+        if not isinstance(value, SpilledFrame):
+            return value
+        if on_spill is not None:
+            on_spill(key, value)
+        return value.load()
+
+    @staticmethod
+    def make_key(dataloader_class, params: Optional[dict], split: Optional[str]) -> Tuple[str, str, Optional[str]]:
+        class_path = f"{dataloader_class.__module__}.{dataloader_class.__qualname__}"
+        params = {k: v for k, v in (params or {}).items() if k != 'preprocessors'}
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        return (class_path, params_key, split)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], label: Optional[str] = None,
+                    on_spill: Optional[Callable[[Hashable, SpilledFrame], None]] = None) -> Any:
+        """The cached entry for ``key``, loading it once; ``label`` names it in memory budget events.
+
+        ``on_spill(key, spilled)`` is called when the budget spills the entry,
+        or right away if it already has.
+        """
+        with self._lock:
+            if on_spill is not None and on_spill not in self._holders.get(key, ()):
+                self._holders.setdefault(key, []).append(on_spill)
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                logger.debug(f"Dataset cache hit: {key}")
+                value = self._entries[key]
+            else:
+                value = None
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if value is not None:
+            return self._resolve(key, value, on_spill)
+        with key_lock:
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                value = self._entries.get(key)
+                if value is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if value is not None:
+                return self._resolve(key, value, on_spill)
+            logger.debug(f"Dataset cache miss: {key}")
+            data = loader()
+            evicted = []
+            with self._lock:
+                self._entries[key] = data
+                self._key_locks.pop(key, None)
+                while self.max_entries is not None and len(self._entries) > self.max_entries:
+                    evicted.append(self._entries.popitem(last=False)[0])
+                    self._holders.pop(evicted[-1], None)
+                    logger.debug(f"Dataset cache evicted: {evicted[-1]}")
+            if self.budget is not None:
+                for old in evicted:
+                    self.budget.forget(old)
+                data = self.budget.admit(key, data, on_spill=lambda spilled, key=key: self._spilled(key, spilled),
+                                         label=label)
+            return data
+
+    def release(self, key: Hashable, reason: str = 'not needed downstream'):
+        """Drop ``key`` because nothing later in the run reads it."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._holders.pop(key, None)
+        if self.budget is not None:
+            self.budget.release(key, reason)
+
+    def invalidate(self, dataloader_class=None, split: Optional[str] = None) -> int:
+        """Drop entries matching the given class and/or split. With no arguments, drop everything."""
+        class_path = None
+        if dataloader_class is not None:
+            class_path = f"{dataloader_class.__module__}.{dataloader_class.__qualname__}"
+        with self._lock:
+            removed = [
+                key for key in self._entries
+                if (class_path is None or key[0] == class_path) and (split is None or key[2] == split)
+            ]
+            for key in removed:
+                del self._entries[key]
+                self._holders.pop(key, None)
+        if self.budget is not None:
+            for key in removed:
+                self.budget.forget(key)
+        return len(removed)
+
+    def clear(self):
+        with self._lock:
+            removed = list(self._entries)
+            self._entries.clear()
+            self._holders.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.budget is not None:
+            for key in removed:
+                self.budget.forget(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
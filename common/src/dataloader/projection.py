@@ -0,0 +1,107 @@
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# read_csv dtypes for the scalar YAML schema types. str is pushed down too, so a
+# chunk or partition whose string column is all null does not read as float64.
+_SCHEMA_DTYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool', 'str': 'str'}
+
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+
+
+def required_columns(preprocessors: Iterable, model, evaluator=None) -> Optional[Set[str]]:
+    """Source columns needed by the model (and evaluator) after the preprocessor chain.
+
+    Walks the chain backwards: columns a preprocessor writes are not needed
+    from the source unless it also reads them. Returns None when any
+    component does not declare its input columns.
+    """
+    needed = set()
+    for component in (model, evaluator):
+        if component is None:
+            continue
+        columns = getattr(component, 'input_columns', None)
+        if columns is None:
+            return None
+        needed |= set(columns)
+    for preproc in reversed(list(preprocessors)):
+        reads = getattr(preproc, 'input_columns', None)
+        if reads is None:
+            return None
+        needed -= set(getattr(preproc, 'output_columns', None) or [])
+        needed |= set(reads)
+    return needed
+
+
+def schema_dtypes(yaml_path: Optional[str], columns: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """read_csv dtypes for the scalar columns of a generated dataloader schema."""
+    if not yaml_path or not os.path.exists(yaml_path):
+        return {}
+    with open(yaml_path, 'r') as f:
+        schema = yaml.safe_load(f) or {}
+    model_schema = next(iter(schema.values()), {}) if schema else {}
+    wanted = None if columns is None else set(columns)
+    dtypes = {}
+    for col, typ in (model_schema.get('columns') or {}).items():
+        if isinstance(typ, str) and typ in _SCHEMA_DTYPES and (wanted is None or col in wanted):
+            dtypes[col] = _SCHEMA_DTYPES[typ]
+    return dtypes
+
+
+def optimize_dtypes(df: pd.DataFrame, category_threshold: float = DEFAULT_CATEGORY_THRESHOLD) -> pd.DataFrame:
+    """Shrink numeric columns and turn low-cardinality strings into ``category``.
+
+    Integers whose values fit are narrowed to int32 (never below); int32
+    arithmetic in preprocessors can still overflow, so leave this off when
+    they compute large integers. Floats become float32. A string column
+    becomes categorical when its distinct values are at most
+    ``category_threshold`` times its length.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return df
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series) and series.dtype.itemsize > 4:
+            if len(series) == 0 or (series.min() >= np.iinfo(np.int32).min and series.max() <= np.iinfo(np.int32).max):
+                converted[col] = series.astype(np.int32)
+        elif pd.api.types.is_float_dtype(series) and series.dtype.itemsize > 4:
+            converted[col] = series.astype(np.float32)
+        elif (pd.api.types.is_string_dtype(series) or series.dtype == object) and len(series):
+            if series.nunique(dropna=True) <= category_threshold * len(series):
+                converted[col] = series.astype('category')
+    if not converted:
+        return df
+    out = df.copy(deep=False)
+    for col, values in converted.items():
+        out[col] = values
+    return out
+
+
+def apply_pushdown(config: dict, dataloader, preprocessors: List, model, evaluator=None):
+    """Push the columns the pipeline needs, and dtypes from its dataloader schema, into the dataloader.
+
+    Controlled by ``execution.projection`` (default on) and
+    ``execution.optimize_dtypes`` / ``execution.category_threshold``.
+    """
+    execution = config.get('execution') or {}
+    columns = None
+    if execution.get('projection', True):
+        columns = required_columns(preprocessors, model, evaluator)
+    dtypes = schema_dtypes(config['dataloader'].get('output_schema'), columns)
+    dataloader.set_projection(
+        columns=sorted(columns) if columns is not None else None,
+        dtypes=dtypes,
+        optimize=execution.get('optimize_dtypes', False),
+        category_threshold=execution.get('category_threshold', DEFAULT_CATEGORY_THRESHOLD),
+    )
+    if columns is not None:
+        print(f"Loading only columns {sorted(columns)} from {type(dataloader).__name__}")
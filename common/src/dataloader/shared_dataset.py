@@ -0,0 +1,286 @@
+import atexit
+import pickle
+import logging
+import secrets
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Hashable, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_MASKED_ARRAYS = {'b': pd.arrays.BooleanArray, 'i': pd.arrays.IntegerArray, 'u': pd.arrays.IntegerArray,
+                  'f': pd.arrays.FloatingArray}
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block created by another process; only the publisher unlinks it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which worker processes share with their parent, so the
+        # registration is the publisher's own and goes away when it unlinks
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameHandle:
+    """Picklable description of a DataFrame published to shared memory; pass it to workers instead of the frame."""
+
+    def __init__(self, token: str, rows: int, index: Any, columns: List[dict]):
+        self.token = token
+        self.rows = rows
+        self.index = index
+        self.columns = columns
+
+    def attach(self) -> "SharedFrameView":
+        return SharedFrameView(self)
+
+
+class SharedFrameView:
+    """Read-only DataFrame over a published frame's shared memory, valid until ``close``.
+
+    Numeric and bool columns are zero-copy views of the shared buffers;
+    dictionary-encoded string columns come back as ``category`` whose codes
+    are views too (only the distinct values are decoded). Columns of other
+    Python objects were pickled and are unpickled into private memory.
+    """
+
+    def __init__(self, handle: SharedFrameHandle):
+        self.handle = handle
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        data = {}
+        for col in handle.columns:
+            data[col['name']] = self._column(col)
+        if isinstance(handle.index, tuple):
+            index = pd.RangeIndex(*handle.index)
+        else:
+            index = pickle.loads(handle.index)
+        # copy=False keeps the shared buffers as the column storage
+        self.frame = pd.DataFrame(data, index=index, copy=False)
+
+    def _array(self, col: dict, part: str, dtype, count: int) -> np.ndarray:
+        name = col['blocks'][part]
+        block = self._blocks.get(name)
+        if block is None:
+            block = self._blocks[name] = _attach_block(name)
+        array = np.ndarray((count,), dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        return array
+
+    def _column(self, col: dict):
+        rows = self.handle.rows
+        kind = col['kind']
+        if kind == 'array':
+            return self._array(col, 'values', np.dtype(col['dtype']), rows)
+        if kind == 'masked':
+            values = self._array(col, 'values', np.dtype(col['dtype']), rows)
+            mask = self._array(col, 'mask', np.bool_, rows)
+            return _MASKED_ARRAYS[values.dtype.kind](values, mask)
+        if kind == 'dictionary':
+            codes = self._array(col, 'codes', np.dtype(col['dtype']), rows)
+            offsets = self._array(col, 'offsets', np.int64, col['categories'] + 1)
+            text = bytes(self._array(col, 'text', np.uint8, int(offsets[-1])))
+            categories = [text[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(col['categories'])]
+            return pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object), validate=False)
+        payload = self._array(col, 'pickle', np.uint8, col['size'])
+        return pickle.loads(payload)
+
+    def close(self):
+        """Release this process's mappings; a view still referenced elsewhere keeps its block mapped."""
+        self.frame = None
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # An array over this block is still alive; the mapping goes away with the process
+                pass
+        self._blocks = {}
+
+    def __enter__(self):
+        return self.frame
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedFrame:
+    """A DataFrame copied once into shared memory blocks, owned by the publishing process.
+
+    ``handle`` is what workers receive; ``release`` drops one reference and
+    unlinks the blocks when the last one is gone.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.token = secrets.token_hex(6)
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.refs = 1
+        self._lock = threading.Lock()
+        try:
+            columns = [self._publish_column(i, col, frame[col]) for i, col in enumerate(frame.columns)]
+        except BaseException:
+            self._unlink()
+            raise
+        if isinstance(frame.index, pd.RangeIndex):
+            index = (frame.index.start, frame.index.stop, frame.index.step)
+        else:
+            index = pickle.dumps(frame.index, protocol=pickle.HIGHEST_PROTOCOL)
+        self.handle = SharedFrameHandle(self.token, len(frame), index, columns)
+        self.nbytes = sum(block.size for block in self._blocks)
+
+    def _block(self, col: dict, part: str, data) -> None:
+        data = np.ascontiguousarray(data)
+        block = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1),
+                                           name=f"mlwks_{self.token}_{col['index']}_{part}")
+        self._blocks.append(block)
+        np.ndarray(data.shape, dtype=data.dtype, buffer=block.buf)[...] = data
+        col['blocks'][part] = block.name
+
+    def _publish_column(self, idx: int, name, series: pd.Series) -> dict:
+        col = {'index': idx, 'name': name, 'blocks': {}}
+        dtype = series.dtype
+        if isinstance(series.array, pd.arrays.BooleanArray | pd.arrays.IntegerArray | pd.arrays.FloatingArray):
+            values = series.array.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+            col.update(kind='masked', dtype=values.dtype.str)
+            self._block(col, 'values', values)
+            self._block(col, 'mask', series.isna().to_numpy())
+            return col
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+            col.update(kind='array', dtype=dtype.str)
+            self._block(col, 'values', series.to_numpy())
+            return col
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+        if all(isinstance(value, str) for value in categories):
+            # Codes in the width pandas picks for this many categories, so attaching does not convert them
+            codes = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object)).codes
+            encoded = [value.encode('utf-8') for value in categories]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(value) for value in encoded])
+            col.update(kind='dictionary', dtype=codes.dtype.str, categories=len(encoded))
+            self._block(col, 'codes', codes)
+            self._block(col, 'offsets', offsets)
+            self._block(col, 'text', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+            return col
+        # Mixed Python objects have no buffer form; workers unpickle their own copy
+        payload = np.frombuffer(pickle.dumps(series.to_numpy(), protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+        col.update(kind='pickle', size=len(payload))
+        self._block(col, 'pickle', payload)
+        return col
+
+    def acquire(self) -> "SharedFrame":
+        with self._lock:
+            if self.refs <= 0:
+                raise RuntimeError(f"Shared frame {self.token} was already released")
+            self.refs += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self.refs -= 1
+            last = self.refs == 0
+        if last:
+            self._unlink()
+
+    def _unlink(self):
+        # A view this process attached itself (in-process partition runs) goes with the blocks
+        detach(self.token)
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except (BufferError, FileNotFoundError):
+                pass
+        self._blocks = []
+
+
+class SharedFrameRegistry:
+    """Published frames by key, so concurrent users of the same dataset share one copy.
+
+    ``publish`` returns the existing SharedFrame with an extra reference, or
+    publishes a new one; every publish is paired with a ``release``. Anything
+    still published when the process exits is unlinked.
+    """
+
+    def __init__(self):
+        self._frames: Dict[Hashable, SharedFrame] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    def publish(self, key: Hashable, load: Callable[[], pd.DataFrame]) -> SharedFrame:
+        with self._lock:
+            shared = self._frames.get(key)
+            if shared is not None:
+                return shared.acquire()
+            shared = self._frames[key] = SharedFrame(load())
+            logger.info(f"Published {shared.nbytes / 1024 ** 2:.1f} MB to shared memory as {shared.token}")
+            return shared
+
+    def release(self, key: Hashable):
+        with self._lock:
+            shared = self._frames.get(key)
+            if shared is None:
+                return
+            shared.release()
+            if shared.refs == 0:
+                del self._frames[key]
+
+    def close_all(self):
+        with self._lock:
+            frames, self._frames = list(self._frames.values()), {}
+        for shared in frames:
+            shared.refs = 1
+            shared.release()
+
+
+registry = SharedFrameRegistry()
+
+# Views attached by this process, reused across the partitions it runs; the
+# publisher's own views are dropped when the frame's last reference is released
+_views: Dict[str, SharedFrameView] = {}
+_views_lock = threading.Lock()
+
+
+def attached_frame(handle: SharedFrameHandle) -> pd.DataFrame:
+    """The read-only frame behind ``handle``, attaching once per process."""
+    with _views_lock:
+        view = _views.get(handle.token)
+        if view is None:
+            view = _views[handle.token] = handle.attach()
+        return view.frame
+
+
+def detach(token: str):
+    """Close this process's view of the frame published as ``token``, if it attached one."""
+    with _views_lock:
+        view = _views.pop(token, None)
+    if view is not None:
+        view.close()
+
+
+class SharedPartition:
+    """Rows ``start:stop`` of a published frame: a picklable partition that workers slice without copying."""
+
+    def __init__(self, handle: SharedFrameHandle, start: int, stop: int):
+        self.handle = handle
+        self.start = start
+        self.stop = stop
+
+    def load(self) -> pd.DataFrame:
+        return attached_frame(self.handle).iloc[self.start:self.stop]
+
+    def __repr__(self):
+        return f"SharedPartition({self.handle.token}, {self.start}:{self.stop})"
+
+
+def row_partitions(shared: SharedFrame, partition_size: int) -> List[SharedPartition]:
+    """Split a published frame into partitions of roughly ``partition_size`` bytes."""
+    rows = shared.handle.rows
+    row_bytes = max(1, shared.nbytes // max(rows, 1))
+    step = max(1, partition_size // row_bytes)
+    return [SharedPartition(shared.handle, start, min(start + step, rows)) for start in range(0, rows, step)] \
+        or [SharedPartition(shared.handle, 0, 0)]
@@ -0,0 +1,108 @@
+import os
+import pickle
+import shutil
+import logging
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPILL_DIR = os.path.join('outputs', '.spill')
+
+
+def estimate_size(data: Any) -> int:
+    """Estimated resident bytes of a loaded split, predictions or a dict/list of them."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        usage = data.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(data, pd.DataFrame) else int(usage)
+    if isinstance(data, np.ndarray):
+        return int(data.nbytes)
+    if isinstance(data, dict):
+        return sum(estimate_size(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return sum(estimate_size(value) for value in data)
+    return 0
+
+
+class SpilledFrame:
+    """A DataFrame written to ``path`` in columnar form; ``load`` maps it back.
+
+    Numeric, bool and datetime columns are ``.npy`` files memory-mapped
+    copy-on-write on load, so they are paged in from disk as they are read
+    and can be modified without touching the file. ``str`` columns are
+    dictionary-encoded and decoded on load; other columns (categoricals,
+    nullable and other extension dtypes, Python objects) are pickled with
+    their dtype. The index and column labels round-trip unchanged.
+    """
+
+    def __init__(self, path: str, rows: int, nbytes: int, meta: dict):
+        self.path = path
+        self.rows = rows
+        self.nbytes = nbytes
+        self.meta = meta
+
+    @classmethod
+    def write(cls, frame: pd.DataFrame, path: str) -> "SpilledFrame":
+        tmp = f"{path}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        try:
+            entries = [cls._write_column(tmp, i, frame.iloc[:, i]) for i in range(frame.shape[1])]
+            index = frame.index
+            if isinstance(index, pd.RangeIndex):
+                index = (index.start, index.stop, index.step)
+            meta = {'columns': frame.columns, 'index': index, 'entries': entries}
+            with open(os.path.join(tmp, 'meta.pkl'), 'wb') as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return cls(path, len(frame), sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)), meta)
+
+    @staticmethod
+    def _write_column(directory: str, i: int, series: pd.Series) -> dict:
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+            np.save(os.path.join(directory, f"{i}.npy"), series.to_numpy())
+            return {'kind': 'array'}
+        if isinstance(dtype, pd.StringDtype):
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            np.save(os.path.join(directory, f"{i}.npy"), codes.astype(np.int32))
+            return {'kind': 'dictionary', 'dtype': dtype, 'values': list(uniques)}
+        series.reset_index(drop=True).to_pickle(os.path.join(directory, f"{i}.pkl"))
+        return {'kind': 'pickle'}
+
+    def load(self) -> pd.DataFrame:
+        data = {}
+        for i, entry in enumerate(self.meta['entries']):
+            if entry['kind'] == 'array':
+                data[i] = np.load(os.path.join(self.path, f"{i}.npy"), mmap_mode='c')
+            elif entry['kind'] == 'dictionary':
+                codes = np.load(os.path.join(self.path, f"{i}.npy"))
+                # code -1 (missing) indexes the trailing NaN
+                values = np.array(entry['values'] + [np.nan], dtype=object)
+                data[i] = pd.array(values.take(codes), dtype=entry['dtype'])
+            else:
+                data[i] = pd.read_pickle(os.path.join(self.path, f"{i}.pkl")).array
+        index = self.meta['index']
+        if isinstance(index, tuple):
+            index = pd.RangeIndex(*index)
+        # copy=False keeps the memory-mapped arrays as the column storage
+        frame = pd.DataFrame(data, index=index, copy=False)
+        frame.columns = self.meta['columns']
+        return frame
+
+    def delete(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __repr__(self):
+        return f"SpilledFrame({self.path}, {self.rows} rows)"
+
+
+def spill_frame(frame: pd.DataFrame, directory: str, name: str) -> SpilledFrame:
+    os.makedirs(directory, exist_ok=True)
+    return SpilledFrame.write(frame, os.path.join(directory, name))
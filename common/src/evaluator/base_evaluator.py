@@ -4,9 +4,16 @@ from abc import ABC, abstractmethod
 logger = logging.getLogger(__name__)
 
 class BaseEvaluator(ABC):
+    # Columns of dataloader.data the evaluator reads; None means all of them.
+    # Evaluators that only look at the predictions declare [].
+    input_columns = None
+
     def __init__(self, predictions, dataloader):
         self.predictions = predictions
         self.dataloader = dataloader
+        # The evaluator's config params (updated with a stage's evaluator_args),
+        # handed over by the orchestrator after construction
+        self.params = {}
 
     @abstractmethod
     def evaluate(self):
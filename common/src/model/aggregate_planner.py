@@ -0,0 +1,94 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (op, column) pairs; column is None for ops over whole rows
+ReductionKey = Tuple[str, Optional[str]]
+
+
+def _add(left, right):
+    # None stands for "column absent", as in SumScoreModel
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left + right
+
+
+def _merge_counts(left: dict, right: dict) -> dict:
+    merged = dict(left)
+    for value, count in right.items():
+        merged[value] = merged.get(value, 0) + count
+    return merged
+
+
+def _value_counts(frame, column) -> dict:
+    if column not in frame.columns:
+        return {}
+    return {value: int(count) for value, count in frame[column].value_counts().items()}
+
+
+class Reduction:
+    """How to compute one aggregate over a chunk and merge it across chunks."""
+
+    def __init__(self, compute: Callable[[Any, Optional[str]], Any], combine: Callable[[Any, Any], Any],
+                 initial: Callable[[], Any]):
+        self.compute = compute
+        self.combine = combine
+        self.initial = initial
+
+
+REDUCTIONS: Dict[str, Reduction] = {
+    'rows': Reduction(lambda frame, column: len(frame), lambda left, right: left + right, lambda: 0),
+    'present': Reduction(lambda frame, column: column in frame.columns, lambda left, right: left or right,
+                         lambda: False),
+    'sum': Reduction(lambda frame, column: frame[column].sum() if column in frame.columns else None, _add,
+                     lambda: None),
+    'count': Reduction(lambda frame, column: int(frame[column].count()) if column in frame.columns else 0,
+                       lambda left, right: left + right, lambda: 0),
+    'value_counts': Reduction(_value_counts, _merge_counts, dict),
+}
+
+
+class AggregatePlanner:
+    """Compute the reductions registered by several models in one pass per chunk.
+
+    A model registers ``{name: (op, column)}`` (see BaseModel.reductions).
+    Identical reductions requested by different models are computed once,
+    and each model gets its values back under its own names, exactly as if
+    it had reduced the chunk alone.
+    """
+
+    def __init__(self):
+        self.plan: List[ReductionKey] = []
+        self._requests: Dict[str, Dict[str, ReductionKey]] = OrderedDict()
+
+    def register(self, owner: str, reductions: Dict[str, ReductionKey]):
+        unknown = sorted({op for op, _ in reductions.values()} - set(REDUCTIONS))
+        if unknown:
+            raise ValueError(f"{owner} requests unknown reductions {unknown}; known: {sorted(REDUCTIONS)}")
+        self._requests[owner] = {name: tuple(key) for name, key in reductions.items()}
+        for key in self._requests[owner].values():
+            if key not in self.plan:
+                self.plan.append(key)
+
+    def __contains__(self, owner: str) -> bool:
+        return owner in self._requests
+
+    def requested(self) -> int:
+        return sum(len(reductions) for reductions in self._requests.values())
+
+    def init_state(self) -> Dict[ReductionKey, Any]:
+        return {key: REDUCTIONS[key[0]].initial() for key in self.plan}
+
+    def partial(self, frame) -> Dict[ReductionKey, Any]:
+        return {key: REDUCTIONS[key[0]].compute(frame, key[1]) for key in self.plan}
+
+    def combine(self, left: Dict[ReductionKey, Any], right: Dict[ReductionKey, Any]) -> Dict[ReductionKey, Any]:
+        return {key: REDUCTIONS[key[0]].combine(left[key], right[key]) for key in self.plan}
+
+    def values(self, owner: str, state: Dict[ReductionKey, Any]) -> Dict[str, Any]:
+        """``owner``'s reductions from a (combined) planner state, under the names it registered."""
+        return {name: state[key] for name, key in self._requests[owner].items()}
@@ -1,26 +1,84 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 class BaseModel(ABC):
+    # Aggregating models set this and implement init_state/partial/combine/finalize
+    # so they can run chunk by chunk in constant memory.
+    supports_streaming = False
+    # Columns of dataloader.data the model reads; None means all of them
+    input_columns = None
+
     def __init__(self, dataloader, split: str = "train"):
         self.dataloader = dataloader
         self.split = split
 
     def train(self):
-        self.dataloader.load_data(self.split)
+        self.dataloader.load(self.split)
         self._train()
 
     def predict(self, split: str = None):
         split = split or self.split
-        self.dataloader.load_data(split)
+        self.dataloader.load(split)
         return self._predict()
 
+    def get_state(self) -> dict:
+        """Picklable trained state (everything except the dataloader), used by the stage cache and save_to."""
+        return {k: v for k, v in vars(self).items() if k != 'dataloader'}
+
+    def set_state(self, state: dict):
+        self.__dict__.update(state)
+
+    def train_streaming(self):
+        """Training hook for streaming runs; the full split is never loaded.
+
+        Streaming models fold their work into partial/combine, so by default
+        this only calls _train.
+        """
+        self._train()
+
+    def aggregate(self, chunks: Iterable) -> Any:
+        """Fold partial states over ``chunks`` and return the finalized predictions."""
+        state = self.init_state()
+        for chunk in chunks:
+            state = self.combine(state, self.partial(chunk))
+        return self.finalize(state)
+
+    def predict_streaming(self, split: str = None, chunksize: int = 100_000, prefetch_depth: int = 0) -> Any:
+        split = split or self.split
+        return self.aggregate(self.dataloader.iter_chunks(split, chunksize, prefetch_depth))
+
+    def init_state(self) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def partial(self, data) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def combine(self, left, right) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def finalize(self, state) -> Any:
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def reductions(self) -> Optional[Dict[str, Tuple[str, Optional[str]]]]:
+        """Aggregates this model's partial is made of, as ``{name: (op, column)}``, or None.
+
+        Ops are those of common/src/model/aggregate_planner.py. When a model
+        declares them, a FusedModel computes them together with the other
+        models' in one pass and builds this model's state with from_reductions.
+        """
+        return None
+
+    def from_reductions(self, values: Dict[str, Any]) -> Any:
+        """The state partial/combine would have produced, from the reduced ``values`` of the same rows."""
+        raise NotImplementedError(f"{type(self).__name__} does not declare reductions")
+
     @abstractmethod
     def _train(self):
         pass
 
     @abstractmethod
     def _predict(self):
-        pass 
\ No newline at end of file
+        pass
@@ -0,0 +1,127 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from common.src.model.aggregate_planner import AggregatePlanner
+from common.src.model.base_model import BaseModel
+from common.src.workflow.registry import import_class
+
+logger = logging.getLogger(__name__)
+
+FUSED_MODEL_CLASS = f"{__name__}.FusedModel"
+
+
+def model_name(conf: dict) -> str:
+    return conf.get('name') or conf['class'].rsplit('.', 1)[-1]
+
+
+def fused_model_conf(confs: List[dict]) -> dict:
+    """The ``model`` section that runs the model configs ``confs`` as one FusedModel.
+
+    Split, dataloader_args and load_from/save_to come from the first model.
+    """
+    if not confs:
+        raise ValueError("A model list needs at least one model")
+    first = confs[0]
+    conf = {key: first[key] for key in ('split', 'dataloader_args', 'save_to', 'load_from') if key in first}
+    conf.update({'name': '+'.join(model_name(c) for c in confs), 'class': FUSED_MODEL_CLASS,
+                 'params': {'models': [dict(c) for c in confs]}})
+    return conf
+
+
+def model_confs(config: dict) -> List[dict]:
+    """The model configs of ``config``: the members of a fused model, or its single model."""
+    conf = config['model']
+    if conf.get('class') == FUSED_MODEL_CLASS:
+        return list(conf['params']['models'])
+    return [conf]
+
+
+class FusedModel(BaseModel):
+    """Several models over one dataloader and split, computed in a single scan of the data.
+
+    Members that declare reductions register them with a shared
+    AggregatePlanner, which computes all of them (once each, however many
+    members ask) in one pass over each chunk or over the loaded split.
+    Other streaming members fold their own partials over the same chunks,
+    and other models predict from the same loaded data. Predictions are an
+    ordered dict of each member's predictions by name, equal to what the
+    member would have returned on its own.
+    """
+
+    def __init__(self, dataloader, split: str = "train", models: List[dict] = ()):
+        super().__init__(dataloader, split)
+        self.members: Dict[str, BaseModel] = OrderedDict()
+        for conf in models:
+            name = model_name(conf)
+            if name in self.members:
+                raise ValueError(f"Model name {name} is used twice; give the models distinct names")
+            if conf.get('split', split) != split:
+                raise ValueError(f"Model {name} has split {conf['split']}, but models run together share {split}")
+            ModelClass = import_class(conf['class'])
+            self.members[name] = ModelClass(dataloader, split=split, **(conf.get('params') or {}))
+        if not self.members:
+            raise ValueError("FusedModel needs at least one model")
+        self.planner = AggregatePlanner()
+        for name, member in self.members.items():
+            reductions = member.reductions()
+            if reductions:
+                self.planner.register(name, reductions)
+        self.supports_streaming = all(member.supports_streaming for member in self.members.values())
+        columns = [member.input_columns for member in self.members.values()]
+        self.input_columns = None if any(c is None for c in columns) else sorted({c for cs in columns for c in cs})
+        print(f"Fusing models {list(self.members)}: {len(self.planner.plan)} distinct aggregates "
+              f"(of {self.planner.requested()} requested) in one pass")
+
+    def _own(self):
+        """Members that are not served by the planner."""
+        return [(name, member) for name, member in self.members.items() if name not in self.planner]
+
+    def _train(self):
+        for member in self.members.values():
+            member._train()
+
+    def train_streaming(self):
+        for member in self.members.values():
+            member.train_streaming()
+
+    def _predict(self):
+        data = self.dataloader.data
+        reductions = self.planner.partial(data)
+        return OrderedDict(
+            (name, self._finalize_planned(name, member, reductions) if name in self.planner else member._predict())
+            for name, member in self.members.items())
+
+    def _finalize_planned(self, name: str, member: BaseModel, reductions: dict) -> Any:
+        return member.finalize(member.from_reductions(self.planner.values(name, reductions)))
+
+    def init_state(self):
+        return {'reductions': self.planner.init_state(),
+                'models': {name: member.init_state() for name, member in self._own()}}
+
+    def partial(self, data):
+        return {'reductions': self.planner.partial(data),
+                'models': {name: member.partial(data) for name, member in self._own()}}
+
+    def combine(self, left, right):
+        return {'reductions': self.planner.combine(left['reductions'], right['reductions']),
+                'models': {name: member.combine(left['models'][name], right['models'][name])
+                           for name, member in self._own()}}
+
+    def finalize(self, state):
+        return OrderedDict(
+            (name, self._finalize_planned(name, member, state['reductions']) if name in self.planner
+             else member.finalize(state['models'][name]))
+            for name, member in self.members.items())
+
+    def get_state(self) -> dict:
+        return {'split': self.split, 'members': {name: member.get_state() for name, member in self.members.items()}}
+
+    def set_state(self, state: dict):
+        for name, member_state in (state.get('members') or {}).items():
+            if name in self.members:
+                self.members[name].set_state(member_state)
+        if 'split' in state:
+            self.split = state['split']
+        for member in self.members.values():
+            member.split = self.split
@@ -0,0 +1,283 @@
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _values(column: pd.Series) -> pd.Series:
+    return column.dropna()
+
+
+def _canonical(column: pd.Series) -> pd.Series:
+    """Non-null numbers as one dtype, so equal values hash alike whatever dtype a chunk was read as.
+
+    Integers and integral floats become int64, other floats float64.
+    """
+    if column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) in ('integer', 'floating',
+                                                                                     'mixed-integer-float'):
+        column = pd.to_numeric(column)
+    if pd.api.types.is_bool_dtype(column) or not pd.api.types.is_numeric_dtype(column):
+        return column
+    values = column.to_numpy(dtype=np.float64 if pd.api.types.is_float_dtype(column) else None)
+    if values.dtype.kind == 'f':
+        integral = np.isfinite(values) & (np.floor(values) == values) & (np.abs(values) < 2.0 ** 63)
+        if not integral.all():
+            return pd.Series(values, index=column.index)
+    elif values.dtype.kind == 'u' and len(values) and values.max() > np.iinfo(np.int64).max:
+        return pd.Series(values, index=column.index)
+    return pd.Series(values.astype(np.int64), index=column.index)
+
+
+def hash_values(column: pd.Series, categorize: bool = True) -> np.ndarray:
+    """64-bit hashes of ``column``'s values; the same in every process (pandas hashes with a fixed key).
+
+    ``categorize`` (hash each distinct value once) only pays off for columns with repeats.
+    """
+    return pd.util.hash_pandas_object(column, index=False, categorize=categorize).to_numpy(np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length of uint64 values."""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= np.uint64(1 << shift)
+        length[high] += shift
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+class KLLSketch:
+    """Streaming quantiles with a normalized rank error of about ``error`` (KLL, Karnin-Lang-Liberty).
+
+    Level ``h`` holds items standing for ``2**h`` input values each. When
+    the sketch outgrows its capacity, the lowest full level is sorted and
+    every other item (from a random offset) is promoted one level up.
+    Capacities shrink geometrically towards the lower levels, so the
+    sketch stays at about ``3 * k`` items whatever the input size. Two
+    sketches merge by concatenating their levels and compacting. Min and
+    max are exact.
+    """
+
+    # Capacity of level h is k * C ** (top - h)
+    C = 2 / 3
+
+    def __init__(self, error: float = 0.01, seed: Optional[int] = 0, k: Optional[int] = None):
+        self.error = error
+        # Single-quantile rank error of KLL is about 2.3 / k ** 0.97 (as measured for Apache DataSketches)
+        self.k = k or max(8, math.ceil((2.296 / error) ** (1 / 0.9723)))
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self.min = None
+        self.max = None
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        return max(2, math.ceil(self.k * self.C ** (len(self.levels) - 1 - level)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def update(self, column) -> "KLLSketch":
+        values = _values(pd.Series(column)).to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        low, high = values.min(), values.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        while self._size() > self._max_size():
+            level = next(h for h in range(len(self.levels)) if len(self.levels[h]) >= self._capacity(h))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind, so the weight of the level is preserved exactly
+            keep = items[:1] if len(items) % 2 else items[:0]
+            pairs = items[len(keep):]
+            promoted = pairs[self._rng.integers(0, 2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """A new sketch of both inputs; the operands are left unchanged."""
+        merged = KLLSketch(self.error, k=max(self.k, other.k))
+        merged._rng = self._rng
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [np.concatenate([a.levels[h] for a in (self, other) if h < len(a.levels)])
+                         for h in range(depth)]
+        merged.n = self.n + other.n
+        bounds = [s for s in (self, other) if s.min is not None]
+        merged.min = min(s.min for s in bounds) if bounds else None
+        merged.max = max(s.max for s in bounds) if bounds else None
+        merged._compress()
+        return merged
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(float(self.min))
+            elif q >= 1:
+                result.append(float(self.max))
+            else:
+                index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+                result.append(float(items[min(index, len(items) - 1)]))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': 'kll', 'error': self.error, 'k': self.k, 'n': self.n,
+                'min': None if self.min is None else float(self.min),
+                'max': None if self.max is None else float(self.max),
+                'levels': [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(state['error'], k=state['k'])
+        sketch.n, sketch.min, sketch.max = state['n'], state['min'], state['max']
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']]
+        return sketch
+
+
+class HyperLogLog:
+    """Distinct count with a relative standard error of about ``error``.
+
+    Uses ``2 ** p`` registers with p chosen so that 1.04 / sqrt(2 ** p)
+    is at most ``error``. Values are hashed to 64 bits, so there is no
+    large-range correction; small counts use linear counting. Merging
+    takes the register-wise maximum.
+    """
+
+    def __init__(self, error: float = 0.01):
+        self.error = error
+        self.p = min(18, max(4, math.ceil(2 * math.log2(1.04 / error))))
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    def update(self, column) -> "HyperLogLog":
+        # Repeats cannot change a register, so only distinct values are hashed
+        column = _canonical(pd.Series(_values(pd.Series(column)).unique()))
+        if len(column) == 0:
+            return self
+        hashes = hash_values(column, categorize=False)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Position of the first set bit in the remaining 64 - p bits
+        rank = (64 - self.p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.p} and {other.p}")
+        merged = HyperLogLog(self.error)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': 'hll', 'error': self.error, 'p': self.p, 'registers': self.registers.tobytes().hex()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(state['error'])
+        sketch.registers = np.frombuffer(bytes.fromhex(state['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class SpaceSaving:
+    """Heavy hitters (top-k frequent values) in ``ceil(1 / error)`` counters.
+
+    Each counter holds a value's estimated count and the most it may be
+    overestimated by; the estimate is never below the true count and
+    exceeds it by at most ``error * n``. A chunk is summarized by its exact
+    counts, truncated to the largest counters, and summaries merge as in
+    mergeable Space-Saving: a value missing from a full summary is counted
+    at that summary's minimum.
+    """
+
+    def __init__(self, error: float = 0.001):
+        self.error = error
+        self.capacity = max(1, math.ceil(1 / error))
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.n = 0
+
+    def _floor(self) -> int:
+        # Upper bound on the count of any value not in a full summary
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def update(self, column) -> "SpaceSaving":
+        column = _values(pd.Series(column))
+        if len(column) == 0:
+            return self
+        chunk = SpaceSaving(self.error)
+        counts = column.value_counts(sort=True)
+        if isinstance(counts.index, pd.CategoricalIndex):
+            # Categoricals count every category, also those absent from this chunk
+            counts = counts[counts > 0]
+            counts.index = pd.Index(counts.index.to_numpy())
+        chunk.counts = counts.iloc[:self.capacity].astype(np.int64)
+        chunk.errors = pd.Series(0, index=chunk.counts.index, dtype=np.int64)
+        chunk.n = len(column)
+        merged = self.merge(chunk)
+        self.counts, self.errors, self.n = merged.counts, merged.errors, merged.n
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        merged = SpaceSaving(min(self.error, other.error))
+        floor_left, floor_right = self._floor(), other._floor()
+        values = self.counts.index.union(other.counts.index, sort=False)
+        counts = (self.counts.reindex(values, fill_value=floor_left)
+                  + other.counts.reindex(values, fill_value=floor_right))
+        errors = (self.errors.reindex(values, fill_value=floor_left)
+                  + other.errors.reindex(values, fill_value=floor_right))
+        top = counts.sort_values(ascending=False, kind='stable').iloc[:merged.capacity]
+        merged.counts = top.astype(np.int64)
+        merged.errors = errors.reindex(top.index).astype(np.int64)
+        merged.n = self.n + other.n
+        return merged
+
+    def top(self, k: int) -> pd.DataFrame:
+        """The ``k`` values with the largest estimated counts, with each estimate's maximum overcount."""
+        top = self.counts.iloc[:k]
+        return pd.DataFrame({'value': top.index.to_numpy(), 'count': top.to_numpy(),
+                             'max_error': self.errors.reindex(top.index).to_numpy()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': 'space_saving', 'error': self.error, 'n': self.n,
+                'values': self.counts.index.tolist(), 'counts': self.counts.tolist(),
+                'errors': self.errors.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(state['error'])
+        index = pd.Index(state['values'])
+        sketch.counts = pd.Series(state['counts'], index=index, dtype=np.int64)
+        sketch.errors = pd.Series(state['errors'], index=index, dtype=np.int64)
+        sketch.n = state['n']
+        return sketch
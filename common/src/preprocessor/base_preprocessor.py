@@ -4,6 +4,24 @@ from abc import ABC, abstractmethod
 logger = logging.getLogger(__name__)
 
 class BasePreprocessor(ABC):
+    # Columns read from and written to the frame; None means unknown, which
+    # disables column projection for the pipeline.
+    input_columns = None
+    output_columns = None
+
     @abstractmethod
     def process(self, data):
-        pass 
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def with_columns(data, **columns):
+        """Return a new frame with ``columns`` replaced or added.
+
+        Only the given columns are new; every other column is shared with
+        ``data`` (a shallow, copy-on-write copy), and ``data`` itself is left
+        untouched.
+        """
+        out = data.copy(deep=False)
+        for name, values in columns.items():
+            out[name] = values
+        return out
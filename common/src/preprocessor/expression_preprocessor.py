@@ -0,0 +1,95 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from common.src.preprocessor.base_preprocessor import BasePreprocessor
+
+logger = logging.getLogger(__name__)
+
+_STRING_METHODS = {'upper', 'lower', 'title', 'capitalize', 'strip', 'lstrip', 'rstrip', 'swapcase'}
+
+
+class ExpressionPreprocessor(BasePreprocessor):
+    """Declarative, vectorized preprocessor configured from YAML.
+
+    ``operations`` is a list applied in order; each entry has an ``op`` and
+    writes one ``output`` column (defaulting to its input ``column``):
+
+    - ``bin``: ``column``, ascending ``thresholds`` and ``labels`` (one more
+      label than thresholds); a value gets the label of the highest threshold
+      it reaches, otherwise ``labels[0]``.
+    - ``eval``: ``expr``, an arithmetic expression over columns (DataFrame.eval).
+    - ``string``: ``column`` and a ``method`` such as upper/lower/strip.
+    - ``conditional``: ``conditions`` as ``[expr, value]`` pairs, first match
+      wins, plus a ``default``.
+
+    An operation is skipped when a column it needs is missing; ``requires``
+    lists the needed columns for ``eval``/``conditional`` expressions.
+
+    Example::
+
+        - class: common.src.preprocessor.expression_preprocessor.ExpressionPreprocessor
+          params:
+            operations:
+              - {op: eval, output: score, expr: "score * 2", requires: [score]}
+              - {op: bin, column: score, output: grade, thresholds: [80, 90], labels: [C, B, A]}
+    """
+
+    def __init__(self, operations: Optional[List[Dict[str, Any]]] = None):
+        self.operations = operations or []
+        self._compiled = [self._compile(op) for op in self.operations]
+        # eval/conditional expressions without 'requires' read unknown columns
+        if all(op.get('op') in ('bin', 'string') or 'requires' in op for op in self.operations):
+            self.input_columns = sorted({col for _, required, _ in self._compiled for col in required})
+        self.output_columns = sorted({output for output, _, _ in self._compiled})
+
+    def _compile(self, spec: Dict[str, Any]):
+        op = spec.get('op')
+        if op == 'bin':
+            column = spec['column']
+            thresholds = list(spec['thresholds'])
+            labels = list(spec['labels'])
+            if len(labels) != len(thresholds) + 1:
+                raise ValueError(f"bin on {column}: expected {len(thresholds) + 1} labels, got {len(labels)}")
+            if thresholds != sorted(thresholds):
+                raise ValueError(f"bin on {column}: thresholds must be ascending")
+
+            def fn(df):
+                values = df[column].to_numpy()
+                # Highest threshold first so np.select picks the top bin reached
+                conditions = [values >= t for t in reversed(thresholds)]
+                return np.select(conditions, list(reversed(labels[1:])), default=labels[0])
+            return spec.get('output', column), [column], fn
+
+        if op == 'eval':
+            expr = spec['expr']
+            return spec['output'], list(spec.get('requires', [])), lambda df: df.eval(expr)
+
+        if op == 'string':
+            column = spec['column']
+            method = spec['method']
+            if method not in _STRING_METHODS:
+                raise ValueError(f"Unsupported string method: {method}")
+            return spec.get('output', column), [column], lambda df: getattr(df[column].str, method)()
+
+        if op == 'conditional':
+            conditions = [(cond, value) for cond, value in spec['conditions']]
+            default = spec.get('default')
+
+            def fn(df):
+                masks = [np.asarray(df.eval(cond), dtype=bool) for cond, _ in conditions]
+                return np.select(masks, [value for _, value in conditions], default=default)
+            return spec['output'], list(spec.get('requires', [])), fn
+
+        raise ValueError(f"Unsupported operation: {op}")
+
+    def process(self, data):
+        if not isinstance(data, pd.DataFrame):
+            return data
+        for output, required, fn in self._compiled:
+            if any(col not in data.columns for col in required):
+                continue
+            data = self.with_columns(data, **{output: fn(data)})
+        return data
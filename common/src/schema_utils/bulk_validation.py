@@ -0,0 +1,227 @@
+import logging
+import typing
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ValidationError, create_model
+
+from common.src.schema_utils.yaml_validator import CompiledSchema, _is_string_like_dtype
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ROW_CHECKS = 10_000
+MAX_ROWS_PER_ERROR = 10
+ROW_CHECK_BATCH = 10_000
+
+_SCALAR_NAMES = {int: 'int', float: 'float', str: 'str', bool: 'bool', Any: 'Any'}
+_SCALAR_TYPES = {'int': int, 'float': float, 'str': str, 'bool': bool, 'Any': Any}
+
+# Dtypes whose every non-null value pydantic's lax mode accepts for a field of that type,
+# so such columns need no per-value inspection
+_ACCEPTED_DTYPES = {
+    'int': lambda s: pd.api.types.is_integer_dtype(s) or pd.api.types.is_bool_dtype(s),
+    'float': pd.api.types.is_numeric_dtype,
+    'str': _is_string_like_dtype,
+    'bool': pd.api.types.is_bool_dtype,
+}
+
+
+def _yaml_type(annotation) -> Optional[Union[str, dict]]:
+    """YAML type for a field annotation, or None when the column checks cannot express it."""
+    if annotation in _SCALAR_NAMES:
+        return _SCALAR_NAMES[annotation]
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin is list and len(args) <= 1:
+        items = _SCALAR_NAMES.get(args[0]) if args else 'Any'
+        return {'type': 'list', 'items': items} if items else None
+    if origin is dict and len(args) in (0, 2):
+        values = _SCALAR_NAMES.get(args[1]) if args else 'Any'
+        return {'type': 'dict', 'values': values} if values else None
+    return None
+
+
+def schema_from_model(model: Type[BaseModel]) -> Tuple[Dict[str, Union[str, dict]], Set[str], List[str]]:
+    """Column types for the fields of ``model``: (columns, nullable columns, fields only checkable per row).
+
+    Optional fields are nullable. Fields with constraints, field validators or
+    annotations beyond scalars, lists and dicts of scalars cannot be turned
+    into column checks and are validated row by row.
+    """
+    decorators = model.__pydantic_decorators__
+    validated = set()
+    for decorator in decorators.field_validators.values():
+        validated.update(decorator.info.fields)
+    columns, nullable, per_row = {}, set(), []
+    for name, field in model.model_fields.items():
+        column = field.alias or name
+        annotation = field.annotation
+        args = typing.get_args(annotation)
+        if typing.get_origin(annotation) is Union and type(None) in args:
+            nullable.add(column)
+            rest = [arg for arg in args if arg is not type(None)]
+            annotation = rest[0] if len(rest) == 1 else None
+        typ = _yaml_type(annotation) if annotation is not None else None
+        if typ is None or field.metadata or name in validated or '*' in validated:
+            per_row.append(column)
+            continue
+        columns[column] = typ
+    return columns, nullable, per_row
+
+
+def _python_type(typ: Union[str, dict]):
+    if isinstance(typ, dict):
+        if typ['type'] == 'list':
+            return List[_SCALAR_TYPES.get(typ.get('items', 'Any'), Any)]
+        return Dict[str, _SCALAR_TYPES.get(typ.get('values', 'Any'), Any)]
+    return _SCALAR_TYPES.get(typ, Any)
+
+
+def model_from_schema(schema: CompiledSchema) -> Type[BaseModel]:
+    """A pydantic model with one required field per schema column, used for per-row error messages."""
+    return create_model(schema.name, **{col: (_python_type(typ), ...) for col, typ in schema.columns.items()})
+
+
+class ValidationReport:
+    """Outcome of validate_bulk: invalid row count and errors aggregated by (column, error type).
+
+    ``errors`` entries hold the error count, the first message and the first
+    row labels; ``row_errors`` keeps the full pydantic message of the first
+    ``max_row_errors`` invalid rows. Rows beyond ``max_row_checks`` that the
+    column checks flagged are not validated; they are counted as
+    ``unconfirmed_rows`` (the first labels in ``unconfirmed``) and do not
+    make the report fail, since pydantic may well accept them.
+    """
+
+    def __init__(self, name: str, rows: int, max_row_errors: int = 10):
+        self.name = name
+        self.rows = rows
+        self.checked_rows = 0
+        self.invalid_rows = 0
+        self.unconfirmed_rows = 0
+        self.unconfirmed: List[Any] = []
+        self.max_row_errors = max_row_errors
+        self.errors: Dict[Tuple[str, str], dict] = {}
+        self.row_errors: List[Tuple[Any, str]] = []
+
+    @property
+    def ok(self) -> bool:
+        return self.invalid_rows == 0
+
+    def add(self, column: str, kind: str, message: str, labels: List[Any], count: Optional[int] = None):
+        entry = self.errors.setdefault((column, kind), {'column': column, 'type': kind, 'message': message,
+                                                        'count': 0, 'rows': []})
+        entry['count'] += len(labels) if count is None else count
+        entry['rows'].extend(labels[:MAX_ROWS_PER_ERROR - len(entry['rows'])])
+
+    def add_row(self, label, error: ValidationError):
+        for detail in error.errors():
+            column = str(detail['loc'][0]) if detail['loc'] else ''
+            self.add(column, detail['type'], detail['msg'], [label])
+        if len(self.row_errors) < self.max_row_errors:
+            self.row_errors.append((label, str(error)))
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'rows': self.rows, 'checked_rows': self.checked_rows,
+                'invalid_rows': self.invalid_rows, 'unconfirmed_rows': self.unconfirmed_rows,
+                'unconfirmed': self.unconfirmed, 'errors': list(self.errors.values()),
+                'row_errors': [{'row': label, 'error': error} for label, error in self.row_errors]}
+
+    def __str__(self):
+        unconfirmed = (f"; {self.unconfirmed_rows} flagged rows not checked, e.g. {self.unconfirmed}"
+                       if self.unconfirmed_rows else "")
+        if self.ok:
+            return f"{self.name}: {self.rows} rows valid ({self.checked_rows} checked row by row{unconfirmed})"
+        lines = [f"{self.name}: {self.invalid_rows} of {self.rows} rows invalid"
+                 f" ({self.checked_rows} checked row by row{unconfirmed})"]
+        for e in self.errors.values():
+            more = f" (+{e['count'] - len(e['rows'])} more)" if e['count'] > len(e['rows']) else ""
+            lines.append(f"  [{e['column']}] {e['type']}: {e['message']} x{e['count']} rows={e['rows']}{more}")
+        return "\n".join(lines)
+
+
+def _candidate_positions(frame: pd.DataFrame, columns: Dict[str, Union[str, dict]], nullable: Set[str],
+                         required: Set[str], name: str) -> Tuple[np.ndarray, List[str]]:
+    """Positions of rows the column checks cannot vouch for, and the required columns that are missing."""
+    suspect = np.zeros(len(frame), dtype=bool)
+    missing = []
+    inspect = {}
+    for col, typ in columns.items():
+        if col not in frame.columns:
+            # Fields with a default may be missing altogether
+            if col in required:
+                missing.append(col)
+            continue
+        series = frame[col]
+        if col not in nullable and typ not in ('float', 'Any'):
+            # Pydantic accepts NaN for floats only
+            suspect |= series.isna().to_numpy()
+        accepted = _ACCEPTED_DTYPES.get(typ) if isinstance(typ, str) else None
+        if typ != 'Any' and not (accepted and accepted(series)):
+            inspect[col] = typ
+    if inspect:
+        for violation in CompiledSchema(name, inspect).validate(frame):
+            rows = np.asarray(violation.rows, dtype=np.int64)
+            if violation.column in nullable:
+                # Nulls of Optional fields validate as None, whatever the column's dtype
+                rows = rows[frame[violation.column].notna().to_numpy()[rows]]
+            suspect[rows] = True
+    return np.flatnonzero(suspect), missing
+
+
+def validate_bulk(df: pd.DataFrame, model: Optional[Type[BaseModel]] = None,
+                  schema: Optional[CompiledSchema] = None, max_row_checks: Optional[int] = DEFAULT_MAX_ROW_CHECKS,
+                  max_row_errors: int = 10) -> ValidationReport:
+    """Validate ``df`` against a pydantic ``model`` or a YAML ``schema`` without building a model per row.
+
+    The model (or schema) is turned into column-level checks over whole
+    arrays; only the rows those checks flag are validated with pydantic, which
+    has the final say (so values its lax mode coerces, like ``"1"`` for an
+    int, still pass) and provides the detailed messages. At most
+    ``max_row_checks`` flagged rows are validated row by row (None for all).
+    Missing values in Optional fields are validated as None.
+    """
+    if model is None:
+        if schema is None:
+            raise ValueError("validate_bulk needs a pydantic model or a schema")
+        model = model_from_schema(schema)
+        columns, nullable, per_row = dict(schema.columns), set(), []
+    else:
+        columns, nullable, per_row = schema_from_model(model)
+    report = ValidationReport(model.__name__, len(df), max_row_errors)
+    # Positional labels, so the checks can address rows of a frame with a duplicated index
+    frame = df.reset_index(drop=True)
+    if per_row or model.__pydantic_decorators__.model_validators:
+        logger.info(f"{model.__name__}: fields {per_row or 'with model validators'} are validated row by row")
+        positions, missing = np.arange(len(frame)), []
+        # Nothing was flagged, so nothing may be skipped
+        max_row_checks = None
+    else:
+        required = {field.alias or name for name, field in model.model_fields.items() if field.is_required()}
+        positions, missing = _candidate_positions(frame, columns, nullable, required, model.__name__)
+    labels = df.index
+    if missing:
+        # Every row lacks these fields, which says all there is to say
+        for col in missing:
+            report.add(col, 'missing', 'Field required', labels[:MAX_ROWS_PER_ERROR].tolist(), count=len(frame))
+        report.invalid_rows = len(frame)
+        return report
+    if max_row_checks is not None and len(positions) > max_row_checks:
+        unconfirmed = positions[max_row_checks:]
+        positions = positions[:max_row_checks]
+        report.unconfirmed_rows = len(unconfirmed)
+        report.unconfirmed = labels[unconfirmed[:MAX_ROWS_PER_ERROR]].tolist()
+    report.checked_rows = len(positions)
+    for start in range(0, len(positions), ROW_CHECK_BATCH):
+        batch = positions[start:start + ROW_CHECK_BATCH]
+        rows = frame.iloc[batch]
+        for col in nullable & set(rows.columns):
+            # Missing values of Optional fields validate as None
+            rows[col] = rows[col].astype(object).where(rows[col].notna(), None)
+        for position, record in zip(batch, rows.to_dict('records')):
+            try:
+                model(**record)
+            except ValidationError as e:
+                report.invalid_rows += 1
+                report.add_row(labels[position:position + 1].tolist()[0], e)
+    return report
@@ -1,13 +1,16 @@
 import importlib
 import pandas as pd
 from pydantic import BaseModel, ValidationError, create_model
-from typing import Any, Dict, Type
+from typing import Any, Dict, Optional, Type, Union
 import sys
 import os
 import logging
 import json
 import yaml
 import collections.abc
+from common.src.schema_utils.bulk_validation import validate_bulk
+from common.src.schema_utils.yaml_validator import load_schema
+from common.src.schema_utils.schema_inference import DEFAULT_CHUNKSIZE, DEFAULT_MODE, DEFAULT_ROWS, infer_schema
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,24 +30,21 @@ def infer_pydantic_type(dtype) -> Any:
         return str
 
 def infer_yaml_type(series):
-    # Try to infer if the column is a list or dict
-    sample = series.dropna().iloc[0] if not series.dropna().empty else None
-    if isinstance(sample, list):
-        # Infer type of list elements
-        if sample:
-            elem_type = type(sample[0]).__name__
-        else:
-            elem_type = 'Any'
-        return {'type': 'list', 'items': elem_type}
-    elif isinstance(sample, dict):
-        # Infer type of dict values (assume all same type)
-        if sample:
-            value_type = type(next(iter(sample.values()))).__name__
-        else:
-            value_type = 'Any'
-        return {'type': 'dict', 'values': value_type}
-    else:
-        return str(infer_pydantic_type(series.dtype).__name__)
+    # Every value is inspected, so list/dict element types and mixed columns are detected
+    columns, _ = infer_schema([series.to_frame()], mode='full')
+    return columns[series.name]
+
+def iter_dataloader_chunks(dataloader, chunksize: int, split: str = 'train'):
+    """Yield the dataloader's output in DataFrame chunks, streaming when the dataloader supports it."""
+    if getattr(dataloader, 'supports_streaming', False):
+        yield from dataloader.read_chunks(split, chunksize)
+        return
+    df = dataloader.get_data()
+    if not isinstance(df, pd.DataFrame):
+        yield df
+        return
+    for i in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[i:i+chunksize]
 
 def generate_pydantic_model_from_df(df: pd.DataFrame, model_name: str) -> Type[BaseModel]:
 
@@ -74,10 +74,11 @@ def save_model_code(model: Type[BaseModel], output_path: str):
 def generate_yaml_schema_from_df(df: pd.DataFrame, model_name: str, output_path: str):
     logger.debug(f"Generating YAML schema for model: {model_name}")
     if isinstance(df, pd.DataFrame):
+        columns, _ = infer_schema([df], mode='full')
         schema = {
             model_name: {
                 'type': 'dataframe',
-                'columns': {col: infer_yaml_type(df[col]) for col in df.columns}
+                'columns': columns
             }
         }
     elif isinstance(df, dict):
@@ -115,7 +116,8 @@ def validate_input(input_data: dict, input_model: Type[BaseModel]):
         logger.error(f"Input validation error: {e}")
         sys.exit(1)
 
-def validate_output(df:Any, output_model: Type[BaseModel]):
+def validate_output(df:Any, output_model: Union[Type[BaseModel], str], model_name: Optional[str] = None):
+    """Validate a DataFrame output against a pydantic model or a YAML schema path; returns the ValidationReport."""
     if output_model is None:
         logger.warning("No output model provided for validation.")
         return
@@ -126,15 +128,35 @@ def validate_output(df:Any, output_model: Type[BaseModel]):
         return
 
     if isinstance(df, pd.DataFrame):
-        for idx, row in df.iterrows():
-            try:
-                output_model(**row.to_dict())
-            except ValidationError as e:
-                logger.error(f"Output validation error in row {idx}: {e}")
+        if isinstance(output_model, str):
+            report = validate_bulk(df, schema=load_schema(output_model, model_name))
+        else:
+            report = validate_bulk(df, output_model)
+        if report.ok:
+            logger.debug(str(report))
+        else:
+            logger.error(f"Output validation errors in {report}")
+            for label, error in report.row_errors:
+                logger.debug(f"Output validation error in row {label}: {error}")
+        return report
+
 
 
+def save_yaml_schema(schema: dict, output_path: str):
+    logger.debug(f"Saving YAML schema to: {output_path}")
+    with open(output_path, 'w') as f:
+        yaml.dump(schema, f)
+    logger.info(f"YAML schema saved to {output_path}")
+
+def generate_io_models_from_dataloader(dataloader_module: str, dataloader_class_name: str, parameters: dict,
+                                       output_model_path: str, inference: dict = None):
+    """Infer the dataloader's output schema and write it as YAML next to ``output_model_path``.
 
-def generate_io_models_from_dataloader(dataloader_module: str, dataloader_class_name: str, parameters: dict, output_model_path: str):
+    ``inference`` bounds the work (see schema_inference.SchemaInferrer):
+    ``mode`` (head, reservoir or full), ``rows`` (row budget), ``chunksize``
+    and ``seed``. By default the first 100k rows are inspected.
+    """
+    inference = inference or {}
     module = importlib.import_module(dataloader_module)
     DataloaderClass = getattr(module, dataloader_class_name)
 
@@ -142,11 +164,10 @@ def generate_io_models_from_dataloader(dataloader_module: str, dataloader_class_
     # Validate input
     input_obj = validate_input(parameters, DataloaderClass)
 
-    # Get data
+    # Get data, in chunks and only as much as the inference budget needs
     dataloader = DataloaderClass(**parameters)
-    df = dataloader.get_data()
-
-    # logger.info(f"Data loaded with shape: {df.shape}")
+    chunks = iter_dataloader_chunks(dataloader, inference.get('chunksize', DEFAULT_CHUNKSIZE))
+    first = next(chunks, None)
 
     # Generate and save output model
     # OutputModel = generate_pydantic_model_from_df(df, DataloaderClass)
@@ -154,7 +175,18 @@ def generate_io_models_from_dataloader(dataloader_module: str, dataloader_class_
     # Generate and save YAML schema in the same directory as the output model
     yaml_output_path = os.path.join(os.path.dirname(output_model_path), os.path.splitext(os.path.basename(output_model_path))[0] + ".yaml")
     # yaml_output_path = output_model_path
-    generate_yaml_schema_from_df(df, dataloader_class_name, yaml_output_path)
+    if not isinstance(first, pd.DataFrame):
+        generate_yaml_schema_from_df(first, dataloader_class_name, yaml_output_path)
+    else:
+        def all_chunks():
+            yield first
+            yield from chunks
+        columns, report = infer_schema(all_chunks(), mode=inference.get('mode', DEFAULT_MODE),
+                                       rows=inference.get('rows', DEFAULT_ROWS), seed=inference.get('seed', 0))
+        chunks.close()
+        inspected = max((c['rows'] for c in report.values()), default=0)
+        logger.info(f"Inferred {len(columns)} column types from {inspected} rows ({inference.get('mode', DEFAULT_MODE)} mode)")
+        save_yaml_schema({dataloader_class_name: {'type': 'dataframe', 'columns': columns}}, yaml_output_path)
     # Validate output
     # validate_output(df, yaml_output_path)
     logger.info("Validation complete.")
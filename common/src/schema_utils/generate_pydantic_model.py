@@ -1,8 +1,9 @@
 import pandas as pd
-from pydantic import BaseModel, ValidationError, create_model
+from pydantic import BaseModel, create_model
 from typing import Any, Dict, Type
 import sys
 import os
+from common.src.schema_utils.bulk_validation import validate_bulk
 
 
 def infer_pydantic_type(dtype) -> Any:
@@ -31,12 +32,12 @@ def save_model_code(model: Type[BaseModel], output_path: str):
     print(f"Model code saved to {output_path}")
 
 def validate_dataframe(df: pd.DataFrame, model: Type[BaseModel]):
-    for idx, row in df.iterrows():
-        try:
-            model(**row.to_dict())
-        except ValidationError as e:
-            print(f"Validation error in row {idx}: {row.to_dict()}")
-            print(e)
+    report = validate_bulk(df, model)
+    for idx, error in report.row_errors:
+        print(f"Validation error in row {idx}: {df.loc[idx].to_dict()}")
+        print(error)
+    print(report)
+    return report
 
 if __name__ == "__main__":
     # Example usage: python generate_pydantic_model.py path/to/data.csv output_model.py
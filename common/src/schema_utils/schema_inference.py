@@ -0,0 +1,224 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODES = ('head', 'reservoir', 'full')
+DEFAULT_MODE = 'head'
+DEFAULT_ROWS = 100_000
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _kind_of_type(t: type) -> str:
+    # bool before int: bool is a subclass of int
+    if issubclass(t, (bool, np.bool_)):
+        return 'bool'
+    if issubclass(t, (int, np.integer)):
+        return 'int'
+    if issubclass(t, (float, np.floating)):
+        return 'float'
+    if issubclass(t, str):
+        return 'str'
+    if issubclass(t, (list, tuple)):
+        return 'list'
+    if issubclass(t, dict):
+        return 'dict'
+    return 'other'
+
+
+def _kinds(values: pd.Series) -> Set[str]:
+    """Kinds of the (non-null) Python values, classifying each distinct type once."""
+    return {_kind_of_type(t) for t in values.map(type).unique()}
+
+
+def _dtype_kind(dtype) -> Optional[str]:
+    """Kind implied by the dtype alone, or None when the values must be inspected."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _dtype_kind(dtype.categories.dtype)
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float'
+    if dtype == object:
+        return None
+    # Strings, and anything else the YAML schema has no name for, as before
+    return 'str'
+
+
+def merge_kinds(kinds: Set[str]) -> str:
+    """One YAML type name for a set of observed kinds: ints widen to float, anything else mixed is Any."""
+    if not kinds or 'other' in kinds:
+        return 'Any'
+    if kinds == {'int'}:
+        return 'int'
+    if kinds <= {'int', 'float'}:
+        return 'float'
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    return 'Any'
+
+
+class _Column:
+    def __init__(self):
+        self.kinds: Set[str] = set()
+        self.element_kinds: Set[str] = set()
+        self.rows = 0
+        self.nulls = 0
+
+    def observe(self, series: pd.Series, inspect_values: bool = True):
+        nulls = series.isna()
+        self.rows += len(series)
+        self.nulls += int(nulls.sum())
+        kind = _dtype_kind(series.dtype)
+        if kind is not None:
+            self.kinds.add(kind)
+        elif inspect_values:
+            self.observe_values(series[~nulls.to_numpy()])
+
+    def observe_values(self, values: pd.Series):
+        """Classify non-null object values, including the elements of list and dict values, in bulk."""
+        if values.empty:
+            return
+        types = values.map(type)
+        kinds = {t: _kind_of_type(t) for t in types.unique()}
+        self.kinds.update(kinds.values())
+        value_kinds = types.map(kinds)
+        lists = values[(value_kinds == 'list').to_numpy()]
+        if not lists.empty:
+            self._observe_elements(lists.explode())
+        dicts = values[(value_kinds == 'dict').to_numpy()]
+        if not dicts.empty:
+            self._observe_elements(dicts.map(lambda d: list(d.values())).explode())
+
+    def _observe_elements(self, elements: pd.Series):
+        # explode leaves NaN for empty containers; those contribute no element type
+        elements = elements[elements.notna().to_numpy()]
+        if not elements.empty:
+            self.element_kinds.update(_kinds(elements))
+
+    def yaml_type(self) -> Union[str, dict]:
+        if self.kinds == {'list'}:
+            return {'type': 'list', 'items': merge_kinds(self.element_kinds)}
+        if self.kinds == {'dict'}:
+            return {'type': 'dict', 'values': merge_kinds(self.element_kinds)}
+        return merge_kinds(self.kinds)
+
+    @property
+    def mixed(self) -> bool:
+        return len(self.kinds - {'int', 'float'}) > 1 or (bool(self.kinds & {'int', 'float'}) and
+                                                        bool(self.kinds - {'int', 'float'}))
+
+
+class SchemaInferrer:
+    """Infer a YAML dataframe schema from a stream of chunks within a row budget.
+
+    ``mode`` decides which rows are inspected:
+
+    - ``head``: the first ``rows`` rows; the stream is not read any further.
+    - ``reservoir``: every chunk's dtypes and null counts, plus the values of
+      object columns in a uniform random sample of ``rows`` rows.
+    - ``full``: every row.
+
+    Types merge across chunks: an int column that turns float in a later
+    chunk (e.g. because of missing values) becomes float, and a column with
+    values of several incompatible types becomes ``Any``. List and dict
+    element types are inferred from every inspected element.
+    """
+
+    def __init__(self, mode: str = DEFAULT_MODE, rows: Optional[int] = DEFAULT_ROWS, seed: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown schema inference mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.rows = rows
+        self.seen = 0
+        self.columns: Dict[str, _Column] = OrderedDict()
+        self._rng = np.random.default_rng(seed)
+        self._reservoir: Optional[pd.DataFrame] = None
+
+    @property
+    def done(self) -> bool:
+        return self.mode == 'head' and self.rows is not None and self.seen >= self.rows
+
+    def update(self, chunk: pd.DataFrame) -> bool:
+        """Fold ``chunk`` into the inferred types; returns False once no more chunks are needed."""
+        if self.done:
+            return False
+        if self.mode == 'head' and self.rows is not None:
+            chunk = chunk.iloc[:self.rows - self.seen]
+        sampling = self.mode == 'reservoir' and self.rows is not None
+        for col in chunk.columns:
+            self.columns.setdefault(col, _Column()).observe(chunk[col], inspect_values=not sampling)
+        if sampling:
+            self._sample(chunk)
+        self.seen += len(chunk)
+        return not self.done
+
+    def _sample(self, chunk: pd.DataFrame):
+        """Algorithm R over the object columns, one vectorized step per chunk."""
+        objects = chunk[[col for col in chunk.columns if chunk[col].dtype == object]]
+        if objects.shape[1] == 0:
+            return
+        if self._reservoir is not None:
+            # Columns that only became object-typed in this chunk are inspected here in full
+            new = [col for col in objects.columns if col not in self._reservoir.columns]
+            for col in new:
+                series = objects[col]
+                self.columns[col].observe_values(series[series.notna().to_numpy()])
+            objects = objects.drop(columns=new)
+        fill = max(0, min(self.rows - self.seen, len(objects)))
+        if fill:
+            head = objects.iloc[:fill]
+            self._reservoir = head if self._reservoir is None else pd.concat([self._reservoir, head])
+        rest = objects.iloc[fill:]
+        if rest.empty:
+            return
+        positions = np.arange(self.seen + fill, self.seen + len(objects))
+        slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+        accepted = slots < self.rows
+        if accepted.any():
+            reservoir = self._reservoir.reset_index(drop=True)
+            replacement = rest.iloc[np.flatnonzero(accepted)].reset_index(drop=True)
+            # Later rows win when several land in the same slot, as in the sequential algorithm
+            slots, last = np.unique(slots[accepted][::-1], return_index=True)
+            rows = len(replacement) - 1 - last
+            for col in reservoir.columns:
+                if col in replacement.columns:
+                    values = reservoir[col].to_numpy(dtype=object, copy=True)
+                    values[slots] = replacement[col].to_numpy(dtype=object)[rows]
+                    reservoir[col] = values
+            self._reservoir = reservoir
+
+    def finish(self) -> Dict[str, Union[str, dict]]:
+        """The ``columns`` mapping of the YAML schema."""
+        if self._reservoir is not None:
+            for col in self._reservoir.columns:
+                series = self._reservoir[col]
+                self.columns[col].observe_values(series[series.notna().to_numpy()])
+        schema = OrderedDict()
+        for col, state in self.columns.items():
+            schema[col] = state.yaml_type()
+            if state.mixed:
+                logger.warning(f"Column {col} mixes value types {sorted(state.kinds)}; typed as Any")
+        return dict(schema)
+
+    def report(self) -> Dict[str, dict]:
+        """Per-column inferred type, null count and whether types were mixed."""
+        return {col: {'type': state.yaml_type(), 'nullable': state.nulls > 0, 'nulls': state.nulls,
+                      'rows': state.rows, 'mixed': state.mixed}
+                for col, state in self.columns.items()}
+
+
+def infer_schema(chunks: Iterable[pd.DataFrame], mode: str = DEFAULT_MODE, rows: Optional[int] = DEFAULT_ROWS,
+                 seed: int = 0) -> Tuple[Dict[str, Any], Dict[str, dict]]:
+    """Infer the schema columns from ``chunks``; returns (columns, per-column report)."""
+    inferrer = SchemaInferrer(mode=mode, rows=rows, seed=seed)
+    for chunk in chunks:
+        if not inferrer.update(chunk):
+            break
+    return inferrer.finish(), inferrer.report()
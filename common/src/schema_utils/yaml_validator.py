@@ -0,0 +1,188 @@
+import os
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Python types accepted for each YAML type name (matched with isinstance semantics)
+_TYPE_NAMES = {'int': int, 'float': float, 'str': str, 'bool': bool, 'Any': object}
+
+
+class SchemaViolation(NamedTuple):
+    column: str
+    kind: str
+    message: str
+    rows: List[Any]
+
+    def __str__(self):
+        shown = self.rows[:10]
+        more = f" (+{len(self.rows) - len(shown)} more)" if len(self.rows) > len(shown) else ""
+        rows = f" rows={shown}{more}" if self.rows else ""
+        return f"[{self.column}] {self.message}{rows}"
+
+
+# Subclasses both so callers of the old row-by-row validator (which raised
+# ValueError for structure problems and TypeError for type problems) still work.
+class SchemaValidationError(TypeError, ValueError):
+    def __init__(self, schema_name: str, violations: List[SchemaViolation]):
+        self.schema_name = schema_name
+        self.violations = violations
+        details = "\n".join(f"  {v}" for v in violations)
+        super().__init__(f"{len(violations)} schema violation(s) for {schema_name}:\n{details}")
+
+
+def _bad_type_mask(values: pd.Series, expected: type) -> pd.Series:
+    """Mask of values whose Python type is not an instance of ``expected``.
+
+    isinstance is evaluated once per distinct type rather than once per value.
+    """
+    if expected is object:
+        return pd.Series(False, index=values.index)
+    types = values.map(type)
+    bad_types = [t for t in types.unique() if not issubclass(t, expected)]
+    return types.isin(bad_types)
+
+
+def _is_string_like_dtype(series) -> bool:
+    # Low-cardinality string columns may have been loaded as category
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.api.types.is_string_dtype(series.dtype.categories) or series.cat.categories.empty
+    # An all-null object column holds no values to infer a string dtype from; the
+    # same nulls pass when they sit in a string column. All-null float64 still fails
+    # (streamed chunks get the schema's str dtype pushed down, so they are not float64)
+    return pd.api.types.is_string_dtype(series) or (series.dtype == object and bool(series.isna().all()))
+
+
+class CompiledSchema:
+    """A dataframe schema parsed once and checked column-at-a-time."""
+
+    def __init__(self, name: str, columns: Dict[str, Union[str, dict]]):
+        self.name = name
+        self.columns = columns
+        self._checks = [(col, self._compile_column(col, typ)) for col, typ in columns.items()]
+
+    @classmethod
+    def from_dict(cls, schema: dict, model_name: Optional[str] = None) -> "CompiledSchema":
+        if model_name is None:
+            model_name = next(iter(schema))
+        model_schema = schema[model_name]
+        if model_schema['type'] != 'dataframe':
+            raise ValueError(f"Schema type {model_schema['type']} not supported for DataFrame validation.")
+        return cls(model_name, model_schema['columns'])
+
+    def _compile_column(self, col, typ):
+        if isinstance(typ, dict):
+            if typ['type'] == 'list':
+                return self._nested_check(col, list, 'list', typ.get('items', 'Any'), lambda v: v)
+            if typ['type'] == 'dict':
+                return self._nested_check(col, dict, 'dict', typ.get('values', 'Any'), lambda v: list(v.values()))
+            raise ValueError(f"Unsupported nested type: {typ['type']}")
+        if typ == 'int':
+            return self._scalar_check(col, 'int', pd.api.types.is_integer_dtype, int)
+        if typ == 'float':
+            return self._scalar_check(col, 'float', pd.api.types.is_float_dtype, float)
+        if typ == 'str':
+            return self._scalar_check(col, 'str', _is_string_like_dtype, str)
+        if typ == 'bool':
+            return self._scalar_check(col, 'bool', pd.api.types.is_bool_dtype, bool)
+        # Unknown scalar names are accepted as-is, like the previous validator did
+        return lambda series: []
+
+    @staticmethod
+    def _scalar_check(col, type_name, dtype_ok, py_type):
+        def check(series: pd.Series) -> List[SchemaViolation]:
+            if dtype_ok(series):
+                return []
+            # Find the offending rows so the report is actionable
+            nulls = series.isna()
+            if series.dtype == object:
+                bad = nulls | _bad_type_mask(series, py_type)
+            elif type_name == 'int' and pd.api.types.is_float_dtype(series):
+                values = series.to_numpy()
+                bad = nulls | pd.Series(np.floor(values) != values, index=series.index)
+            else:
+                bad = pd.Series(True, index=series.index)
+            return [SchemaViolation(col, 'dtype', f"Column {col} is not of type {type_name} (dtype {series.dtype})",
+                                    list(series.index[bad.to_numpy()]))]
+        return check
+
+    @staticmethod
+    def _nested_check(col, container, container_name, elem_type_name, elements):
+        elem_type = _TYPE_NAMES.get(elem_type_name, object)
+
+        def check(series: pd.Series) -> List[SchemaViolation]:
+            violations = []
+            positional = series.reset_index(drop=True)
+            not_container = _bad_type_mask(positional, container)
+            if not_container.any():
+                violations.append(SchemaViolation(col, 'type', f"Column {col} values are not {container_name}s",
+                                                  list(series.index[not_container.to_numpy()])))
+            if elem_type is object:
+                return violations
+            containers = positional[~not_container]
+            flat = containers.map(elements).explode()
+            # explode turns empty containers into NaN; those have no elements to check
+            nonempty = containers.map(len) > 0
+            flat = flat[flat.index.isin(containers.index[nonempty.to_numpy()])]
+            bad = _bad_type_mask(flat, elem_type)
+            if bad.any():
+                positions = np.unique(flat.index[bad.to_numpy()])
+                what = 'list elements' if container is list else 'dict values'
+                violations.append(SchemaViolation(col, 'element_type',
+                                                  f"Column {col} {what} are not of type {elem_type_name}",
+                                                  list(series.index[positions])))
+            return violations
+        return check
+
+    def validate(self, df: pd.DataFrame, sample: Optional[Union[int, float]] = None,
+                 seed: Optional[int] = None, columns: Optional[List[str]] = None) -> List[SchemaViolation]:
+        """Return every violation found in ``df``.
+
+        ``sample`` restricts the per-row checks to N random rows (int) or a
+        fraction of rows (float in (0, 1]); column presence is always checked.
+        ``columns`` limits validation to those schema columns (e.g. when only
+        a projection of the data was loaded).
+        """
+        if sample is not None and len(df):
+            if isinstance(sample, float) and 0 < sample <= 1:
+                df = df.sample(frac=sample, random_state=seed)
+            else:
+                df = df.sample(n=min(int(sample), len(df)), random_state=seed)
+        violations = []
+        for col, check in self._checks:
+            if columns is not None and col not in columns:
+                continue
+            if col not in df.columns:
+                violations.append(SchemaViolation(col, 'missing', f"Missing column: {col}", []))
+                continue
+            violations.extend(check(df[col]))
+        return violations
+
+    def check(self, df: pd.DataFrame, sample: Optional[Union[int, float]] = None, seed: Optional[int] = None,
+              columns: Optional[List[str]] = None):
+        """Validate ``df`` and raise SchemaValidationError listing all violations."""
+        violations = self.validate(df, sample=sample, seed=seed, columns=columns)
+        if violations:
+            raise SchemaValidationError(self.name, violations)
+
+
+_schema_cache: Dict[Tuple[str, Optional[str]], Tuple[int, CompiledSchema]] = {}
+
+
+def load_schema(yaml_path: str, model_name: Optional[str] = None) -> CompiledSchema:
+    """Compile the schema in ``yaml_path``, reusing the cached one while the file is unchanged."""
+    key = (os.path.abspath(yaml_path), model_name)
+    mtime = os.stat(yaml_path).st_mtime_ns
+    cached = _schema_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(yaml_path, 'r') as f:
+        schema = yaml.safe_load(f)
+    compiled = CompiledSchema.from_dict(schema, model_name)
+    _schema_cache[key] = (mtime, compiled)
+    logger.debug(f"Compiled schema {compiled.name} from {yaml_path}")
+    return compiled
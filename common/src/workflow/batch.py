@@ -0,0 +1,153 @@
+import os
+import glob
+import json
+import time
+import logging
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONFIG_EXTENSIONS = ('.yml', '.yaml')
+
+
+def discover_configs(spec: str) -> List[str]:
+    """Expand a config spec into config paths.
+
+    ``spec`` is a single config file, a directory of ``*.yml``/``*.yaml``
+    files, a glob pattern, or a JSONL manifest whose lines are either a path
+    string or an object with a ``config`` key.
+    """
+    if os.path.isdir(spec):
+        return sorted(
+            os.path.join(spec, name) for name in os.listdir(spec)
+            if name.endswith(CONFIG_EXTENSIONS)
+        )
+    if spec.endswith('.jsonl'):
+        configs = []
+        base_dir = os.path.dirname(spec)
+        with open(spec, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                path = entry if isinstance(entry, str) else entry['config']
+                if not os.path.isabs(path) and not os.path.exists(path):
+                    path = os.path.join(base_dir, path)
+                configs.append(path)
+        return configs
+    if any(ch in spec for ch in '*?['):
+        return sorted(glob.glob(spec, recursive=True))
+    return [spec]
+
+
+def is_batch_spec(spec: str) -> bool:
+    return os.path.isdir(spec) or spec.endswith('.jsonl') or any(ch in spec for ch in '*?[')
+
+
+class BatchRunner:
+    """Run many pipeline configs in one process.
+
+    Pipelines whose dataloader has the same class and params form a group.
+    All pipelines in a group load the union of the columns they need, and
+    they share one DatasetCache, so each distinct input is read once and
+    then fanned out to every dependent preprocessor chain and model.
+    Pipelines run concurrently on a thread pool.
+    """
+
+    def __init__(self, config_paths: List[str], workers: int = 1, use_cache: bool = True,
+                 refresh_stages: Optional[List[str]] = None, output_dir_for: Optional[Callable[[str], str]] = None,
+                 profile: bool = False):
+        # Imported here so that discovering configs does not load pandas
+        from common.src.dataloader.dataset_cache import DatasetCache
+        self.config_paths = config_paths
+        # Maps a config path to the directory its run report is written to
+        self.output_dir_for = output_dir_for
+        self.profile = profile
+        self.workers = max(1, workers)
+        self.use_cache = use_cache
+        self.refresh_stages = refresh_stages
+        self.dataset_cache = DatasetCache()
+        self.orchestrators = []
+        self.groups: Dict[str, List] = OrderedDict()
+        self.results = []
+
+    @staticmethod
+    def _group_key(config: dict) -> str:
+        dataloader_conf = config['dataloader']
+        return json.dumps([dataloader_conf['class'], dataloader_conf.get('params') or {}], sort_keys=True, default=str)
+
+    def plan(self):
+        """Build every pipeline and align projections within each dataloader group."""
+        from common.src.dataloader.projection import required_columns, schema_dtypes
+        from common.src.workflow.orchestrator import Orchestrator
+        for path in self.config_paths:
+            orchestrator = Orchestrator(path, use_cache=self.use_cache, refresh_stages=self.refresh_stages,
+                                        dataset_cache=self.dataset_cache,
+                                        output_dir=self.output_dir_for(path) if self.output_dir_for else None,
+                                        profile=self.profile)
+            orchestrator.setup_pipeline()
+            self.orchestrators.append(orchestrator)
+            self.groups.setdefault(self._group_key(orchestrator.config), []).append(orchestrator)
+
+        for members in self.groups.values():
+            if len(members) < 2:
+                continue
+            union = set()
+            for o in members:
+                pipeline = o.pipeline
+                columns = required_columns(pipeline['preprocessors'], pipeline['model'], pipeline['evaluator'])
+                if columns is None or union is None:
+                    union = None
+                else:
+                    union |= columns
+            # Identical projections give identical dataset cache keys, hence one load
+            columns = sorted(union) if union is not None else None
+            dtypes = schema_dtypes(members[0].config['dataloader'].get('output_schema'), columns)
+            for o in members:
+                o.prefer_shared_data = True
+                dataloader = o.pipeline['dataloader']
+                dataloader.set_projection(columns, dtypes, dataloader.optimize_dtypes, dataloader.category_threshold)
+
+        print(f"Batch plan: {len(self.orchestrators)} pipelines over {len(self.groups)} distinct dataloaders")
+        for key, members in self.groups.items():
+            dataloader_class, params = json.loads(key)
+            print(f"  {dataloader_class} {params}: {', '.join(o.config_path for o in members)}")
+
+    def _run_one(self, orchestrator) -> dict:
+        start = time.perf_counter()
+        entry = {
+            'config': orchestrator.config_path,
+            'model': orchestrator.config['model']['class'].rsplit('.', 1)[-1],
+        }
+        try:
+            entry['result'] = orchestrator.run()
+            entry['status'] = 'ok'
+        except Exception as e:
+            logger.error(f"Pipeline {orchestrator.config_path} failed:\n{traceback.format_exc()}")
+            entry['result'] = f"{type(e).__name__}: {e}"
+            entry['status'] = 'failed'
+        entry['seconds'] = time.perf_counter() - start
+        return entry
+
+    def run(self) -> List[dict]:
+        if not self.orchestrators:
+            self.plan()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.results = list(pool.map(self._run_one, self.orchestrators))
+        self.print_summary(time.perf_counter() - start)
+        return self.results
+
+    def print_summary(self, total_seconds: float):
+        width = max([len('config')] + [len(r['config']) for r in self.results])
+        print()
+        print(f"{'config':<{width}}  {'model':<20}  {'status':<7}  {'seconds':>8}  result")
+        for r in self.results:
+            print(f"{r['config']:<{width}}  {r['model']:<20}  {r['status']:<7}  {r['seconds']:>8.3f}  {r['result']}")
+        failed = sum(r['status'] != 'ok' for r in self.results)
+        print(f"{len(self.results)} pipelines, {failed} failed, {total_seconds:.3f}s total; "
+              f"dataset cache {self.dataset_cache.stats()}")
@@ -0,0 +1,16 @@
+import re
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+
+def parse_size(value) -> int:
+    """Parse a byte size such as 4096, '64MB' or '1.5 GB' into a number of bytes."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    number, unit = match.groups()
+    if unit and not unit.endswith('B'):
+        unit += 'B'
+    return int(float(number) * _SIZE_UNITS[unit])
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from common.src.workflow.registry import import_class
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILENAME = 'run_report.json'
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def count_rows(data: Any) -> Optional[int]:
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+def measure(instrumentation: Optional["RunInstrumentation"], stage: str, name: Optional[str] = None,
+            rows_in: Optional[int] = None):
+    """``instrumentation.measure(...)``, or a no-op context when instrumentation is off."""
+    if instrumentation is None:
+        return nullcontext(StageRecord(rows_in))
+    return instrumentation.measure(stage, name, rows_in)
+
+
+class InstrumentationHook:
+    """Receives metrics as they are recorded, e.g. to forward them to a metrics collector.
+
+    Configure hooks under ``instrumentation.hooks`` as ``{class, params}`` entries.
+    """
+
+    def on_stage(self, metrics: dict):
+        pass
+
+    def on_report(self, report: dict):
+        pass
+
+
+class StageRecord:
+    """Handle yielded by RunInstrumentation.measure; set ``rows_out`` before the block ends,
+    or ``discard`` when the block turned out not to be a real call (e.g. an exhausted reader)."""
+
+    def __init__(self, rows_in: Optional[int] = None):
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.discard = False
+
+
+class RunInstrumentation:
+    """Per-stage wall time, CPU time, row counts and memory for one pipeline run.
+
+    Repeated measurements of the same stage (e.g. a preprocessor applied to
+    every streamed chunk) are summed into one entry with a ``calls`` count.
+    CPU time is that of the measuring thread, so concurrent stages do not
+    count each other's work; peak RSS is process-wide. With ``trace_memory``
+    tracemalloc also reports the peak Python allocation during each stage,
+    which is only exact when stages do not overlap.
+    """
+
+    def __init__(self, trace_memory: bool = False, hooks: Optional[List[InstrumentationHook]] = None,
+                 profiler=None):
+        self.trace_memory = trace_memory
+        self.hooks = list(hooks or [])
+        # StageProfiler (see common.src.workflow.profiling) when profiling is on
+        self.profiler = profiler
+        self.stages: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # Per thread, the traced peak of each enclosing measure so far (see measure)
+        self._peaks = threading.local()
+        self._started = None
+        self._started_at = None
+
+    @classmethod
+    def from_config(cls, config: dict, profile: bool = False) -> Optional["RunInstrumentation"]:
+        """Build from the ``instrumentation`` and ``profile`` config sections; ``profile`` forces profiling on."""
+        from common.src.workflow.profiling import StageProfiler
+        conf = config.get('instrumentation') or {}
+        profiler = StageProfiler.from_config(config, enabled=profile)
+        if not conf.get('enabled', True) and profiler is None:
+            return None
+        hooks = []
+        for hook_conf in conf.get('hooks') or []:
+            hooks.append(import_class(hook_conf['class'])(**(hook_conf.get('params') or {})))
+        return cls(trace_memory=conf.get('tracemalloc', False), hooks=hooks, profiler=profiler)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().isoformat(timespec='seconds')
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.begin()
+
+    @contextmanager
+    def measure(self, stage: str, name: Optional[str] = None, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        record = StageRecord(rows_in)
+        key = f"{stage}:{name}" if name else stage
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # reset_peak would lose the enclosing stage's peak so far; keep it on the stack
+            stack = self._peak_stack()
+            if stack:
+                stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+            stack.append(0)
+            tracemalloc.reset_peak()
+        if self.profiler is not None:
+            self.profiler.start(key)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            if self.profiler is not None:
+                self.profiler.stop(key)
+            traced_peak = None
+            if tracing:
+                stack = self._peak_stack()
+                peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1] = max(stack[-1], peak)
+                traced_peak = peak / 1024 ** 2
+            if not record.discard:
+                self._record(stage, name, wall, cpu, record, traced_peak)
+
+    def _peak_stack(self) -> List[int]:
+        if not hasattr(self._peaks, 'stack'):
+            self._peaks.stack = []
+        return self._peaks.stack
+
+    def _record(self, stage, name, wall, cpu, record, traced_peak):
+        key = f"{stage}:{name}" if name else stage
+        with self._lock:
+            entry = self.stages.get(key)
+            if entry is None:
+                entry = self.stages[key] = {'stage': stage, 'name': name, 'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                            'rows_in': None, 'rows_out': None}
+            entry['calls'] += 1
+            entry['wall_s'] += wall
+            entry['cpu_s'] += cpu
+            for field in ('rows_in', 'rows_out'):
+                value = getattr(record, field)
+                if value is not None:
+                    entry[field] = (entry[field] or 0) + value
+            rows = entry['rows_out'] if entry['rows_out'] is not None else entry['rows_in']
+            entry['rows_per_s'] = rows / entry['wall_s'] if rows is not None and entry['wall_s'] > 0 else None
+            entry['peak_rss_mb'] = peak_rss_mb()
+            if traced_peak is not None:
+                entry['tracemalloc_peak_mb'] = max(entry.get('tracemalloc_peak_mb') or 0.0, traced_peak)
+            snapshot = dict(entry)
+        for hook in self.hooks:
+            try:
+                hook.on_stage(snapshot)
+            except Exception:
+                logger.exception(f"Instrumentation hook {type(hook).__name__} failed")
+
+    def report(self, **extra) -> dict:
+        wall = time.perf_counter() - self._started if self._started is not None else None
+        with self._lock:
+            stages = [dict(entry) for entry in self.stages.values()]
+        report = {
+            'started_at': self._started_at,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_s': wall,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': stages,
+        }
+        report.update(extra)
+        return report
+
+    def write_report(self, output_dir: str, **extra) -> dict:
+        """Write run_report.json into ``output_dir``, pass it to the hooks and return it."""
+        if self.profiler is not None:
+            extra['profile'] = self.profiler.dump(os.path.join(output_dir, 'profile'))
+        report = self.report(**extra)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, REPORT_FILENAME)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Run report written to {path}")
+        for hook in self.hooks:
+            try:
+                hook.on_report(report)
+            except Exception:
+                logger.exception(f"Instrumentation hook {type(hook).__name__} failed")
+        return report
+
+    def print_summary(self):
+        with self._lock:
+            stages = list(self.stages.values())
+        if not stages:
+            return
+        width = max(len(f"{e['stage']}:{e['name']}" if e['name'] else e['stage']) for e in stages)
+        print(f"{'stage':<{width}}  {'calls':>5}  {'wall_s':>8}  {'cpu_s':>8}  {'rows_out':>10}  {'rows/s':>12}")
+        for e in stages:
+            key = f"{e['stage']}:{e['name']}" if e['name'] else e['stage']
+            rows = e['rows_out'] if e['rows_out'] is not None else ''
+            rate = f"{e['rows_per_s']:.0f}" if e.get('rows_per_s') else ''
+            print(f"{key:<{width}}  {e['calls']:>5}  {e['wall_s']:>8.3f}  {e['cpu_s']:>8.3f}  {rows:>10}  {rate:>12}")
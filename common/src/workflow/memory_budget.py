@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+import shutil
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+from common.src.dataloader.spill import DEFAULT_SPILL_DIR, SpilledFrame, estimate_size, spill_frame
+from common.src.workflow.config_utils import parse_size
+
+logger = logging.getLogger(__name__)
+
+
+class _Held:
+    def __init__(self, name: Hashable, data: Any, size: int, on_spill: Optional[Callable[[SpilledFrame], None]],
+                 label: Optional[str] = None):
+        self.name = name
+        self.label = label or str(name)
+        self.data = data
+        self.size = size
+        self.on_spill = on_spill
+        self.spilled: Optional[SpilledFrame] = None
+
+
+class MemoryBudget:
+    """Estimated size of the intermediates a run holds, kept under ``limit`` bytes.
+
+    Owners ``admit`` what they hold (loaded splits, predictions). Whenever the
+    total goes over the limit, the least recently used DataFrames are written
+    to a columnar spill file under ``spill_dir`` (see SpilledFrame) until it
+    fits again. Each owner is handed the SpilledFrame through ``on_spill`` to
+    swap it in, and reloads it transparently when it is next needed. Frames
+    no later stage needs are ``release``d instead. Every spill and release
+    is printed and kept in ``events`` for the run report.
+    """
+
+    def __init__(self, limit, spill_dir: str = DEFAULT_SPILL_DIR):
+        self.limit = parse_size(limit)
+        # One directory per run, so concurrent runs never share spill files
+        self.spill_dir = os.path.join(spill_dir, f"{os.getpid()}_{secrets.token_hex(4)}")
+        self._held: Dict[Hashable, _Held] = OrderedDict()
+        self._lock = threading.Lock()
+        self._spills = 0
+        self.resident = 0
+        self.peak = 0
+        self.events: List[dict] = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["MemoryBudget"]:
+        """A budget from the config's ``memory_limit`` (and optional ``spill_dir``), or None."""
+        limit = config.get('memory_limit')
+        if limit is None:
+            return None
+        return cls(limit, spill_dir=config.get('spill_dir') or DEFAULT_SPILL_DIR)
+
+    def _event(self, action: str, name: Hashable, size: int, **details):
+        event = dict({'time': time.time(), 'action': action, 'name': str(name), 'mb': size / 1024 ** 2}, **details)
+        self.events.append(event)
+        where = f" to {details['path']}" if 'path' in details else ""
+        print(f"Memory budget: {action} {name} ({event['mb']:.1f} MB){where}; "
+              f"{self.resident / 1024 ** 2:.1f} of {self.limit / 1024 ** 2:.1f} MB held")
+
+    def admit(self, name: Hashable, data: Any, on_spill: Optional[Callable[[SpilledFrame], None]] = None,
+              label: Optional[str] = None) -> Any:
+        """Track ``data`` as held by the run; returns it, or its reloaded spill if it had to go straight to disk.
+
+        ``label`` is how events refer to it (default: ``str(name)``).
+        """
+        size = estimate_size(data)
+        with self._lock:
+            previous = self._held.pop(name, None)
+            if previous is not None:
+                self._drop(previous)
+            held = self._held[name] = _Held(name, data, size, on_spill, label)
+            self.resident += size
+            self.peak = max(self.peak, self.resident)
+            self._enforce()
+            if held.spilled is not None:
+                return held.spilled.load()
+        return data
+
+    def touch(self, name: Hashable):
+        """Mark ``name`` as just used, so it is spilled after everything older."""
+        with self._lock:
+            if name in self._held:
+                self._held.move_to_end(name)
+
+    def release(self, name: Hashable, reason: str = 'not needed downstream'):
+        """Forget ``name`` because no later stage needs it; its owner drops its reference."""
+        with self._lock:
+            held = self._held.pop(name, None)
+            if held is None:
+                return
+            was_spilled = held.spilled is not None
+            self._drop(held)
+            self._event('released', held.label, held.size, reason=reason, was_spilled=was_spilled)
+
+    def forget(self, name: Hashable):
+        """Stop tracking ``name`` without reporting it (e.g. a cache entry that was evicted)."""
+        with self._lock:
+            held = self._held.pop(name, None)
+            if held is not None:
+                self._drop(held)
+
+    def _drop(self, held: _Held):
+        if held.spilled is None:
+            self.resident -= held.size
+        else:
+            held.spilled.delete()
+        held.data = None
+
+    def _enforce(self):
+        """Spill the least recently used frames until the held total fits the limit."""
+        for held in list(self._held.values()):
+            if self.resident <= self.limit:
+                return
+            if held.spilled is not None or not isinstance(held.data, pd.DataFrame):
+                continue
+            self._spills += 1
+            try:
+                held.spilled = spill_frame(held.data, self.spill_dir, f"spill_{self._spills}")
+            except OSError as e:
+                logger.warning(f"Could not spill {held.label}: {e}")
+                continue
+            held.data = None
+            self.resident -= held.size
+            self._event('spilled', held.label, held.size, path=held.spilled.path, rows=held.spilled.rows,
+                        disk_mb=held.spilled.nbytes / 1024 ** 2)
+            if held.on_spill is not None:
+                held.on_spill(held.spilled)
+        if self.resident > self.limit:
+            logger.warning(f"Memory budget of {self.limit / 1024 ** 2:.1f} MB exceeded by data that cannot be spilled")
+
+    def stats(self) -> dict:
+        return {'limit_mb': self.limit / 1024 ** 2, 'held_mb': self.resident / 1024 ** 2,
+                'peak_held_mb': self.peak / 1024 ** 2,
+                'spilled': sum(1 for e in self.events if e['action'] == 'spilled'),
+                'released': sum(1 for e in self.events if e['action'] == 'released'),
+                'events': list(self.events)}
+
+    def close(self):
+        """Delete this run's spill files; frames already reloaded from them stay readable on POSIX."""
+        with self._lock:
+            for held in self._held.values():
+                self._drop(held)
+            self._held.clear()
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -1,36 +1,89 @@
 import yaml
-from importlib import import_module
 import pandas as pd
 import os
+import pickle
+from common.src.dataloader.batching import DEFAULT_PREFETCH
+from common.src.dataloader.dataset_cache import DatasetCache
+from common.src.dataloader.projection import apply_pushdown
+from common.src.model.fused_model import FusedModel, fused_model_conf, model_confs, model_name
+from common.src.schema_utils.yaml_validator import load_schema
+from common.src.workflow.instrumentation import RunInstrumentation, count_rows, measure
+from common.src.workflow.memory_budget import MemoryBudget
+from common.src.workflow.output_sinks import RunOutputs
+from common.src.workflow.partitioned import PartitionedExecutor
+from common.src.workflow.registry import import_class
+from common.src.workflow.stage_cache import (DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE, PipelineStageKeys, StageCache,
+                                              schema_fingerprint)
+from common.src.workflow.stage_validation import StageSchemaValidator
 
 class Orchestrator:
-    def __init__(self, config_path):
+    def __init__(self, config_path, use_cache=True, refresh_stages=None, dataset_cache=None, output_dir=None,
+                 profile=False):
+        self.config_path = config_path
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
+        if isinstance(self.config.get('model'), list):
+            # Models listed together share one dataloader and are computed in one scan
+            self.config['model'] = fused_model_conf(self.config['model'])
+        # run_report.json is written here when set
+        self.output_dir = output_dir
+        self.instrumentation = RunInstrumentation.from_config(self.config, profile=profile)
         self.pipeline = None
         self.dataloader_setup_model = {}
+        # A dataset cache passed in is shared with other pipelines (see BatchRunner)
+        # and outlives this run; our own is cleared at the start of every run.
+        self._owns_dataset_cache = dataset_cache is None
+        self.dataset_cache = dataset_cache if dataset_cache is not None else DatasetCache()
+        # memory_limit: held splits and predictions are released or spilled to disk to stay under it
+        self.memory_budget = MemoryBudget.from_config(self.config)
+        if self.memory_budget is not None and not self._owns_dataset_cache:
+            print("memory_limit only covers predictions: loaded data is held by the shared dataset cache")
+        # Set when other pipelines share this dataloader's data, so 'auto' does not stream
+        self.prefer_shared_data = False
+        # Persistent stage outputs (see the 'cache' section of the config)
+        cache_conf = self.config.get('cache') or {}
+        self.use_stage_cache = use_cache and cache_conf.get('enabled', True)
+        self.refresh_stages = list(refresh_stages or [])
+        self.stage_cache = None
+        self.stage_keys = None
 
     def _import_class(self, dotted_path):
-        module_path, class_name = dotted_path.rsplit('.', 1)
-        module = import_module(module_path)
-        return getattr(module, class_name)
+        # Resolved through the component index, once per process
+        return import_class(dotted_path)
 
     def setup_pipeline(self):
+        self.pipeline = self.build_pipeline(self.config)
+        self.dataloader_setup_model = self.pipeline['dataloader_args']
+
+    def build_pipeline(self, config):
+        """Instantiate the preprocessors, dataloader, model and evaluator described by ``config``."""
         # Instantiate preprocessors
         preprocessors = []
-        for preproc_conf in self.config.get('preprocessors', []):
+        for preproc_conf in config.get('preprocessors') or []:
             PreprocClass = self._import_class(preproc_conf['class'])
             preprocessors.append(PreprocClass(**preproc_conf.get('params', {})))
 
         # Get dataloader args from model config if present
-        model_conf = self.config['model']
-        self.dataloader_setup_model = model_conf.get('dataloader_args', {})
+        model_conf = config['model']
 
         # Instantiate dataloader
-        DataloaderClass = self._import_class(self.config['dataloader']['class'])
-        dataloader_parameters = self.config['dataloader'].get('params', {})
+        DataloaderClass = self._import_class(config['dataloader']['class'])
+        dataloader_parameters = dict(config['dataloader'].get('params') or {})
+        # A shared cache hit skips the stage validators, so pipelines share data
+        # only when they validate it against the same output schemas
+        cache_params = dict(dataloader_parameters,
+                            output_schema=schema_fingerprint(config['dataloader'].get('output_schema')))
+        preprocessors_key = [dict(conf, output_schema=schema_fingerprint(conf.get('output_schema')))
+                             for conf in config.get('preprocessors') or []]
         dataloader_parameters['preprocessors'] = preprocessors
         dataloader = DataloaderClass(**dataloader_parameters)
+        dataloader.instrumentation = self.instrumentation
+        dataloader.attach_cache(self.dataset_cache, cache_params, preprocessors_key)
+        if self.memory_budget is not None:
+            # Nothing reads the per-preprocessor outputs, they only hold memory
+            dataloader.keep_stage_outputs = False
+        # Dataloader and preprocessor outputs are validated as they are produced
+        dataloader.add_stage_listener(StageSchemaValidator(config, dataloader=dataloader))
 
 
         # Instantiate model
@@ -40,82 +93,246 @@ class Orchestrator:
         model = ModelClass(dataloader, split=split, **model_params)
 
         # Instantiate evaluator
-        EvaluatorClass = self._import_class(self.config['evaluator']['class'])
+        EvaluatorClass = self._import_class(config['evaluator']['class'])
         evaluator = EvaluatorClass(None, dataloader)  # predictions set after model.predict
+        evaluator.params = dict(config['evaluator'].get('params') or {})
+
+        # Only load the columns the model, evaluator and preprocessors declare they need
+        apply_pushdown(config, dataloader, preprocessors, model, evaluator)
 
-        self.pipeline = {
+        return {
             'preprocessors': preprocessors,
             'dataloader': dataloader,
             'model': model,
-            'evaluator': evaluator
+            'evaluator': evaluator,
+            'dataloader_args': model_conf.get('dataloader_args', {}),
         }
 
+    def _make_stage_cache(self, config, pipeline):
+        """Stage keys for ``pipeline`` and an on-disk stage cache attached to its dataloader, or (None, None)."""
+        if not self.use_stage_cache:
+            return None, None
+        cache_conf = self.config.get('cache') or {}
+        keys = PipelineStageKeys(config, pipeline['dataloader'], pipeline['preprocessors'],
+                                 pipeline['model'], content_hash=cache_conf.get('content_hash', False))
+        refresh_from = min((keys.stage_ordinal(name) for name in self.refresh_stages), default=None)
+        stage_cache = StageCache(cache_conf.get('dir', DEFAULT_CACHE_DIR),
+                                 cache_conf.get('max_size', DEFAULT_MAX_SIZE), refresh_from=refresh_from)
+        pipeline['dataloader'].attach_stage_cache(stage_cache, keys)
+        return stage_cache, keys
+
+    def _setup_stage_cache(self):
+        """Build this run's stage keys and attach the on-disk stage cache to the dataloader."""
+        self.stage_cache, self.stage_keys = self._make_stage_cache(self.config, self.pipeline)
+
+    def _train_model(self, model, config=None, stage_cache=None, stage_keys=None):
+        """Train, or restore a trained model from load_from or the stage cache; honour save_to."""
+        if config is None:
+            config, stage_cache, stage_keys = self.config, self.stage_cache, self.stage_keys
+        model_conf = config['model']
+        load_from = model_conf.get('load_from')
+        if load_from and os.path.exists(load_from):
+            with open(load_from, 'rb') as f:
+                model.set_state(pickle.load(f))
+            print(f"Loaded trained model from {load_from}")
+            return
+        model_key = stage_keys.model_key(model.split) if stage_cache else None
+        hit = False
+        if model_key:
+            hit, state = stage_cache.get(model_key, stage_keys.model_ordinal)
+        if hit:
+            model.set_state(state)
+            print("Restored trained model from stage cache")
+        else:
+            model.train()
+            if model_key:
+                stage_cache.put(model_key, model.get_state())
+        save_to = model_conf.get('save_to')
+        if save_to:
+            os.makedirs(os.path.dirname(save_to) or '.', exist_ok=True)
+            with open(save_to, 'wb') as f:
+                pickle.dump(model.get_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"Saved trained model to {save_to}")
+
     def validate_dataframe_with_yaml(self, df, yaml_path, model_name):
-        with open(yaml_path, 'r') as f:
-            schema = yaml.safe_load(f)
-        model_schema = schema[model_name]
-        if model_schema['type'] != 'dataframe':
-            raise ValueError(f"Schema type {model_schema['type']} not supported for DataFrame validation.")
-        expected_cols = model_schema['columns']
-        for col, typ in expected_cols.items():
-            if col not in df.columns:
-                raise ValueError(f"Missing column: {col}")
-            series = df[col]
-            if isinstance(typ, dict):
-                if typ['type'] == 'list':
-                    for idx, val in series.items():
-                        if not isinstance(val, list):
-                            raise TypeError(f"Row {idx} column {col} is not a list")
-                        if val and not all(isinstance(x, self._str_to_type(typ['items'])) for x in val):
-                            raise TypeError(f"Row {idx} column {col} list elements are not of type {typ['items']}")
-                elif typ['type'] == 'dict':
-                    for idx, val in series.items():
-                        if not isinstance(val, dict):
-                            raise TypeError(f"Row {idx} column {col} is not a dict")
-                        if val and not all(isinstance(x, self._str_to_type(typ['values'])) for x in val.values()):
-                            raise TypeError(f"Row {idx} column {col} dict values are not of type {typ['values']}")
-                else:
-                    raise ValueError(f"Unsupported nested type: {typ['type']}")
-            else:
-                # Check type by pandas dtype
-                if typ == 'int' and not pd.api.types.is_integer_dtype(series):
-                    raise TypeError(f"Column {col} is not of type int")
-                if typ == 'float' and not pd.api.types.is_float_dtype(series):
-                    raise TypeError(f"Column {col} is not of type float")
-                if typ == 'str' and not pd.api.types.is_string_dtype(series):
-                    raise TypeError(f"Column {col} is not of type str")
+        # Schemas are compiled once and cached by path and mtime
+        schema = load_schema(yaml_path, model_name)
+        validation_conf = self.config.get('validation') or {}
+        schema.check(df, sample=validation_conf.get('sample'), seed=validation_conf.get('seed'))
         print(f"DataFrame validated against YAML schema: {yaml_path}")
 
-    def _str_to_type(self, type_str):
-        # Helper to convert type name string to Python type
-        return {'int': int, 'float': float, 'str': str, 'Any': object}.get(type_str, object)
+    def _schema_name(self, yaml_path):
+        return os.path.splitext(os.path.basename(yaml_path))[0]
+
+    def use_streaming(self, pipeline=None):
+        """Stream the data in chunks when configured, or automatically when both model and dataloader support it."""
+        pipeline = pipeline or self.pipeline
+        mode = (self.config.get('execution') or {}).get('streaming', 'auto')
+        model = pipeline['model']
+        dataloader = pipeline['dataloader']
+        supported = getattr(model, 'supports_streaming', False) and getattr(dataloader, 'supports_streaming', False)
+        if mode == 'auto':
+            return supported and not self.prefer_shared_data
+        if mode and not getattr(model, 'supports_streaming', False):
+            raise ValueError(f"Streaming requested but {type(model).__name__} does not support it.")
+        return bool(mode)
+
+    def validate_predictions(self, config, predictions):
+        confs = model_confs(config)
+        if len(confs) > 1:
+            # A fused model's predictions are each member's, by name
+            for conf in confs:
+                self._validate_model_output(conf, predictions[model_name(conf)])
+        else:
+            self._validate_model_output(confs[0], predictions)
+
+    def _validate_model_output(self, model_conf, predictions):
+        model_output_schema = model_conf.get('output_schema')
+        if model_output_schema and os.path.exists(model_output_schema) and isinstance(predictions, pd.DataFrame):
+            with measure(self.instrumentation, 'validation', 'predictions', rows_in=len(predictions)):
+                self.validate_dataframe_with_yaml(predictions, model_output_schema,
+                                                  self._schema_name(model_output_schema))
+
+    def _finish_run(self, result, stage_caches=()):
+        """Print cache statistics, write the run report and delete spill files."""
+        print('Dataset cache:', self.dataset_cache.stats())
+        for stage_cache in stage_caches:
+            print('Stage cache:', stage_cache.stats())
+        memory = None
+        if self.memory_budget is not None:
+            memory = self.memory_budget.stats()
+            print(f"Memory budget: peak {memory['peak_held_mb']:.1f} of {memory['limit_mb']:.1f} MB held, "
+                  f"{memory['spilled']} spilled, {memory['released']} released")
+            self.dataset_cache.detach_budget()
+            self.memory_budget.close()
+        if self.instrumentation is None:
+            return
+        self.instrumentation.print_summary()
+        if self.output_dir or self.instrumentation.profiler is not None:
+            # Profiles always need somewhere to go
+            self.output_dir = self.output_dir or os.path.join('outputs', 'profile')
+            self.instrumentation.write_report(
+                self.output_dir, config=self.config_path, result=result,
+                dataset_cache=self.dataset_cache.stats(), memory=memory,
+                stage_cache=[stage_cache.stats() for stage_cache in stage_caches])
 
     def run(self):
+        if self.instrumentation is not None:
+            self.instrumentation.start()
+        if self.config.get('stage'):
+            return self.run_stages()
         model = self.pipeline['model']
         dataloader = self.pipeline['dataloader']
         evaluator = self.pipeline['evaluator']
-        # Validate dataloader output
-        if hasattr(dataloader, 'get_data'):
-            data = dataloader.get_data()
-            if isinstance(data, pd.DataFrame):
-                yaml_path = self.config['dataloader'].get('output_schema')
-                if yaml_path and os.path.exists(yaml_path):
-                    self.validate_dataframe_with_yaml(data, yaml_path, os.path.splitext(os.path.basename(yaml_path))[0])
-        # Validate preprocessor output (if any)
-        for idx, preproc in enumerate(self.pipeline['preprocessors']):
-            if hasattr(preproc, 'output_data'):
-                pdata = preproc.output_data
-                yaml_path = self.config['preprocessors'][idx].get('output_schema')
-                if yaml_path and os.path.exists(yaml_path) and isinstance(pdata, pd.DataFrame):
-                    self.validate_dataframe_with_yaml(pdata, yaml_path, os.path.splitext(os.path.basename(yaml_path))[0])
-        # Validate model output (predictions)
-        
+        # Datasets are cached for the duration of one run only
+        if self._owns_dataset_cache:
+            self.dataset_cache.clear()
+            if self.memory_budget is not None:
+                self.dataset_cache.attach_budget(self.memory_budget)
+                # Only this run's model reads the split, so the raw data is not held past preprocessing
+                dataloader.keep_raw = False
+        self._setup_stage_cache()
+        streaming = self.use_streaming()
+        # Dataloader and preprocessor outputs are validated by the stage listener
+        # when the split is loaded (once, then shared via the dataset cache)
         dataloader.setup(**self.dataloader_setup_model)
-        model.train()
-        predictions = model.predict()
-        model_output_schema = self.config['model'].get('output_schema')
-        if model_output_schema and os.path.exists(model_output_schema) and isinstance(predictions, pd.DataFrame):
-            self.validate_dataframe_with_yaml(predictions, model_output_schema, os.path.splitext(os.path.basename(model_output_schema))[0])
+        executor = PartitionedExecutor.from_config(self.config) if streaming else None
+        predictions_key = self.stage_keys.predictions_key(model.split) if self.stage_cache else None
+        cached = False
+        if predictions_key:
+            cached, predictions = self.stage_cache.get(predictions_key, self.stage_keys.predictions_ordinal)
+        partitions = executor.partitions(dataloader, model.split) if executor and not cached else None
+        model_name = type(model).__name__
+        if cached:
+            # Nothing upstream changed: skip loading, preprocessing, training and prediction
+            print("Restored predictions from stage cache")
+        elif partitions is not None:
+            # Multi-core path: workers parse, preprocess and partially aggregate their own partitions
+            with measure(self.instrumentation, 'train', model_name):
+                model.train_streaming()
+            with measure(self.instrumentation, 'predict', model_name) as record:
+                predictions = executor.run(model, partitions, self.stage_cache, self.stage_keys)
+                record.rows_out = count_rows(predictions)
+        elif streaming:
+            # Constant-memory path: each chunk is preprocessed, validated and folded into the model state
+            execution = self.config.get('execution') or {}
+            chunksize = execution.get('chunksize', 100_000)
+            # The next chunks are read and preprocessed in the background while the model folds this one
+            depth = execution.get('prefetch', DEFAULT_PREFETCH)
+            print(f"Streaming {type(dataloader).__name__} in chunks of {chunksize} rows")
+            with measure(self.instrumentation, 'train', model_name):
+                model.train_streaming()
+            with measure(self.instrumentation, 'predict', model_name) as record:
+                predictions = model.aggregate(dataloader.iter_chunks(model.split, chunksize, depth))
+                record.rows_out = count_rows(predictions)
+        else:
+            with measure(self.instrumentation, 'train', model_name):
+                self._train_model(model)
+            with measure(self.instrumentation, 'predict', model_name) as record:
+                predictions = model.predict()
+                record.rows_out = count_rows(predictions)
+        if predictions_key and not cached:
+            self.stage_cache.put(predictions_key, predictions)
+        if self.memory_budget is not None:
+            predictions = self._hold_predictions(model, dataloader, evaluator, predictions)
+        # Validate model output (predictions)
+        self.validate_predictions(self.config, predictions)
+        if isinstance(model, FusedModel):
+            # Each model's predictions are evaluated as if it had run alone
+            result = {name: self._evaluate(evaluator, member_predictions)
+                      for name, member_predictions in predictions.items()}
+        else:
+            result = self._evaluate(evaluator, predictions)
+        print('Evaluation result:', result)
+        self._write_outputs({'predictions': predictions},
+                            result if isinstance(model, FusedModel) else {model_name: result})
+        self._finish_run(result, [self.stage_cache] if self.stage_cache else [])
+        return result
+
+    def _write_outputs(self, predictions: dict, results: dict):
+        """Write predictions (by stream name) and results (by name) to the sinks of the ``output`` section."""
+        if not self.config.get('output'):
+            return
+        config_name = os.path.splitext(os.path.basename(self.config_path))[0]
+        self.output_dir = self.output_dir or os.path.join('outputs', config_name)
+        outputs = RunOutputs.from_config(self.config, self.output_dir)
+        try:
+            with measure(self.instrumentation, 'output'):
+                for name, stream in predictions.items():
+                    outputs.write_predictions(name, stream)
+                for name, result in results.items():
+                    outputs.write_result(name, result)
+        finally:
+            outputs.close()
+
+    def _hold_predictions(self, model, dataloader, evaluator, predictions):
+        """Release the split unless the evaluator reads it, and admit the predictions to the budget."""
+        # input_columns None (the default) means the evaluator may read all of the split
+        if self._owns_dataset_cache and evaluator.input_columns is not None and not evaluator.input_columns:
+            dataloader.release(model.split, reason='evaluator reads predictions only')
+        if isinstance(predictions, pd.DataFrame):
+            predictions = self.memory_budget.admit('predictions', predictions)
+        return predictions
+
+    def _evaluate(self, evaluator, predictions):
         evaluator.predictions = predictions
-        result = evaluator.evaluate()
-        print('Evaluation result:', result) 
\ No newline at end of file
+        with measure(self.instrumentation, 'evaluate', type(evaluator).__name__, rows_in=count_rows(predictions)):
+            return evaluator.evaluate()
+
+    def run_stages(self):
+        """Run the config's ``stage`` section as a DAG of load/train/predict/evaluate tasks."""
+        from common.src.workflow.stage_dag import StagePlanner
+        if self._owns_dataset_cache:
+            self.dataset_cache.clear()
+            if self.memory_budget is not None:
+                self.dataset_cache.attach_budget(self.memory_budget)
+        planner = StagePlanner(self)
+        scheduler = planner.scheduler()
+        scheduler.run()
+        scheduler.print_timeline()
+        results = planner.stage_results(scheduler.results)
+        print('Evaluation result:', results)
+        self._write_outputs({f"predictions_{task[len('predict:'):]}": value for task, value in scheduler.results.items()
+                             if task.startswith('predict:')}, results)
+        self._finish_run(results, [p['stage_cache'] for p in planner.pipelines.values() if p['stage_cache']])
+        return results
@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from common.src.dataloader.batching import iter_batches
+from common.src.workflow.registry import import_class
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = 100_000
+RESULTS_NAME = 'results'
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r'[^\w.@-]+', '_', name)
+
+
+def _json_default(value):
+    # Metrics are often numpy scalars (e.g. np.True_ from a comparison)
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _result_rows(results: List[tuple]) -> pd.DataFrame:
+    """One row per result name, with nested metrics flattened to ``a.b`` columns."""
+    rows = [dict({'name': name}, **(result if isinstance(result, dict) else {'result': result}))
+            for name, result in results]
+    return pd.json_normalize(rows)
+
+
+class OutputSink(ABC):
+    """Writes a run's predictions and evaluator results to one destination.
+
+    Predictions arrive as named streams (``predictions``, or one per model
+    or stage) and are written ``batch_rows`` rows at a time, so a large
+    frame is never rendered in one piece. Results are small; by default
+    they are collected and written together by ``write_results`` on close.
+    """
+
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+        self.output_dir = output_dir
+        self.batch_rows = batch_rows
+        self.paths: List[str] = []
+        self._results: List[tuple] = []
+
+    def _path(self, name: str, extension: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{_file_name(name)}.{extension}")
+        if path not in self.paths:
+            self.paths.append(path)
+        return path
+
+    def write(self, name: str, frame: pd.DataFrame):
+        for batch in iter_batches(frame, self.batch_rows):
+            self.write_batch(name, batch)
+
+    @abstractmethod
+    def write_batch(self, name: str, batch: pd.DataFrame):
+        pass
+
+    def write_result(self, name: str, result: Any):
+        self._results.append((name, result))
+
+    def write_results(self, results: pd.DataFrame):
+        pass
+
+    def close(self):
+        if self._results:
+            self.write_results(_result_rows(self._results))
+            self._results = []
+
+
+class CsvSink(OutputSink):
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS, **to_csv):
+        super().__init__(output_dir, batch_rows)
+        self.to_csv = to_csv
+        self._files: Dict[str, Any] = {}
+
+    def write_batch(self, name, batch):
+        f = self._files.get(name)
+        header = f is None
+        if header:
+            f = self._files[name] = open(self._path(name, 'csv'), 'w', newline='')
+        batch.to_csv(f, index=False, header=header, **self.to_csv)
+
+    def write_results(self, results):
+        results.to_csv(self._path(RESULTS_NAME, 'csv'), index=False)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        super().close()
+
+
+class JsonlSink(OutputSink):
+    """One JSON object per row; each result is appended to results.jsonl as soon as it exists."""
+
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+        super().__init__(output_dir, batch_rows)
+        self._files: Dict[str, Any] = {}
+
+    def _file(self, name):
+        if name not in self._files:
+            self._files[name] = open(self._path(name, 'jsonl'), 'w')
+        return self._files[name]
+
+    def write_batch(self, name, batch):
+        f = self._file(name)
+        f.write(batch.to_json(orient='records', lines=True, date_format='iso').rstrip('\n'))
+        f.write('\n')
+
+    def write_result(self, name, result):
+        f = self._file(RESULTS_NAME)
+        f.write(json.dumps({'name': name, 'result': result}, default=_json_default) + '\n')
+        f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        super().close()
+
+
+class ParquetSink(OutputSink):
+    """Each batch is a row group of ``<name>.parquet``; needs pyarrow."""
+
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS, compression: str = 'snappy'):
+        super().__init__(output_dir, batch_rows)
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(f"{type(self).__name__} requires the pyarrow package (pip install pyarrow)")
+        self.compression = compression
+        self._writers: Dict[str, Any] = {}
+
+    def _table(self, name, batch):
+        import pyarrow as pa
+        writer = self._writers.get(name)
+        # Later batches are cast to the first one's schema, e.g. an all-null column stays typed
+        return pa.Table.from_pandas(batch, preserve_index=False, schema=writer.schema if writer else None)
+
+    def _open(self, name, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self._path(name, 'parquet'), schema, compression=self.compression)
+
+    def write_batch(self, name, batch):
+        table = self._table(name, batch)
+        if name not in self._writers:
+            self._writers[name] = self._open(name, table.schema)
+        self._writers[name].write_table(table)
+
+    def write_results(self, results):
+        self.write_batch(RESULTS_NAME, results)
+        self._writers.pop(RESULTS_NAME).close()
+
+    def close(self):
+        super().close()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+class ArrowSink(ParquetSink):
+    """Each batch is a record batch of the Arrow IPC file ``<name>.arrow``; needs pyarrow."""
+
+    def __init__(self, output_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+        super().__init__(output_dir, batch_rows, compression=None)
+
+    def _open(self, name, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(self._path(name, 'arrow'), schema)
+
+
+class ConsoleSink(OutputSink):
+    """Prints the first ``rows`` rows of each stream and its row count, instead of whole frames."""
+
+    def __init__(self, output_dir: Optional[str] = None, batch_rows: int = DEFAULT_BATCH_ROWS, rows: int = 10):
+        super().__init__(output_dir, batch_rows)
+        self.rows = rows
+        self._heads: Dict[str, pd.DataFrame] = {}
+        self._counts: Dict[str, int] = {}
+
+    def write_batch(self, name, batch):
+        head = self._heads.get(name)
+        if head is None or len(head) < self.rows:
+            missing = self.rows - (0 if head is None else len(head))
+            self._heads[name] = pd.concat([head, batch.iloc[:missing]]) if head is not None else batch.iloc[:missing]
+        self._counts[name] = self._counts.get(name, 0) + len(batch)
+
+    def write_result(self, name, result):
+        # The orchestrator prints results already
+        pass
+
+    def close(self):
+        for name, head in self._heads.items():
+            total = self._counts[name]
+            shown = f", first {len(head)}" if len(head) < total else ""
+            print(f"{name} ({total:,} rows{shown}):")
+            print(head.to_string(index=False))
+        self._heads.clear()
+        self._counts.clear()
+
+
+FORMATS = {'csv': CsvSink, 'jsonl': JsonlSink, 'parquet': ParquetSink, 'arrow': ArrowSink, 'console': ConsoleSink}
+
+
+class RunOutputs:
+    """The output sinks of a run, from the config's ``output`` section.
+
+    Each entry is ``{format: csv|jsonl|parquet|arrow|console, params}`` or
+    ``{class, params}`` for an OutputSink subclass. Predictions may be a
+    frame, a Series or a dict of them by model name (a FusedModel's).
+    """
+
+    def __init__(self, sinks: List[OutputSink]):
+        self.sinks = sinks
+
+    @classmethod
+    def from_config(cls, config: dict, output_dir: str) -> Optional["RunOutputs"]:
+        confs = config.get('output')
+        if not confs:
+            return None
+        sinks = []
+        for conf in confs if isinstance(confs, list) else [confs]:
+            if 'class' in conf:
+                SinkClass = import_class(conf['class'])
+            elif conf.get('format') in FORMATS:
+                SinkClass = FORMATS[conf['format']]
+            else:
+                raise ValueError(f"Output entries need a class or a format of {sorted(FORMATS)}: {conf}")
+            sinks.append(SinkClass(output_dir, **(conf.get('params') or {})))
+        return cls(sinks)
+
+    def write_predictions(self, name: str, predictions: Any):
+        if isinstance(predictions, dict):
+            for member, member_predictions in predictions.items():
+                self.write_predictions(f"{name}_{member}", member_predictions)
+            return
+        if isinstance(predictions, pd.Series):
+            predictions = predictions.to_frame()
+        if not isinstance(predictions, pd.DataFrame):
+            logger.debug(f"Not writing {name}: {type(predictions).__name__} is not a frame")
+            return
+        for sink in self.sinks:
+            sink.write(name, predictions)
+
+    def write_result(self, name: str, result: Any):
+        for sink in self.sinks:
+            sink.write_result(name, result)
+
+    def close(self) -> List[str]:
+        """Finish every sink and return the files they wrote."""
+        paths = []
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                logger.exception(f"Output sink {type(sink).__name__} failed to close")
+            paths.extend(sink.paths)
+        if paths:
+            print(f"Outputs written: {', '.join(paths)}")
+        return paths
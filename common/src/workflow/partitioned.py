@@ -0,0 +1,153 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, List, Optional
+
+from common.src.dataloader.dataset_cache import DatasetCache
+from common.src.dataloader.shared_dataset import SharedPartition, registry, row_partitions
+from common.src.workflow.config_utils import parse_size
+from common.src.workflow.registry import import_class
+from common.src.workflow.stage_validation import StageSchemaValidator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION_SIZE = 64 * 1024 ** 2
+
+
+def _load_partition(dataloader, partition: Any) -> Any:
+    if isinstance(partition, SharedPartition):
+        return partition.load()
+    return dataloader.load_partition(partition)
+
+
+def _run_partition(spec: dict, partition: Any) -> Any:
+    """Worker entry point: load, validate and preprocess one partition and return the model's partial state.
+
+    Components are rebuilt from their config in the worker so that no live
+    objects (or loaded frames) have to be pickled across the process boundary.
+    """
+    config = spec['config']
+    preprocessors = [
+        import_class(conf['class'])(**conf.get('params', {}))
+        for conf in config.get('preprocessors') or []
+    ]
+    DataloaderClass = import_class(config['dataloader']['class'])
+    dataloader = DataloaderClass(preprocessors=preprocessors, **(config['dataloader'].get('params') or {}))
+    dataloader.set_projection(**spec['projection'])
+    dataloader.add_stage_listener(StageSchemaValidator(config, verbose=False, dataloader=dataloader))
+    data = dataloader.preprocess(_load_partition(dataloader, partition))
+    ModelClass = import_class(config['model']['class'])
+    model = ModelClass(dataloader, split=spec['split'], **(config['model'].get('params') or {}))
+    return model.partial(data)
+
+
+class PartitionedExecutor:
+    """Map a streaming model's partial aggregation over data partitions in a process pool.
+
+    With a stage cache, each partition's partial state is checkpointed as
+    soon as it finishes, so a run where some partitions failed resumes from
+    the finished ones. A single worker runs the partitions in-process.
+
+    With ``shared_memory``, the split is instead loaded once and published to
+    shared memory (also for dataloaders that cannot partition their source);
+    workers attach to it and take row ranges without copying, instead of
+    parsing their own partitions or receiving pickled frames.
+    """
+
+    def __init__(self, config: dict, workers: Optional[int] = None, partition_size=DEFAULT_PARTITION_SIZE,
+                 shared_memory: bool = False):
+        self.config = config
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_size = parse_size(partition_size)
+        self.shared_memory = shared_memory
+        self._published = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["PartitionedExecutor"]:
+        """Build an executor from the pipeline's ``execution`` section, or None when workers <= 1
+        (unless ``partitioned: true`` asks for per-partition runs in-process)."""
+        execution = config.get('execution') or {}
+        workers = execution.get('workers', 1)
+        if workers in (None, 1, 0):
+            if not execution.get('partitioned'):
+                return None
+            workers = 1
+        if workers == 'auto':
+            workers = None
+        return cls(config, workers=workers, partition_size=execution.get('partition_size', DEFAULT_PARTITION_SIZE),
+                   shared_memory=execution.get('shared_memory', False))
+
+    def partitions(self, dataloader, split: str) -> Optional[List[Any]]:
+        if not self.shared_memory:
+            return dataloader.partitions(split, self.partition_size)
+        params = dict(self.config['dataloader'].get('params') or {}, projection=dataloader.projection_key())
+        key = DatasetCache.make_key(type(dataloader), params, split)
+        shared = registry.publish(key, lambda: dataloader.load_raw(split))
+        # Released when run finishes
+        self._published.append(key)
+        return row_partitions(shared, self.partition_size)
+
+    def release(self):
+        """Drop this executor's references to the frames it published."""
+        while self._published:
+            registry.release(self._published.pop())
+
+    def run(self, model, partitions: List[Any], stage_cache=None, stage_keys=None) -> Any:
+        try:
+            return self._run(model, partitions, stage_cache, stage_keys)
+        finally:
+            self.release()
+
+    def _run(self, model, partitions: List[Any], stage_cache=None, stage_keys=None) -> Any:
+        spec = {'config': self.config, 'split': model.split, 'projection': model.dataloader.projection_key()}
+        keys = [stage_keys.partition_key(model.split, partition) if stage_cache else None
+                for partition in partitions]
+        partials: List[Any] = [None] * len(partitions)
+        todo = []
+        for idx, key in enumerate(keys):
+            hit = False
+            if key:
+                hit, partials[idx] = stage_cache.get(key, stage_keys.predictions_ordinal)
+            if not hit:
+                todo.append(idx)
+        if len(todo) < len(partitions):
+            print(f"Resuming: {len(partitions) - len(todo)} of {len(partitions)} partitions restored from checkpoints")
+
+        failures = []
+
+        def finished(idx, partial):
+            partials[idx] = partial
+            if keys[idx]:
+                stage_cache.put(keys[idx], partial)
+
+        workers = min(self.workers, max(len(todo), 1))
+        if workers == 1:
+            print(f"Running {len(todo)} partitions in-process")
+            dataloader = model.dataloader
+            for idx in todo:
+                try:
+                    data = dataloader.preprocess(_load_partition(dataloader, partitions[idx]))
+                    finished(idx, model.partial(data))
+                except Exception as e:
+                    failures.append((idx, e))
+        elif todo:
+            print(f"Running {len(todo)} partitions on {workers} worker processes")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_run_partition, spec, partitions[idx]): idx for idx in todo}
+                # Keep going past failures so every finished partition gets checkpointed
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    try:
+                        finished(idx, future.result())
+                    except Exception as e:
+                        failures.append((idx, e))
+        if failures:
+            idx, error = min(failures, key=lambda failure: failure[0])
+            resume = "; finished partitions are checkpointed, rerun to resume" if stage_cache else ""
+            raise RuntimeError(f"{len(failures)} of {len(partitions)} partitions failed, first {partitions[idx]}: "
+                               f"{error}{resume}") from error
+        # Combine in partition order, so non-commutative combines stay correct
+        state = model.init_state()
+        for partial in partials:
+            state = model.combine(state, partial)
+        return model.finalize(state)
@@ -0,0 +1,127 @@
+import io
+import os
+import re
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 30
+DEFAULT_SORT = 'cumulative'
+
+
+class StageProfiler:
+    """cProfile (and optionally tracemalloc) per pipeline stage, driven by RunInstrumentation.
+
+    Each stage gets its own profile; when stages nest (e.g. the load inside
+    train) the outer profile is paused, so every profile holds only its own
+    stage's time. Repeated calls of a stage, and calls from several threads,
+    are merged into one profile. ``dump`` writes, per stage, a ``.prof`` file
+    (for snakeviz/pstats), a top-N text summary and, with ``trace_memory``,
+    the top allocation sites at the end of the stage.
+    """
+
+    def __init__(self, top: int = DEFAULT_TOP, sort: str = DEFAULT_SORT, trace_memory: bool = False):
+        self.top = top
+        self.sort = sort
+        self.trace_memory = trace_memory
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._order: List[str] = []
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: dict, enabled: bool = False) -> Optional["StageProfiler"]:
+        """Build from the ``profile`` config key (``true`` or ``{enabled, top, sort, tracemalloc}``); ``enabled`` forces it on."""
+        conf = config.get('profile') or {}
+        if not isinstance(conf, dict):
+            conf = {'enabled': bool(conf)}
+        if not (enabled or conf.get('enabled', bool(conf))):
+            return None
+        return cls(top=conf.get('top', DEFAULT_TOP), sort=conf.get('sort', DEFAULT_SORT),
+                   trace_memory=conf.get('tracemalloc', False))
+
+    def begin(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def start(self, key: str):
+        stack = self._stack()
+        if stack and stack[-1] is not None:
+            stack[-1].disable()
+        with self._lock:
+            if key not in self._order:
+                self._order.append(key)
+            profile = self._profiles.setdefault((key, threading.get_ident()), cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows a single active profiler per process, so overlapping stages go unprofiled
+            logger.warning(f"Could not profile {key}: another profiler is active")
+            profile = None
+        stack.append(profile)
+
+    def stop(self, key: str):
+        stack = self._stack()
+        profile = stack.pop()
+        if profile is not None:
+            profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            with self._lock:
+                self._snapshots[key] = snapshot
+        if stack and stack[-1] is not None:
+            stack[-1].enable()
+
+    def _stats(self, key: str) -> Optional[pstats.Stats]:
+        stats = None
+        for (profile_key, _), profile in self._profiles.items():
+            if profile_key != key:
+                continue
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # A profile that never recorded anything has no stats
+                continue
+        return stats
+
+    def dump(self, directory: str) -> List[str]:
+        """Write the per-stage profiles into ``directory`` and return the paths written."""
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for idx, key in enumerate(self._order):
+            base = os.path.join(directory, f"{idx:02d}_{re.sub(r'[^A-Za-z0-9_.@-]+', '_', key)}")
+            stats = self._stats(key)
+            if stats is not None:
+                stats.dump_stats(base + '.prof')
+                summary = io.StringIO()
+                stats.stream = summary
+                stats.sort_stats(self.sort).print_stats(self.top)
+                with open(base + '.txt', 'w') as f:
+                    f.write(f"Stage {key}: top {self.top} by {self.sort}\n")
+                    f.write(summary.getvalue())
+                written += [base + '.prof', base + '.txt']
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                with open(base + '.mem.txt', 'w') as f:
+                    f.write(f"Stage {key}: top {self.top} allocation sites at the end of the stage\n")
+                    for stat in snapshot.statistics('lineno')[:self.top]:
+                        f.write(f"{stat}\n")
+                written.append(base + '.mem.txt')
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        print(f"Stage profiles written to {directory}")
+        return written
@@ -0,0 +1,178 @@
+import os
+import ast
+import json
+import logging
+import threading
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+COMPONENT_PACKAGE = 'shared'
+DEFAULT_INDEX_PATH = os.path.join('outputs', '.component_index.json')
+INDEX_VERSION = 1
+
+
+def _module_classes(path: str) -> List[str]:
+    """Top-level class names defined in the source file at ``path``, found without importing it."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+
+
+class ComponentRegistry:
+    """Index of the component classes under ``shared/`` and a per-process cache of resolved classes.
+
+    The index maps every top-level class in ``shared/**/*.py`` to its module.
+    It is built by parsing the sources (nothing is imported), persisted to
+    ``index_path`` and refreshed file by file when a file's size or mtime
+    changes. Resolving a class imports only the module that defines it, so a
+    package path such as ``shared.dataloaders.MyCsvDataloader`` or a bare
+    ``MyCsvDataloader`` does not pull in the package's other modules.
+    """
+
+    def __init__(self, root: str = PROJECT_ROOT, package: str = COMPONENT_PACKAGE,
+                 index_path: Optional[str] = DEFAULT_INDEX_PATH):
+        self.root = root
+        self.package = package
+        self.index_path = index_path
+        self._files: Optional[Dict[str, dict]] = None
+        self._by_name: Dict[str, List[str]] = {}
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, dict]:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable component index {self.index_path}: {e}")
+            return {}
+        if data.get('version') != INDEX_VERSION or data.get('root') != self.root:
+            return {}
+        return data.get('files', {})
+
+    def _save_index(self, files: Dict[str, dict]):
+        if not self.index_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+            tmp = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'version': INDEX_VERSION, 'root': self.root, 'files': files}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            # The index only saves parsing on the next start
+            logger.debug(f"Could not write component index {self.index_path}: {e}")
+
+    def refresh(self) -> Dict[str, dict]:
+        """Bring the index up to date with the sources, reparsing only files that changed."""
+        with self._lock:
+            stored = self._load_index() if self._files is None else self._files
+            files, changed = {}, False
+            package_dir = os.path.join(self.root, *self.package.split('.'))
+            for dirpath, dirnames, filenames in os.walk(package_dir):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith(('.', '__')))
+                for filename in sorted(filenames):
+                    if not filename.endswith('.py'):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    rel = os.path.relpath(path, self.root)
+                    stat = os.stat(path)
+                    entry = stored.get(rel)
+                    if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                        try:
+                            classes = _module_classes(path)
+                        except SyntaxError as e:
+                            # Left for the import to report if the module is ever used
+                            logger.warning(f"Could not index {rel}: {e}")
+                            classes = []
+                        module = os.path.splitext(rel)[0].replace(os.sep, '.')
+                        if module.endswith('.__init__'):
+                            module = module[:-len('.__init__')]
+                        entry = {'module': module, 'classes': classes,
+                                 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+                        changed = True
+                    files[rel] = entry
+            changed = changed or files.keys() != stored.keys()
+            if changed:
+                self._save_index(files)
+            self._files = files
+            by_name: Dict[str, List[str]] = {}
+            for entry in files.values():
+                # Re-exports in package __init__ files are imports, not class definitions, so a
+                # name maps to the module that defines it
+                for name in entry['classes']:
+                    by_name.setdefault(name, []).append(entry['module'])
+            self._by_name = by_name
+            return files
+
+    def modules_for(self, class_name: str, prefix: str = '') -> List[str]:
+        """Modules (under ``prefix``, if given) that define a class named ``class_name``."""
+        if self._files is None:
+            self.refresh()
+        return [module for module in self._by_name.get(class_name, [])
+                if not prefix or module == prefix or module.startswith(prefix + '.')]
+
+    def locate(self, path: str) -> Optional[str]:
+        """The module to import for ``path`` (dotted, or a bare class name), or None when it is not a component."""
+        module_path, _, class_name = path.rpartition('.')
+        if module_path and not (module_path == self.package or module_path.startswith(self.package + '.')):
+            return module_path
+        candidates = self.modules_for(class_name, prefix=module_path)
+        if module_path in candidates:
+            return module_path
+        if len(candidates) > 1:
+            raise ValueError(f"Component {path!r} is ambiguous; use one of "
+                             + ", ".join(f"{module}.{class_name}" for module in candidates))
+        if candidates:
+            return candidates[0]
+        return module_path or None
+
+    def check(self, path: str) -> Optional[str]:
+        """Why ``path`` cannot be resolved, or None; components are checked against the index without importing."""
+        try:
+            module_path = self.locate(path)
+        except ValueError as e:
+            return str(e)
+        class_name = path.rpartition('.')[2]
+        if module_path is None:
+            return f"No component class named {path!r} under {self.package}/"
+        if module_path == self.package or module_path.startswith(self.package + '.'):
+            if module_path not in self.modules_for(class_name):
+                return f"{module_path} defines no class {class_name!r}"
+            return None
+        try:
+            if find_spec(module_path) is None:
+                return f"No module named {module_path!r}"
+        except ImportError as e:
+            return str(e)
+        return None
+
+    def resolve(self, path: str) -> type:
+        """The class for ``path``, imported once per process."""
+        cls = self._classes.get(path)
+        if cls is not None:
+            return cls
+        module_path = self.locate(path)
+        if module_path is None:
+            raise ImportError(f"No component class named {path!r} under {self.package}/")
+        class_name = path.rpartition('.')[2]
+        try:
+            cls = getattr(import_module(module_path), class_name)
+        except AttributeError:
+            raise ImportError(f"Module {module_path} has no class {class_name!r}") from None
+        self._classes[path] = cls
+        return cls
+
+
+registry = ComponentRegistry()
+
+
+def import_class(path: str) -> type:
+    """Resolve a component class path from a config through the shared registry."""
+    return registry.resolve(path)
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import traceback
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from common.src.dataloader.dataset_cache import DatasetCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = os.path.join('outputs', 'mlwks.sock')
+DEFAULT_MAX_DATASETS = 16
+
+
+class PipelineServer:
+    """Long-running pipeline runner that keeps the process warm between runs.
+
+    Imports and resolved component modules stay loaded, and loaded datasets
+    are kept in a bounded DatasetCache shared by every run, so repeated runs
+    over the same input skip both interpreter startup and the data read.
+    Cached datasets are keyed by their source fingerprint, so an edited input
+    file is read again.
+
+    Requests are JSON objects::
+
+        {"id": "r1", "config": "pipelines/a.yml", "use_cache": true, "refresh_stages": ["model"],
+         "output_dir": "outputs/r1", "profile": false}
+
+    and each produces an ``accepted`` event followed by a ``done`` event with
+    the status, evaluation result (or error) and per-run timings. At most
+    ``max_concurrent`` runs execute at once; the rest queue.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_datasets: int = DEFAULT_MAX_DATASETS, use_cache: bool = True,
+                 output_dir_for: Optional[Callable[[str], str]] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        # Maps a config path to the directory its run report is written to
+        self.output_dir_for = output_dir_for
+        self.use_cache = use_cache
+        self.dataset_cache = DatasetCache(max_entries=max_datasets)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_concurrent)
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+        self._warm_up()
+
+    def _warm_up(self):
+        # Pay the heavy imports once, before the first request arrives
+        import pandas  # noqa: F401
+        import pydantic  # noqa: F401
+        from common.src.workflow import orchestrator  # noqa: F401
+
+    def _next_id(self) -> str:
+        with self._counter_lock:
+            self._counter += 1
+            return str(self._counter)
+
+    def run_request(self, request: dict, queued_at: Optional[float] = None) -> dict:
+        """Run one pipeline request and return its ``done`` event."""
+        from common.src.workflow.orchestrator import Orchestrator
+        start = time.perf_counter()
+        response = {'id': request.get('id'), 'event': 'done', 'config': request.get('config')}
+        timings = {'queued': start - queued_at if queued_at is not None else 0.0}
+        try:
+            if not request.get('config'):
+                raise ValueError("Request has no 'config'")
+            output_dir = request.get('output_dir')
+            if output_dir is None and self.output_dir_for:
+                output_dir = self.output_dir_for(request['config'])
+            o = Orchestrator(request['config'], use_cache=request.get('use_cache', self.use_cache),
+                             refresh_stages=request.get('refresh_stages'), dataset_cache=self.dataset_cache,
+                             output_dir=output_dir, profile=request.get('profile', False))
+            o.setup_pipeline()
+            # Materialized data is what stays warm between runs, so prefer it over streaming
+            o.prefer_shared_data = True
+            timings['setup'] = time.perf_counter() - start
+            run_start = time.perf_counter()
+            response['result'] = o.run()
+            timings['run'] = time.perf_counter() - run_start
+            response['status'] = 'ok'
+        except Exception as e:
+            logger.error(f"Request {response['id']} failed:\n{traceback.format_exc()}")
+            response['status'] = 'failed'
+            response['error'] = f"{type(e).__name__}: {e}"
+        timings['total'] = time.perf_counter() - start + timings['queued']
+        response['timings'] = {k: round(v, 6) for k, v in timings.items()}
+        response['dataset_cache'] = self.dataset_cache.stats()
+        return response
+
+    def submit(self, request: dict, emit: Callable[[dict], None]):
+        """Queue ``request``; ``emit`` receives its accepted and done events. Returns the future."""
+        request = dict(request)
+        if 'id' not in request:
+            request['id'] = request.get('request_id') or self._next_id()
+        queued_at = time.perf_counter()
+        emit({'id': request['id'], 'event': 'accepted', 'config': request.get('config')})
+        # Emit from the worker so the done event is written before the future completes
+        return self.pool.submit(lambda: emit(self.run_request(request, queued_at)))
+
+    def serve_socket(self, path: str = DEFAULT_SOCKET):
+        """Accept newline-delimited JSON requests on a Unix socket and stream events back."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                write_lock = threading.Lock()
+
+                def emit(event):
+                    line = (json.dumps(event, default=str) + '\n').encode()
+                    with write_lock:
+                        try:
+                            self.wfile.write(line)
+                            self.wfile.flush()
+                        except OSError:
+                            logger.warning(f"Client went away before event for request {event.get('id')}")
+
+                futures = []
+                for raw in self.rfile:
+                    line = raw.decode().strip()
+                    if not line:
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        emit({'event': 'error', 'error': f"Invalid JSON: {e}"})
+                        continue
+                    futures.append(server.submit(request, emit))
+                # Keep the connection open until every request sent on it has finished
+                for future in futures:
+                    future.exception()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)
+        print(f"Serving pipeline runs on unix socket {path} (max {self.max_concurrent} concurrent)")
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+            try:
+                unix_server.serve_forever()
+            except KeyboardInterrupt:
+                print("Shutting down")
+            finally:
+                os.unlink(path)
+                self.pool.shutdown(wait=True)
+
+    def serve_file(self, path: str, output_path: Optional[str] = None, poll_interval: float = 0.5,
+                   follow: bool = True):
+        """Tail a JSONL request file and append events to ``output_path``.
+
+        Requests whose id already has a ``done`` event in the output file are
+        skipped, so restarting the daemon resumes where it left off. With
+        ``follow=False`` the file is processed once and the call returns when
+        all runs are finished.
+        """
+        output_path = output_path or os.path.splitext(path)[0] + '.results.jsonl'
+        done = set()
+        if os.path.exists(output_path):
+            with open(output_path, 'r') as f:
+                for line in f:
+                    event = json.loads(line)
+                    if event.get('event') == 'done':
+                        done.add(event.get('id'))
+        write_lock = threading.Lock()
+        out = open(output_path, 'a')
+
+        def emit(event):
+            with write_lock:
+                out.write(json.dumps(event, default=str) + '\n')
+                out.flush()
+
+        print(f"Serving pipeline runs from {path} into {output_path} (max {self.max_concurrent} concurrent)")
+        futures = []
+        try:
+            for line_no, request in _read_jsonl(path, follow, poll_interval):
+                if 'id' not in request and 'request_id' not in request:
+                    # Line numbers are stable ids across restarts of the same file
+                    request['id'] = f"line-{line_no}"
+                if request.get('id', request.get('request_id')) in done:
+                    continue
+                futures.append(self.submit(request, emit))
+        except KeyboardInterrupt:
+            print("Shutting down")
+        finally:
+            for future in futures:
+                future.exception()
+            self.pool.shutdown(wait=True)
+            out.close()
+
+
+def _read_jsonl(path: str, follow: bool, poll_interval: float) -> Iterator[Tuple[int, dict]]:
+    """Yield ``(line_no, obj)`` per JSON line, waiting for new complete lines when following.
+
+    ``line_no`` is the physical line number, so blank and invalid lines do
+    not shift the numbers of the lines after them.
+    """
+    while follow and not os.path.exists(path):
+        time.sleep(poll_interval)
+    with open(path, 'r') as f:
+        pending = ''
+        line_no = 0
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if not pending.endswith('\n'):
+                # Partially written line; wait for the rest
+                continue
+            line_no += 1
+            line, pending = pending.strip(), ''
+            request = _parse_request(line, path, line_no)
+            if request is not None:
+                yield line_no, request
+        # A last line without a trailing newline
+        request = _parse_request(pending.strip(), path, line_no + 1)
+        if request is not None:
+            yield line_no + 1, request
+
+
+def _parse_request(line: str, path: str, line_no: int) -> Optional[dict]:
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        logger.error(f"Skipping invalid request line {line_no} in {path}: {e}")
+        return None
+
+
+def request(requests: Iterable[dict], path: str = DEFAULT_SOCKET) -> Iterator[dict]:
+    """Send ``requests`` to a running server and yield its events as they arrive."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        for req in requests:
+            sock.sendall((json.dumps(req) + '\n').encode())
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile('r') as f:
+            for line in f:
+                yield json.loads(line)
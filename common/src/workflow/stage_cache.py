@@ -0,0 +1,250 @@
+import os
+import json
+import pickle
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.src.dataloader.shared_dataset import SharedPartition
+from common.src.workflow.config_utils import parse_size
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('outputs', '.stage_cache')
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3
+
+
+def hash_key(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def class_fingerprint(cls) -> str:
+    """Hash of the source of ``cls`` and of its project base classes, so editing a component invalidates its outputs."""
+    sources = []
+    for klass in cls.__mro__:
+        if klass.__module__ in ('builtins', 'abc'):
+            continue
+        try:
+            sources.append(inspect.getsource(klass))
+        except (OSError, TypeError):
+            sources.append(f"{klass.__module__}.{klass.__qualname__}")
+    return hash_key(*sources)
+
+
+def model_fingerprint(model) -> str:
+    """class_fingerprint of a model, covering the member models a FusedModel runs."""
+    members = getattr(model, 'members', None)
+    if not members:
+        return class_fingerprint(type(model))
+    return hash_key(class_fingerprint(type(model)), *[class_fingerprint(type(m)) for m in members.values()])
+
+
+def fingerprint_file(path: str, content_hash: bool = False) -> dict:
+    """Size and mtime of ``path``, plus a SHA-256 of its content when requested."""
+    stat = os.stat(path)
+    fingerprint = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if content_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def schema_fingerprint(path: Optional[str]) -> Optional[dict]:
+    """Content fingerprint of an output_schema file, or None when there is none to validate against."""
+    if not path or not os.path.exists(path):
+        return None
+    return fingerprint_file(path, content_hash=True)
+
+
+class StageCache:
+    """Content-addressed on-disk store of stage outputs with size-based LRU eviction.
+
+    Each stage has an ordinal in pipeline order (dataloader 0, preprocessors
+    1..n, then model and predictions). ``refresh_from`` forces that stage and
+    everything after it to be recomputed even if its key is unchanged.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE,
+                 refresh_from: Optional[int] = None):
+        self.directory = directory
+        self.max_size = parse_size(max_size)
+        self.refresh_from = refresh_from
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str, ordinal: int) -> Tuple[bool, Any]:
+        path = self._path(key)
+        if (self.refresh_from is not None and ordinal >= self.refresh_from) or not os.path.exists(path):
+            self.misses += 1
+            return False, None
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Discarding unreadable stage cache entry {path}: {e}")
+            self.misses += 1
+            return False, None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted since it was read
+        self.hits += 1
+        return True, value
+
+    def put(self, key: str, value: Any):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Unique per process and thread: concurrent runs may write the same key
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.writes += 1
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_size."""
+        if not os.path.isdir(self.directory):
+            return
+        # Other threads and processes sharing the directory may evict or replace entries meanwhile
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            logger.info(f"Evicted stage cache entry {name}")
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+
+class PipelineStageKeys:
+    """Cache keys for every stage of one pipeline config.
+
+    A stage key hashes the upstream stage's key, the stage's class source and
+    its config, so any upstream change invalidates everything downstream.
+    Each key also covers the stage's output_schema file: restored outputs are
+    not validated again, so editing a schema must recompute the stage.
+    """
+
+    def __init__(self, config: dict, dataloader, preprocessors: List[Any], model, content_hash: bool = False):
+        self.config = config
+        self.dataloader = dataloader
+        self.preprocessors = preprocessors
+        self.model = model
+        self.content_hash = content_hash
+        self._data_keys: Dict[str, Optional[List[str]]] = {}
+
+    @property
+    def model_ordinal(self) -> int:
+        return len(self.preprocessors) + 1
+
+    @property
+    def predictions_ordinal(self) -> int:
+        return len(self.preprocessors) + 2
+
+    def stage_ordinal(self, name: str) -> int:
+        """Ordinal for a --refresh-stage name: dataloader, preprocessor:<i>, a preprocessor class name, model or predictions."""
+        if name == 'dataloader':
+            return 0
+        if name == 'model':
+            return self.model_ordinal
+        if name == 'predictions':
+            return self.predictions_ordinal
+        if name.startswith('preprocessor:'):
+            return int(name.split(':', 1)[1]) + 1
+        for idx, preproc in enumerate(self.preprocessors):
+            if type(preproc).__name__ == name:
+                return idx + 1
+        raise ValueError(f"Unknown stage: {name}")
+
+    def data_keys(self, split: str) -> Optional[List[str]]:
+        """Keys for the raw dataloader output and each preprocessor output, or None if the input cannot be fingerprinted."""
+        if split not in self._data_keys:
+            self._data_keys[split] = self._compute_data_keys(split)
+        return self._data_keys[split]
+
+    def _compute_data_keys(self, split: str) -> Optional[List[str]]:
+        fingerprint = self.dataloader.fingerprint(split, content_hash=self.content_hash)
+        if fingerprint is None:
+            return None
+        key = hash_key('dataloader', class_fingerprint(type(self.dataloader)),
+                       self.config['dataloader'].get('params') or {}, split, fingerprint,
+                       self.dataloader.projection_key(), schema_fingerprint(self.config['dataloader'].get('output_schema')))
+        keys = [key]
+        for preproc, conf in zip(self.preprocessors, self.config.get('preprocessors') or []):
+            key = self._preprocessor_key(key, preproc, conf)
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    def _preprocessor_key(key: str, preproc, conf: dict) -> str:
+        return hash_key('preprocessor', key, class_fingerprint(type(preproc)), conf.get('params') or {},
+                        schema_fingerprint(conf.get('output_schema')))
+
+    def model_key(self, split: str) -> Optional[str]:
+        keys = self.data_keys(split)
+        if keys is None:
+            return None
+        return hash_key('model', keys[-1], model_fingerprint(self.model),
+                        self.config['model'].get('params') or {}, split)
+
+    def predictions_key(self, split: str, model_key: Optional[str] = None) -> Optional[str]:
+        """Key for the predictions on ``split``.
+
+        ``model_key`` identifies a model trained by another pipeline (e.g. a
+        stage DAG's train stage); the key then also covers this pipeline's data.
+        """
+        if model_key is None:
+            model_key = self.model_key(split)
+            return hash_key('predictions', model_key, split) if model_key else None
+        keys = self.data_keys(split)
+        if keys is None:
+            return None
+        return hash_key('predictions', model_key, keys[-1], model_fingerprint(self.model),
+                        self.config['model'].get('params') or {}, split)
+
+    def partition_key(self, split: str, partition: Any) -> Optional[str]:
+        """Key for the model's partial state over one partition.
+
+        It covers only that partition's source, so a run that failed on one
+        partition resumes from the others even after the failed one is fixed.
+        """
+        if isinstance(partition, SharedPartition):
+            # A row range of the split published from the dataloader's source
+            source = self.dataloader.fingerprint(split, content_hash=self.content_hash)
+            fingerprint = None if source is None else dict(source, rows=[partition.start, partition.stop])
+        else:
+            fingerprint = self.dataloader.partition_fingerprint(partition, content_hash=self.content_hash)
+        if fingerprint is None:
+            return None
+        key = hash_key('partition', class_fingerprint(type(self.dataloader)),
+                       self.config['dataloader'].get('params') or {}, split, fingerprint,
+                       self.dataloader.projection_key(), schema_fingerprint(self.config['dataloader'].get('output_schema')))
+        for preproc, conf in zip(self.preprocessors, self.config.get('preprocessors') or []):
+            key = self._preprocessor_key(key, preproc, conf)
+        return hash_key('partial', key, model_fingerprint(self.model),
+                        self.config['model'].get('params') or {}, split)
@@ -0,0 +1,372 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common.src.dataloader.batching import DEFAULT_PREFETCH
+from common.src.model.fused_model import model_confs
+from common.src.workflow.instrumentation import count_rows, measure
+from common.src.workflow.partitioned import PartitionedExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGE_WORKERS = 4
+
+
+class StageTask:
+    """One node of the stage DAG: ``fn`` is called with the results of ``deps``, in order."""
+
+    def __init__(self, name: str, fn: Callable[..., Any], deps: Optional[List[str]] = None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps or [])
+
+
+class StageScheduler:
+    """Run a DAG of StageTasks on a thread pool, each as soon as its dependencies finish.
+
+    Every task runs exactly once, so a result several tasks depend on is
+    computed once and shared. ``timeline`` records when each task ran.
+    """
+
+    def __init__(self, tasks: List[StageTask], workers: int = DEFAULT_STAGE_WORKERS):
+        self.tasks: Dict[str, StageTask] = OrderedDict((task.name, task) for task in tasks)
+        for task in self.tasks.values():
+            missing = [dep for dep in task.deps if dep not in self.tasks]
+            if missing:
+                raise ValueError(f"Stage task {task.name} depends on unknown tasks {missing}")
+        self.workers = max(1, workers)
+        self.results: Dict[str, Any] = {}
+        self.timeline: Dict[str, Tuple[float, float, str]] = {}
+        self._t0 = None
+
+    def _execute(self, task: StageTask):
+        start = time.perf_counter()
+        try:
+            return task.fn(*[self.results[dep] for dep in task.deps])
+        finally:
+            self.timeline[task.name] = (start - self._t0, time.perf_counter() - self._t0,
+                                        threading.current_thread().name)
+
+    def run(self) -> Dict[str, Any]:
+        self._t0 = time.perf_counter()
+        remaining = {name: set(task.deps) for name, task in self.tasks.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        for name, task in self.tasks.items():
+            for dep in task.deps:
+                dependents[dep].append(name)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stage') as pool:
+            def launch_ready():
+                for name in [n for n, deps in remaining.items() if not deps]:
+                    del remaining[name]
+                    running[pool.submit(self._execute, self.tasks[name])] = name
+
+            launch_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in running:
+                            other.cancel()
+                        raise RuntimeError(f"Stage task {name} failed: {error}") from error
+                    self.results[name] = future.result()
+                    for dependent in dependents[name]:
+                        remaining[dependent].discard(name)
+                launch_ready()
+        if remaining:
+            raise ValueError(f"Stage DAG has a cycle through {sorted(remaining)}")
+        return self.results
+
+    def critical_path(self) -> List[str]:
+        """The chain of tasks that determined the total wall time, first to last."""
+        if not self.timeline:
+            return []
+        name = max(self.timeline, key=lambda n: self.timeline[n][1])
+        path = [name]
+        while self.tasks[name].deps:
+            # The dependency that finished last is the one this task waited for
+            name = max(self.tasks[name].deps, key=lambda n: self.timeline[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def print_timeline(self, width: int = 40):
+        if not self.timeline:
+            return
+        total = max(end for _, end, _ in self.timeline.values()) or 1e-9
+        critical = set(self.critical_path())
+        name_width = max(len(name) for name in self.timeline)
+        print("Stage timeline (* = critical path):")
+        for name, (start, end, thread) in sorted(self.timeline.items(), key=lambda item: item[1][0]):
+            lo = int(start / total * width)
+            hi = max(lo + 1, int(end / total * width))
+            bar = ' ' * lo + '#' * (hi - lo) + ' ' * (width - hi)
+            mark = '*' if name in critical else ' '
+            print(f" {mark} {name:<{name_width}}  |{bar}|  {start:8.3f}s +{end - start:8.3f}s  {thread}")
+        print(f"Critical path: {' -> '.join(self.critical_path())} ({total:.3f}s)")
+
+
+class StagePlanner:
+    """Turn a config's ``stage`` section into a StageScheduler.
+
+    Each stage names a model, optional preprocessors (by name; all of the
+    config's when omitted), ``dataloader_args`` (``split`` plus dataloader
+    setup args) and one or a list of evaluators::
+
+        stage:
+          train:
+            model: MeanScoreModel
+            dataloader_args: {split: train}
+            evaluator: {name: PrintEvaluator}
+          eval:
+            model: MeanScoreModel
+            dataloader_args: {split: eval}
+            evaluator: [{name: PrintEvaluator}, {name: ScoreThresholdEvaluator}]
+
+    A stage is a ``train`` stage when its ``type`` (or, without one, its name)
+    says so, and an evaluation stage otherwise. Both predict on their split
+    and run their evaluators; evaluation stages use the model trained by the
+    model's train stage, or train it on the model's configured split when
+    there is none. Components are looked up by ``name`` (default: class name)
+    in the ``model``/``models``, ``evaluator``/``evaluators`` and
+    ``preprocessors`` sections. A stage's ``model_args`` update the model's
+    params (evaluation stages use the train stage with the same model and
+    model_args), and an evaluator entry's ``evaluator_args`` update that
+    evaluator's params (see BaseEvaluator.params).
+
+    The tasks are ``load``, ``train``, ``predict`` and ``evaluate``, and tasks
+    with the same inputs are shared, e.g. two stages that evaluate one model
+    on one split share a single prediction.
+    """
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.config = orchestrator.config
+        # A model list is fused for plain runs; stages pick its models by name
+        self.models = self._by_name(model_confs(self.config) + list(self.config.get('models') or []))
+        self.evaluators = self._by_name([self.config['evaluator']] + list(self.config.get('evaluators') or []))
+        self.preprocessors = self._by_name(self.config.get('preprocessors') or [])
+        self.default_model = next(iter(self.models))
+        self.tasks: Dict[str, StageTask] = OrderedDict()
+        self.pipelines: Dict[str, dict] = {}
+        self._labels: Dict[str, str] = {}
+        # model name and model_args -> (train task name, its pipeline)
+        self.train_tasks: Dict[str, Tuple[str, dict]] = {}
+        # stage name -> [(evaluator name, evaluate task name)]
+        self.stage_evaluations: Dict[str, List[Tuple[str, str]]] = OrderedDict()
+
+    @staticmethod
+    def _name(conf: dict) -> str:
+        return conf.get('name') or conf['class'].rsplit('.', 1)[-1]
+
+    def _by_name(self, confs: List[dict]) -> Dict[str, dict]:
+        return OrderedDict((self._name(conf), conf) for conf in confs)
+
+    @staticmethod
+    def _is_train(name: str, stage_conf: dict) -> bool:
+        return (stage_conf.get('type') or name).startswith('train')
+
+    @staticmethod
+    def _model_id(model_name: str, model_args: dict) -> str:
+        return json.dumps([model_name, model_args], sort_keys=True, default=str)
+
+    def _stage_config(self, model_name: str, split: str, preprocessors: Optional[List[str]],
+                      dataloader_args: dict, model_args: dict) -> Tuple[str, dict]:
+        if model_name not in self.models:
+            raise ValueError(f"Stage references unknown model {model_name}")
+        if preprocessors is None:
+            preproc_confs = list(self.config.get('preprocessors') or [])
+        else:
+            unknown = [name for name in preprocessors if name not in self.preprocessors]
+            if unknown:
+                raise ValueError(f"Stage references unknown preprocessors {unknown}")
+            preproc_confs = [self.preprocessors[name] for name in preprocessors]
+        model_conf = self.models[model_name]
+        config = dict(self.config, preprocessors=preproc_confs,
+                      model=dict(model_conf, split=split, dataloader_args=dataloader_args,
+                                 params=dict(model_conf.get('params') or {}, **model_args)))
+        # Stages with identical inputs share one pipeline; the label names it in the timeline
+        key = json.dumps([model_name, split, [self._name(c) for c in preproc_confs], dataloader_args, model_args],
+                         sort_keys=True, default=str)
+        if key not in self._labels:
+            label = f"{model_name}@{split}"
+            if preprocessors is not None and [self._name(c) for c in preproc_confs] != list(self.preprocessors):
+                label += f"[{','.join(preprocessors) or 'raw'}]"
+            taken = set(self._labels.values())
+            base, n = label, 1
+            while label in taken:
+                n += 1
+                label = f"{base}#{n}"
+            self._labels[key] = label
+        return self._labels[key], config
+
+    def _pipeline(self, label: str, config: dict) -> dict:
+        """Build (once) the pipeline for ``label`` together with its load task."""
+        if label not in self.pipelines:
+            o = self.orchestrator
+            pipeline = o.build_pipeline(config)
+            stage_cache, keys = o._make_stage_cache(config, pipeline)
+            pipeline.update(config=config, stage_cache=stage_cache, stage_keys=keys,
+                            streaming=o.use_streaming(pipeline))
+            self.pipelines[label] = pipeline
+            if not pipeline['streaming']:
+                self._add(StageTask(f"load:{label}", lambda p=pipeline: self._load(p)))
+        return self.pipelines[label]
+
+    def _add(self, task: StageTask) -> str:
+        self.tasks.setdefault(task.name, task)
+        return task.name
+
+    def _data_deps(self, label: str) -> List[str]:
+        return [] if self.pipelines[label]['streaming'] else [f"load:{label}"]
+
+    @staticmethod
+    def _load(pipeline: dict):
+        dataloader = pipeline['dataloader']
+        dataloader.setup(**pipeline['dataloader_args'])
+        dataloader.load(pipeline['model'].split)
+
+    def _train(self, pipeline: dict, *_):
+        model = pipeline['model']
+        with measure(self.orchestrator.instrumentation, 'train', f"{type(model).__name__}@{model.split}"):
+            if pipeline['streaming']:
+                model.train_streaming()
+            else:
+                self.orchestrator._train_model(model, pipeline['config'], pipeline['stage_cache'],
+                                               pipeline['stage_keys'])
+        return model.get_state()
+
+    @staticmethod
+    def _predictions_key(pipeline: dict, train_pipeline: dict) -> Optional[str]:
+        keys, split = pipeline['stage_keys'], pipeline['model'].split
+        if pipeline['stage_cache'] is None:
+            return None
+        if train_pipeline is pipeline:
+            return keys.predictions_key(split)
+        # The model was trained on another pipeline's data, which the key must cover too
+        train_model = train_pipeline['model']
+        model_key = train_pipeline['stage_keys'].model_key(train_model.split)
+        return keys.predictions_key(split, model_key) if model_key else None
+
+    def _predict(self, pipeline: dict, train_pipeline: dict, state: dict, *_):
+        model = pipeline['model']
+        # The trained state carries the training split; keep this pipeline's own
+        model.set_state({k: v for k, v in state.items() if k != 'split'})
+        stage_cache, keys = pipeline['stage_cache'], pipeline['stage_keys']
+        predictions_key = self._predictions_key(pipeline, train_pipeline)
+        if predictions_key:
+            hit, predictions = stage_cache.get(predictions_key, keys.predictions_ordinal)
+            if hit:
+                self.orchestrator.validate_predictions(pipeline['config'], predictions)
+                return predictions
+        with measure(self.orchestrator.instrumentation, 'predict', f"{type(model).__name__}@{model.split}") as record:
+            if pipeline['streaming']:
+                config = pipeline['config']
+                executor = PartitionedExecutor.from_config(config)
+                partitions = executor.partitions(pipeline['dataloader'], model.split) if executor else None
+                if partitions is not None:
+                    predictions = executor.run(model, partitions, stage_cache, keys)
+                else:
+                    execution = config.get('execution') or {}
+                    predictions = model.predict_streaming(model.split, execution.get('chunksize', 100_000),
+                                                          execution.get('prefetch', DEFAULT_PREFETCH))
+            else:
+                predictions = model.predict()
+            record.rows_out = count_rows(predictions)
+        if predictions_key:
+            stage_cache.put(predictions_key, predictions)
+        self.orchestrator.validate_predictions(pipeline['config'], predictions)
+        return predictions
+
+    def _evaluate(self, pipeline: dict, evaluator_conf: dict, predictions):
+        EvaluatorClass = self.orchestrator._import_class(evaluator_conf['class'])
+        evaluator = EvaluatorClass(predictions, pipeline['dataloader'])
+        evaluator.params = dict(evaluator_conf.get('params') or {})
+        with measure(self.orchestrator.instrumentation, 'evaluate', EvaluatorClass.__name__,
+                     rows_in=count_rows(predictions)):
+            return evaluator.evaluate()
+
+    def _train_task(self, model_id: str, label: str, pipeline: dict) -> Tuple[str, dict]:
+        name = self._add(StageTask(f"train:{label}", lambda *deps, p=pipeline: self._train(p, *deps),
+                                   self._data_deps(label)))
+        self.train_tasks.setdefault(model_id, (name, pipeline))
+        return name, pipeline
+
+    def _evaluator_confs(self, stage_conf: dict) -> List[Tuple[str, dict]]:
+        entries = stage_conf.get('evaluator')
+        if entries is None:
+            entries = [{'name': self._name(self.config['evaluator'])}]
+        elif not isinstance(entries, list):
+            entries = [entries]
+        confs = []
+        for entry in entries:
+            name = entry if isinstance(entry, str) else entry['name']
+            if name not in self.evaluators:
+                raise ValueError(f"Stage references unknown evaluator {name}")
+            conf = self.evaluators[name]
+            args = {} if isinstance(entry, str) else entry.get('evaluator_args') or {}
+            confs.append((name, dict(conf, params=dict(conf.get('params') or {}, **args))))
+        return confs
+
+    def _resolve(self, stage_conf: dict, train: bool):
+        model_name = stage_conf.get('model') or self.default_model
+        dataloader_args = dict(stage_conf.get('dataloader_args') or {})
+        default_split = self.models.get(model_name, {}).get('split', 'train') if train else 'eval'
+        split = dataloader_args.pop('split', default_split)
+        model_args = dict(stage_conf.get('model_args') or {})
+        label, config = self._stage_config(model_name, split, stage_conf.get('preprocessors'), dataloader_args,
+                                           model_args)
+        return self._model_id(model_name, model_args), label, self._pipeline(label, config)
+
+    def build(self) -> List[StageTask]:
+        stages = self.config.get('stage') or {}
+        # Train stages first, so evaluation stages can depend on them
+        ordered = sorted(stages.items(), key=lambda item: not self._is_train(*item))
+        for name, stage_conf in ordered:
+            stage_conf = stage_conf or {}
+            train = self._is_train(name, stage_conf)
+            model_id, label, pipeline = self._resolve(stage_conf, train)
+            if train:
+                train_task, train_pipeline = self._train_task(model_id, label, pipeline)
+            elif model_id in self.train_tasks:
+                train_task, train_pipeline = self.train_tasks[model_id]
+            else:
+                # No train stage for this model: train it as the top-level config would
+                train_conf = {'model': stage_conf.get('model'), 'model_args': stage_conf.get('model_args')}
+                _, train_label, train_pipeline = self._resolve(train_conf, True)
+                train_task, train_pipeline = self._train_task(model_id, train_label, train_pipeline)
+            predict_task = self._add(StageTask(
+                f"predict:{label}",
+                lambda state, *deps, p=pipeline, t=train_pipeline: self._predict(p, t, state, *deps),
+                [train_task] + self._data_deps(label)))
+            evaluations = []
+            for evaluator_name, evaluator_conf in self._evaluator_confs(stage_conf):
+                task_name = f"evaluate:{name}:{evaluator_name}"
+                self._add(StageTask(task_name, lambda preds, p=pipeline, c=evaluator_conf: self._evaluate(p, c, preds),
+                                    [predict_task]))
+                evaluations.append((evaluator_name, task_name))
+            self.stage_evaluations[name] = evaluations
+        return list(self.tasks.values())
+
+    def scheduler(self) -> StageScheduler:
+        tasks = self.build()
+        workers = (self.config.get('execution') or {}).get('stage_workers', DEFAULT_STAGE_WORKERS)
+        print(f"Stage DAG: {len(tasks)} tasks for stages {list(self.stage_evaluations)}")
+        for task in tasks:
+            print(f"  {task.name}" + (f" <- {', '.join(task.deps)}" if task.deps else ""))
+        return StageScheduler(tasks, workers=workers)
+
+    def stage_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluation results per stage; a dict per evaluator when a stage has several."""
+        out = OrderedDict()
+        for stage, evaluations in self.stage_evaluations.items():
+            if len(evaluations) == 1:
+                out[stage] = results[evaluations[0][1]]
+            else:
+                out[stage] = {name: results[task] for name, task in evaluations}
+        return dict(out)
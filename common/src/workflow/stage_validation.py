@@ -0,0 +1,62 @@
+import os
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from common.src.schema_utils.yaml_validator import load_schema
+
+
+class StageSchemaValidator:
+    """Dataloader stage listener that checks stage outputs against the output_schema in the config.
+
+    Register it with BaseDataloader.add_stage_listener; it validates the raw
+    dataloader output and each preprocessor's output whenever they are produced,
+    whether for a full split, a streamed chunk or a partition.
+    """
+
+    def __init__(self, config: dict, verbose: bool = True, dataloader=None):
+        self.config = config
+        self.verbose = verbose
+        # With a column projection only the loaded columns can be checked
+        self.dataloader = dataloader
+        self._reported = set()
+
+    def schema_path(self, stage: str, index: Optional[int]) -> Optional[str]:
+        if stage == 'dataloader':
+            path = self.config['dataloader'].get('output_schema')
+        else:
+            path = (self.config.get('preprocessors') or [])[index].get('output_schema')
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def has_schema(self, stage: str, index: Optional[int]) -> bool:
+        """Whether this stage's output is validated at all."""
+        return self.schema_path(stage, index) is not None
+
+    def expected_columns(self, stage: str, index: Optional[int]) -> Optional[List[str]]:
+        """Columns a stage output should have under the dataloader's projection (None = all).
+
+        These are the projected source columns plus every column written by
+        the preprocessors up to this stage; a schema column among them that
+        is missing from the output is still reported.
+        """
+        if self.dataloader is None or self.dataloader.columns is None:
+            return None
+        columns = list(self.dataloader.columns)
+        if stage != 'dataloader':
+            for preproc in self.dataloader.preprocessors[:index + 1]:
+                columns.extend(c for c in (getattr(preproc, 'output_columns', None) or []) if c not in columns)
+        return columns
+
+    def __call__(self, stage: str, index: Optional[int], data: Any):
+        yaml_path = self.schema_path(stage, index)
+        if not yaml_path or not isinstance(data, pd.DataFrame):
+            return
+        validation_conf = self.config.get('validation') or {}
+        schema = load_schema(yaml_path, os.path.splitext(os.path.basename(yaml_path))[0])
+        schema.check(data, sample=validation_conf.get('sample'), seed=validation_conf.get('seed'),
+                     columns=self.expected_columns(stage, index))
+        if self.verbose and yaml_path not in self._reported:
+            self._reported.add(yaml_path)
+            print(f"DataFrame validated against YAML schema: {yaml_path}")
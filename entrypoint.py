@@ -3,9 +3,9 @@ import subprocess
 import sys
 import os
 from datetime import datetime
-from venv import logger
-import yaml
-from common.src.schema_utils import generate_io_models_from_dataloader as gimfd
+
+# Heavy dependencies (pandas, pydantic, the workflow modules) are imported by the
+# command that needs them, so --help and --check-config start quickly
 
 def get_output_dir(config_path):
     dt = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -15,6 +15,8 @@ def get_output_dir(config_path):
     return outdir
 
 def generate_schemas(output_dir, config_path):
+    import yaml
+    from common.src.schema_utils import generate_io_models_from_dataloader as gimfd
     print(f"Generating dataloader output schema in {output_dir}...")
     env = os.environ.copy()
     env["PYTHONPATH"] = "/app"
@@ -50,33 +52,124 @@ def generate_schemas(output_dir, config_path):
         dataloader_module,
         dataloader_class_name,
         dataloader_params,
-        output_path
+        output_path,
+        inference=config['dataloader'].get('schema_inference')
     )
 
     print("Schema generation complete.")
 
-def run_pipeline(config_path):
+def _class_paths(conf):
+    """Every ``class`` entry in a config section, however deeply nested."""
+    if isinstance(conf, dict):
+        if isinstance(conf.get('class'), str):
+            yield conf['class']
+        for value in conf.values():
+            yield from _class_paths(value)
+    elif isinstance(conf, list):
+        for value in conf:
+            yield from _class_paths(value)
+
+def check_config(config_path):
+    """Parse a config and check that its component classes exist, without importing them."""
+    import yaml
+    from common.src.workflow.registry import registry
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    problems = [f"{path}: {problem}" for path in _class_paths(config)
+                for problem in [registry.check(path)] if problem]
+    for section in ('dataloader', 'model', 'evaluator'):
+        if section not in config:
+            problems.append(f"missing '{section}' section")
+    for problem in problems:
+        print(f"{config_path}: {problem}")
+    if not problems:
+        print(f"{config_path}: OK")
+    return not problems
+
+def run_pipeline(config_path, use_cache=True, refresh_stages=None, output_dir=None, profile=False):
     print(f"Running pipeline with config: {config_path}")
     from common.src.workflow.orchestrator import Orchestrator
-    o = Orchestrator(config_path)
+    o = Orchestrator(config_path, use_cache=use_cache, refresh_stages=refresh_stages, output_dir=output_dir,
+                     profile=profile)
     o.setup_pipeline()
     o.run()
 
+def run_batch(config_paths, workers=1, use_cache=True, refresh_stages=None, profile=False):
+    print(f"Running {len(config_paths)} pipelines with {workers} workers")
+    from common.src.workflow.batch import BatchRunner
+    runner = BatchRunner(config_paths, workers=workers, use_cache=use_cache, refresh_stages=refresh_stages,
+                         output_dir_for=get_output_dir, profile=profile)
+    runner.plan()
+    return runner.run()
+
+def serve(socket_path=None, watch=None, workers=4, max_datasets=None, use_cache=True):
+    from common.src.workflow.server import DEFAULT_MAX_DATASETS, DEFAULT_SOCKET, PipelineServer
+    server = PipelineServer(max_concurrent=workers, use_cache=use_cache,
+                            max_datasets=max_datasets or DEFAULT_MAX_DATASETS, output_dir_for=get_output_dir)
+    if watch:
+        server.serve_file(watch)
+    else:
+        server.serve_socket(socket_path or DEFAULT_SOCKET)
+
 def main():
     parser = argparse.ArgumentParser(description="ML Workflow Entrypoint")
     parser.add_argument('--generate-schemas', action='store_true', help='Generate schemas for the pipeline')
     parser.add_argument('--run-pipeline', action='store_true', help='Run the pipeline')
-    parser.add_argument('--config', type=str, default='src/workflow/example_config.yml', help='Path to pipeline config')
+    parser.add_argument('--check-config', action='store_true',
+                        help='Check that the config parses and its component classes exist, then exit')
+    parser.add_argument('--config', type=str, default='src/workflow/example_config.yml',
+                        help='Path to pipeline config, or a directory, glob or JSONL manifest of configs to run as a batch')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Pipelines to run concurrently in batch and serve mode (default 1, or 4 when serving)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Stay running and serve pipeline run requests (JSON lines with a "config" key)')
+    parser.add_argument('--socket', type=str, default=None, help='Unix socket to serve on (default outputs/mlwks.sock)')
+    parser.add_argument('--watch', type=str, default=None, metavar='JSONL',
+                        help='Serve requests appended to this JSONL file instead of a socket; events go to <file>.results.jsonl')
+    parser.add_argument('--max-datasets', type=int, default=None, help='Loaded datasets kept warm when serving')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write a cProfile .prof file and top-N summary per stage into the output directory')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the on-disk stage cache')
+    parser.add_argument('--refresh-stage', action='append', default=[], metavar='STAGE',
+                        help='Recompute STAGE and everything after it (dataloader, preprocessor:<i>, <PreprocessorClass>, model, predictions)')
     args = parser.parse_args()
 
+    if args.serve:
+        serve(args.socket, args.watch, workers=args.workers or 4, max_datasets=args.max_datasets,
+              use_cache=not args.no_cache)
+        return
+
+    if args.check_config:
+        from common.src.workflow.batch import discover_configs, is_batch_spec
+        config_paths = discover_configs(args.config) if is_batch_spec(args.config) else [args.config]
+        if not config_paths:
+            print(f"No configs found for {args.config}")
+            sys.exit(1)
+        ok = all([check_config(config_path) for config_path in config_paths])
+        sys.exit(0 if ok else 1)
+
     print(args)
     output_dir = get_output_dir(args.config)
     print(f"All outputs will be saved in: {output_dir}")
 
+    from common.src.workflow.batch import discover_configs, is_batch_spec
+    if is_batch_spec(args.config):
+        config_paths = discover_configs(args.config)
+        if args.generate_schemas:
+            for config_path in config_paths:
+                generate_schemas(get_output_dir(config_path), config_path)
+        if args.run_pipeline or not args.generate_schemas:
+            results = run_batch(config_paths, workers=args.workers or 1, use_cache=not args.no_cache,
+                                refresh_stages=args.refresh_stage, profile=args.profile)
+            if any(r['status'] != 'ok' for r in results):
+                sys.exit(1)
+        return
+
     if args.generate_schemas:
         generate_schemas(output_dir, args.config)
     if args.run_pipeline or not args.generate_schemas:
-        run_pipeline(args.config)
+        run_pipeline(args.config, use_cache=not args.no_cache, refresh_stages=args.refresh_stage,
+                     output_dir=output_dir, profile=args.profile)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1 +1,18 @@
-from .my_csv_dataloader import MyCsvDataloader, MyCsvDataloaderInput 
\ No newline at end of file
+from importlib import import_module
+
+# Loaded on first access, so importing one dataloader does not import the others
+_EXPORTS = {
+    'MyCsvDataloader': 'my_csv_dataloader',
+    'MyCsvDataloaderInput': 'my_csv_dataloader',
+    'ShardedCsvDataloader': 'sharded_csv_dataloader',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -1,28 +1,155 @@
 import pandas as pd
 from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.dataloader.columnar_cache import ColumnarCache, DEFAULT_COLUMNAR_DIR
+from common.src.workflow.stage_cache import fingerprint_file
 from pydantic import BaseModel
+import io
 import os
 
 class MyCsvDataloaderInput(BaseModel):
     path: str
 
 class MyCsvDataloader(BaseDataloader):
-    def __init__(self, preprocessors=None, filepath:str=""):
+    supports_streaming = True
+
+    def __init__(self, preprocessors=None, filepath:str="example/sample.csv", columnar_cache:bool=False,
+                 columnar_cache_dir:str=DEFAULT_COLUMNAR_DIR):
         super().__init__(preprocessors=preprocessors)
         print(f"MyCsvDataloader initialized with filepath: {filepath}")
         self.path = filepath
+        # Keep a memory-mapped columnar copy of the CSV for fast repeated loads
+        self.columnar_cache = ColumnarCache(columnar_cache_dir) if columnar_cache else None
+
+    def _resolve_path(self):
+        path = self.path.replace('\\', os.sep)
+        if path.startswith('/app/') and not os.path.exists(path):
+            path = path[5:]  # Remove '/app/' when running outside the container
+        return path
+
+    def _read_options(self, path):
+        """usecols/dtype for read_csv from the projection pushed down by the orchestrator."""
+        if self.columns is None:
+            return {'dtype': self.dtypes or None}
+        header = list(pd.read_csv(path, nrows=0).columns)
+        # Keep one column when nothing is needed so the row count survives
+        usecols = [col for col in header if col in set(self.columns)] or header[:1]
+        dtype = {col: typ for col, typ in self.dtypes.items() if col in usecols}
+        return {'usecols': usecols, 'dtype': dtype or None}
+
+    def _read_csv(self, path, **kwargs):
+        try:
+            return pd.read_csv(path, **kwargs)
+        except (ValueError, TypeError) as e:
+            if not kwargs.get('dtype'):
+                raise
+            # The schema dtypes no longer match the file; let pandas infer them
+            print(f"Ignoring schema dtypes for {path}: {e}")
+            kwargs.pop('dtype')
+            if hasattr(path, 'seek'):
+                path.seek(0)
+            return pd.read_csv(path, **kwargs)
+
+    def _read_csv_chunks(self, path, chunksize, **kwargs):
+        # Like _read_csv; a chunk that does not parse with the schema dtypes
+        # restarts the read without them after the rows already yielded
+        done = 0
+        with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+            while True:
+                try:
+                    chunk = next(reader, None)
+                except (ValueError, TypeError) as e:
+                    if not kwargs.get('dtype'):
+                        raise
+                    print(f"Ignoring schema dtypes for {path}: {e}")
+                    break
+                if chunk is None:
+                    return
+                done += len(chunk)
+                yield chunk
+        kwargs.pop('dtype')
+        with pd.read_csv(path, chunksize=chunksize, skiprows=range(1, done + 1), **kwargs) as reader:
+            for chunk in reader:
+                chunk.index += done
+                yield chunk
+
+    def _apply_dtypes(self, data, dtype, path):
+        # The columnar copy keeps the dtypes inferred when it was written; cast
+        # to the schema dtypes the way read_csv would have, with the same fallback
+        dtype = {col: typ for col, typ in (dtype or {}).items()
+                 if col in data.columns and str(data[col].dtype) != typ
+                 and not (typ == 'str' and isinstance(data[col].dtype, pd.CategoricalDtype))}
+        if not dtype:
+            return data
+        try:
+            return data.astype(dtype)
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring schema dtypes for {path}: {e}")
+            return data
+
+    def _read(self, project=True):
+        path = self._resolve_path()
+        options = self._read_options(path) if project else {}
+        if self.columnar_cache is not None:
+            data = self.columnar_cache.load(path, columns=options.get('usecols'),
+                                            categorical_strings=project and self.optimize_dtypes)
+            data = self._apply_dtypes(data, options.get('dtype'), path)
+        else:
+            data = self._read_csv(path, **options)
+        return self.finalize_frame(data) if project else data
 
     def load_data(self, split: str):
         # For test, ignore split and just load the file
-        self.data = pd.read_csv('example/sample.csv')
+        self.data = self._read()
+
+    def fingerprint(self, split: str, content_hash: bool = False):
+        return fingerprint_file(self._resolve_path(), content_hash=content_hash)
+
+    def read_chunks(self, split: str, chunksize: int):
+        # For test, ignore split and stream the file
+        if self.columnar_cache is not None:
+            # Slices of the memory-mapped columns only page in the rows they cover
+            data = self._read()
+            for i in range(0, len(data), chunksize):
+                yield data.iloc[i:i+chunksize]
+            return
+        path = self._resolve_path()
+        for chunk in self._read_csv_chunks(path, chunksize, **self._read_options(path)):
+            yield self.finalize_frame(chunk)
+
+    def partitions(self, split: str, partition_size: int):
+        # Newline-aligned byte ranges, so each worker parses only its own rows.
+        # Assumes no quoted field contains a newline.
+        path = self._resolve_path()
+        file_size = os.path.getsize(path)
+        parts = []
+        with open(path, 'rb') as f:
+            f.readline()  # header
+            start = f.tell()
+            while start < file_size:
+                f.seek(min(start + max(partition_size, 1), file_size))
+                if f.tell() < file_size:
+                    f.readline()
+                end = f.tell()
+                parts.append((path, start, end))
+                start = end
+        return parts
+
+    def load_partition(self, partition):
+        path, start, end = partition
+        with open(path, 'rb') as f:
+            header = f.readline()
+            f.seek(start)
+            body = f.read(end - start)
+        options = self._read_options(path)
+        return self.finalize_frame(self._read_csv(io.BytesIO(header + body), **options))
+
+    def partition_fingerprint(self, partition, content_hash=False):
+        path, start, end = partition
+        return dict(fingerprint_file(path, content_hash=content_hash), start=start, end=end)
 
     def get_data(self,**kwargs):
-        path = self.path
-        if self.path.startswith('/app/'):
-            path = self.path[5:]  # Remove '/app/'
-        return pd.read_csv(path)
-
-    def setup(self, split, batch_size=32, shuffle=False):
-        self.split = split
-        self.batch_size = batch_size
-        self.shuffle = shuffle
\ No newline at end of file
+        # Schema generation needs every column with its inferred dtype
+        return self._read(project=False)
+
+    def setup(self, split=None, batch_size=32, shuffle=False, **kwargs):
+        super().setup(split=split, batch_size=batch_size, shuffle=shuffle, **kwargs)
@@ -0,0 +1,147 @@
+import os
+import glob
+import json
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.workflow.stage_cache import fingerprint_file
+
+try:
+    import zstandard  # noqa: F401  (pandas reads .zst through it)
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+class ShardedCsvDataloader(BaseDataloader):
+    """CSV data split over many (optionally gzip/bz2/xz/zstd-compressed) shard files.
+
+    Shards come from ``files`` (a glob or list of globs/paths; ``{split}`` is
+    replaced by the split name) or from a ``manifest`` file listing one shard
+    per line, as a path or a ``{"path": ...}`` JSON object, relative to the
+    manifest. Up to ``io_workers`` shards are read and decompressed
+    concurrently; ``ordered`` keeps shard order in the output, otherwise
+    shards are emitted as they finish. Each shard is one partition, so
+    partitioned runs aggregate per shard and can resume from the finished
+    ones.
+    """
+    supports_streaming = True
+
+    def __init__(self, preprocessors=None, files: Union[str, List[str], None] = None, manifest: Optional[str] = None,
+                 io_workers: int = 4, ordered: bool = True, compression: str = 'infer'):
+        super().__init__(preprocessors=preprocessors)
+        if not files and not manifest:
+            raise ValueError("ShardedCsvDataloader needs files or manifest")
+        self.files = [files] if isinstance(files, str) else list(files or [])
+        self.manifest = manifest
+        self.io_workers = max(1, io_workers)
+        self.ordered = ordered
+        self.compression = compression
+        print(f"ShardedCsvDataloader initialized with {manifest or self.files}")
+
+    def shards(self, split: str) -> List[str]:
+        paths = []
+        for pattern in self.files:
+            pattern = pattern.replace('{split}', split or '')
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+            paths.extend(matches)
+        if self.manifest:
+            paths.extend(self._read_manifest(self.manifest.replace('{split}', split or '')))
+        if not paths:
+            raise FileNotFoundError(f"No shards found for split {split!r} in {self.manifest or self.files}")
+        if not HAS_ZSTD and any(path.endswith('.zst') for path in paths):
+            raise ImportError("Reading .zst shards requires the zstandard package (pip install zstandard)")
+        return paths
+
+    @staticmethod
+    def _read_manifest(manifest: str) -> List[str]:
+        base = os.path.dirname(os.path.abspath(manifest))
+        paths = []
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                path = json.loads(line)['path'] if line.startswith('{') else line
+                paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+        return paths
+
+    def _read_options(self, path):
+        """usecols/dtype for read_csv from the projection pushed down by the orchestrator."""
+        if self.columns is None:
+            return {'dtype': self.dtypes or None}
+        header = list(pd.read_csv(path, nrows=0, compression=self.compression).columns)
+        # Keep one column when nothing is needed so the row count survives
+        usecols = [col for col in header if col in set(self.columns)] or header[:1]
+        dtype = {col: typ for col, typ in self.dtypes.items() if col in usecols}
+        return {'usecols': usecols, 'dtype': dtype or None}
+
+    def _read_shard(self, path: str, project: bool = True) -> pd.DataFrame:
+        options = self._read_options(path) if project else {}
+        try:
+            data = pd.read_csv(path, compression=self.compression, **options)
+        except (ValueError, TypeError) as e:
+            if not options.get('dtype'):
+                raise
+            # The schema dtypes no longer match the shard; let pandas infer them
+            print(f"Ignoring schema dtypes for {path}: {e}")
+            options.pop('dtype')
+            data = pd.read_csv(path, compression=self.compression, **options)
+        return self.finalize_frame(data) if project else data
+
+    def iter_shards(self, split: str, project: bool = True) -> Iterator[pd.DataFrame]:
+        """Read the split's shards on a thread pool, keeping at most ``io_workers`` shards in flight."""
+        paths = iter(self.shards(split))
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='shard-io') as pool:
+            pending = deque()
+
+            def fill():
+                for path in paths:
+                    pending.append(pool.submit(self._read_shard, path, project))
+                    if len(pending) >= self.io_workers:
+                        return
+            fill()
+            try:
+                while pending:
+                    if self.ordered:
+                        future = pending.popleft()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        future = next(f for f in pending if f in done)
+                        pending.remove(future)
+                    data = future.result()
+                    fill()
+                    yield data
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def load_data(self, split: str):
+        frames = list(self.iter_shards(split))
+        self.data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def fingerprint(self, split: str, content_hash: bool = False):
+        return {'shards': [fingerprint_file(path, content_hash=content_hash) for path in self.shards(split)]}
+
+    def read_chunks(self, split: str, chunksize: int):
+        for shard in self.iter_shards(split):
+            for i in range(0, len(shard), chunksize):
+                yield shard.iloc[i:i+chunksize]
+
+    def partitions(self, split: str, partition_size: int):
+        # Shards are the natural unit of work whatever their size
+        return self.shards(split)
+
+    def load_partition(self, partition):
+        return self._read_shard(partition)
+
+    def partition_fingerprint(self, partition, content_hash: bool = False):
+        return fingerprint_file(partition, content_hash=content_hash)
+
+    def get_data(self, **kwargs):
+        # Schema generation needs every column with its inferred dtype
+        frames = list(self.iter_shards('train', project=False))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
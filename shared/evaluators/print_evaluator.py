@@ -1,6 +1,18 @@
 from common.src.evaluator.base_evaluator import BaseEvaluator
+import pandas as pd
 
 class PrintEvaluator(BaseEvaluator):
+    input_columns = []
+    # Rows of a predictions frame to print; params may override it with 'rows'
+    rows = 10
+
     def evaluate(self):
-        print('Predictions:', self.predictions)
-        return {'dummy_metric': 1.0} 
\ No newline at end of file
+        preds = self.predictions
+        rows = self.params.get('rows', self.rows)
+        if isinstance(preds, pd.DataFrame) and len(preds) > rows:
+            # Print a head and the row count like ConsoleSink, not the whole frame
+            print(f"Predictions ({len(preds):,} rows, first {rows}):")
+            print(preds.head(rows).to_string(index=False))
+        else:
+            print('Predictions:', preds)
+        return {'dummy_metric': 1.0}
@@ -2,6 +2,8 @@ from common.src.evaluator.base_evaluator import BaseEvaluator
 import pandas as pd
 
 class ScoreThresholdEvaluator(BaseEvaluator):
+    input_columns = []
+
     def evaluate(self):
         preds = self.predictions
         if isinstance(preds, pd.DataFrame) and 'score' in preds.columns:
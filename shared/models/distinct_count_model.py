@@ -0,0 +1,30 @@
+from common.src.model.base_model import BaseModel
+from common.src.model.sketches import HyperLogLog
+import pandas as pd
+
+class DistinctCountModel(BaseModel):
+    """Approximate number of distinct values of ``column`` from a HyperLogLog sketch (relative error about ``error``)."""
+    supports_streaming = True
+
+    def __init__(self, dataloader, split: str = "train", column: str = 'name', error: float = 0.01):
+        super().__init__(dataloader, split)
+        self.column = column
+        self.error = error
+        self.input_columns = [column]
+
+    def _train(self):
+        pass
+    def _predict(self):
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return HyperLogLog(self.error)
+    def partial(self, df):
+        sketch = self.init_state()
+        if self.column in df.columns:
+            sketch.update(df[self.column])
+        return sketch
+    def combine(self, left, right):
+        return left.merge(right)
+    def finalize(self, state):
+        return pd.DataFrame({f"distinct_{self.column}": [round(state.count())]})
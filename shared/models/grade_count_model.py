@@ -1,13 +1,30 @@
 from common.src.model.base_model import BaseModel
 import pandas as pd
 
+GRADES = ['A', 'B', 'C']
+
 class GradeCountModel(BaseModel):
+    supports_streaming = True
+    input_columns = ['grade']
+
     def _train(self):
         pass
     def _predict(self):
-        df = self.dataloader.data
-        if 'grade' in df.columns:
-            counts = df['grade'].value_counts()
-            return pd.DataFrame([{g: counts.get(g, 0) for g in ['A', 'B', 'C']}])
-        else:
-            return pd.DataFrame([{'A': 0, 'B': 0, 'C': 0}]) 
\ No newline at end of file
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return {g: 0 for g in GRADES}
+    def partial(self, df):
+        if 'grade' not in df.columns:
+            return self.init_state()
+        counts = df['grade'].value_counts()
+        return {g: int(counts.get(g, 0)) for g in GRADES}
+    def combine(self, left, right):
+        return {g: left[g] + right[g] for g in GRADES}
+    def finalize(self, state):
+        return pd.DataFrame([state])
+
+    def reductions(self):
+        return {'counts': ('value_counts', 'grade')}
+    def from_reductions(self, values):
+        return {g: int(values['counts'].get(g, 0)) for g in GRADES}
@@ -2,9 +2,32 @@ from common.src.model.base_model import BaseModel
 import pandas as pd
 
 class MeanScoreModel(BaseModel):
+    supports_streaming = True
+    input_columns = ['score']
+
     def _train(self):
         pass
     def _predict(self):
-        df = self.dataloader.data
-        mean_score = df['score'].mean() if 'score' in df.columns else None
-        return pd.DataFrame({'mean_score': [mean_score]}) 
\ No newline at end of file
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return {'sum': 0.0, 'count': 0, 'has_score': False}
+    def partial(self, df):
+        if 'score' not in df.columns:
+            return self.init_state()
+        return {'sum': float(df['score'].sum()), 'count': int(df['score'].count()), 'has_score': True}
+    def combine(self, left, right):
+        return {'sum': left['sum'] + right['sum'], 'count': left['count'] + right['count'],
+                'has_score': left['has_score'] or right['has_score']}
+    def finalize(self, state):
+        if not state['has_score']:
+            mean_score = None
+        else:
+            mean_score = state['sum'] / state['count'] if state['count'] else float('nan')
+        return pd.DataFrame({'mean_score': [mean_score]})
+
+    def reductions(self):
+        return {'sum': ('sum', 'score'), 'count': ('count', 'score'), 'has_score': ('present', 'score')}
+    def from_reductions(self, values):
+        total = float(values['sum']) if values['sum'] is not None else 0.0
+        return {'sum': total, 'count': values['count'], 'has_score': values['has_score']}
@@ -0,0 +1,33 @@
+from common.src.model.base_model import BaseModel
+from common.src.model.sketches import KLLSketch
+import pandas as pd
+
+class QuantileModel(BaseModel):
+    """Approximate quantiles of ``column`` from a mergeable KLL sketch (rank error about ``error``)."""
+    supports_streaming = True
+
+    def __init__(self, dataloader, split: str = "train", column: str = 'score', quantiles=(0.5, 0.9, 0.99),
+                 error: float = 0.01, seed: int = 0):
+        super().__init__(dataloader, split)
+        self.column = column
+        self.quantiles = list(quantiles)
+        self.error = error
+        self.seed = seed
+        self.input_columns = [column]
+
+    def _train(self):
+        pass
+    def _predict(self):
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return KLLSketch(self.error, seed=self.seed)
+    def partial(self, df):
+        sketch = self.init_state()
+        if self.column in df.columns:
+            sketch.update(df[self.column])
+        return sketch
+    def combine(self, left, right):
+        return left.merge(right)
+    def finalize(self, state):
+        return pd.DataFrame({'quantile': self.quantiles, self.column: state.quantiles(self.quantiles)})
@@ -2,9 +2,24 @@ from common.src.model.base_model import BaseModel
 import pandas as pd
 
 class RowCountModel(BaseModel):
+    supports_streaming = True
+    input_columns = []
+
     def _train(self):
         pass
     def _predict(self):
-        df = self.dataloader.data
-        count = len(df)
-        return pd.DataFrame({'row_count': [count]}) 
\ No newline at end of file
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return 0
+    def partial(self, df):
+        return len(df)
+    def combine(self, left, right):
+        return left + right
+    def finalize(self, state):
+        return pd.DataFrame({'row_count': [state]})
+
+    def reductions(self):
+        return {'rows': ('rows', None)}
+    def from_reductions(self, values):
+        return values['rows']
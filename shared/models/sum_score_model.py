@@ -2,9 +2,28 @@ from common.src.model.base_model import BaseModel
 import pandas as pd
 
 class SumScoreModel(BaseModel):
+    supports_streaming = True
+    input_columns = ['score']
+
     def _train(self):
         pass
     def _predict(self):
-        df = self.dataloader.data
-        sum_score = df['score'].sum() if 'score' in df.columns else None
-        return pd.DataFrame({'sum_score': [sum_score]}) 
\ No newline at end of file
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return None
+    def partial(self, df):
+        return df['score'].sum() if 'score' in df.columns else None
+    def combine(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return left + right
+    def finalize(self, state):
+        return pd.DataFrame({'sum_score': [state]})
+
+    def reductions(self):
+        return {'sum': ('sum', 'score')}
+    def from_reductions(self, values):
+        return values['sum']
@@ -0,0 +1,38 @@
+from common.src.model.base_model import BaseModel
+from common.src.model.sketches import SpaceSaving
+import pandas as pd
+
+class TopKModel(BaseModel):
+    """The ``k`` most frequent values of ``column`` from a Space-Saving sketch.
+
+    Counts are never underestimated and overestimated by at most
+    ``error`` times the number of rows; ``max_error`` gives each count's bound.
+    """
+    supports_streaming = True
+
+    def __init__(self, dataloader, split: str = "train", column: str = 'name', k: int = 10, error: float = 0.001):
+        super().__init__(dataloader, split)
+        if k > SpaceSaving(error).capacity:
+            raise ValueError(f"TopKModel keeps {SpaceSaving(error).capacity} counters at error={error}, "
+                             f"fewer than k={k}; lower error")
+        self.column = column
+        self.k = k
+        self.error = error
+        self.input_columns = [column]
+
+    def _train(self):
+        pass
+    def _predict(self):
+        return self.finalize(self.partial(self.dataloader.data))
+
+    def init_state(self):
+        return SpaceSaving(self.error)
+    def partial(self, df):
+        sketch = self.init_state()
+        if self.column in df.columns:
+            sketch.update(df[self.column])
+        return sketch
+    def combine(self, left, right):
+        return left.merge(right)
+    def finalize(self, state):
+        return state.top(self.k).rename(columns={'value': self.column})
@@ -1,9 +1,7 @@
-from common.src.preprocessor.base_preprocessor import BasePreprocessor
-import pandas as pd
+from common.src.preprocessor.expression_preprocessor import ExpressionPreprocessor
 
-class DoubleScorePreprocessor(BasePreprocessor):
-    def process(self, data):
-        if isinstance(data, pd.DataFrame) and 'score' in data.columns:
-            data = data.copy()
-            data['score'] = data['score'] * 2
-        return data 
\ No newline at end of file
+class DoubleScorePreprocessor(ExpressionPreprocessor):
+    def __init__(self):
+        super().__init__(operations=[
+            {'op': 'eval', 'output': 'score', 'expr': 'score * 2', 'requires': ['score']},
+        ])
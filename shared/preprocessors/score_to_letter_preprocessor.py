@@ -1,16 +1,8 @@
-from common.src.preprocessor.base_preprocessor import BasePreprocessor
-import pandas as pd
+from common.src.preprocessor.expression_preprocessor import ExpressionPreprocessor
 
-class ScoreToLetterPreprocessor(BasePreprocessor):
-    def process(self, data):
-        if isinstance(data, pd.DataFrame) and 'score' in data.columns:
-            data = data.copy()
-            def grade(s):
-                if s >= 90:
-                    return 'A'
-                elif s >= 80:
-                    return 'B'
-                else:
-                    return 'C'
-            data['grade'] = data['score'].apply(grade)
-        return data 
\ No newline at end of file
+class ScoreToLetterPreprocessor(ExpressionPreprocessor):
+    # score >= 90 -> A, score >= 80 -> B, otherwise C
+    def __init__(self):
+        super().__init__(operations=[
+            {'op': 'bin', 'column': 'score', 'output': 'grade', 'thresholds': [80, 90], 'labels': ['C', 'B', 'A']},
+        ])
@@ -1,9 +1,7 @@
-from common.src.preprocessor.base_preprocessor import BasePreprocessor
-import pandas as pd
+from common.src.preprocessor.expression_preprocessor import ExpressionPreprocessor
 
-class UppercaseNamePreprocessor(BasePreprocessor):
-    def process(self, data):
-        if isinstance(data, pd.DataFrame) and 'name' in data.columns:
-            data = data.copy()
-            data['name'] = data['name'].str.upper()
-        return data 
\ No newline at end of file
+class UppercaseNamePreprocessor(ExpressionPreprocessor):
+    def __init__(self):
+        super().__init__(operations=[
+            {'op': 'string', 'column': 'name', 'method': 'upper'},
+        ])
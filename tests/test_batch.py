@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+import yaml
+
+from common.src.workflow.batch import BatchRunner, discover_configs
+
+
+def write_config(path, data, model='mean_score_model.MeanScoreModel', schema=None):
+    config = {
+        'dataloader': {'class': 'shared.dataloaders.my_csv_dataloader.MyCsvDataloader',
+                       'params': {'filepath': str(data)}, 'output_schema': schema},
+        'preprocessors': [],
+        'model': {'class': f"shared.models.{model}", 'split': 'train', 'params': {}},
+        'evaluator': {'class': 'shared.evaluators.print_evaluator.PrintEvaluator', 'params': {}},
+        'cache': {'enabled': False},
+    }
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+@pytest.fixture
+def data(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'score': [1, 2, 3], 'name': ['a', 'b', 'c']}).to_csv(path, index=False)
+    return path
+
+
+def run(paths, tmp_path, workers=1):
+    runner = BatchRunner(paths, workers=workers, use_cache=False,
+                         output_dir_for=lambda path: str(tmp_path / 'out' / os.path.basename(path)))
+    runner.plan()
+    return runner, runner.run()
+
+
+def test_pipelines_on_one_input_share_a_load(tmp_path, data):
+    paths = [write_config(tmp_path / 'mean.yml', data),
+             write_config(tmp_path / 'sum.yml', data, 'sum_score_model.SumScoreModel')]
+    runner, results = run(paths, tmp_path, workers=2)
+    assert [r['status'] for r in results] == ['ok', 'ok']
+    assert len(runner.groups) == 1
+    assert runner.dataset_cache.misses == 1
+
+
+def test_failures_are_reported_per_pipeline(tmp_path, data):
+    paths = [write_config(tmp_path / 'ok.yml', data),
+             write_config(tmp_path / 'missing.yml', tmp_path / 'missing.csv')]
+    _, results = run(paths, tmp_path)
+    assert [r['status'] for r in results] == ['ok', 'failed']
+    assert 'missing.csv' in results[1]['result']
+
+
+def test_pipelines_validated_against_other_schemas_do_not_share(tmp_path, data):
+    schema = tmp_path / 'schemas' / 'Strict.yaml'
+    schema.parent.mkdir()
+    schema.write_text(yaml.safe_dump({'Strict': {'columns': {'score': 'str'}, 'type': 'dataframe'}}))
+    paths = [write_config(tmp_path / 'plain.yml', data),
+             write_config(tmp_path / 'strict.yml', data, schema=str(schema))]
+    _, results = run(paths, tmp_path)
+    assert [r['status'] for r in results] == ['ok', 'failed']
+    assert 'SchemaValidationError' in results[1]['result']
+
+
+def test_discover_configs(tmp_path, data):
+    paths = [write_config(tmp_path / name, data) for name in ('b.yml', 'a.yaml')]
+    listing = tmp_path / 'batch.jsonl'
+    listing.write_text('\n'.join(f'{{"config": "{path}"}}' for path in paths) + '\n')
+    assert discover_configs(str(tmp_path)) == sorted(paths)
+    assert discover_configs(str(listing)) == paths
@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.dataloader.batching import Prefetcher, iter_batches, prefetch
+
+
+class FrameLoader(BaseDataloader):
+    def load_data(self, split):
+        self.data = pd.DataFrame({'row': np.arange(10)})
+
+
+def rows(batches):
+    return [batch['row'].tolist() for batch in batches]
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'row': np.arange(10)})
+
+
+def test_in_order_batches_are_views(frame):
+    batches = list(iter_batches(frame, 4))
+    assert rows(batches) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert np.shares_memory(batches[1]['row'].to_numpy(), frame['row'].to_numpy())
+    assert rows(iter_batches(frame, 4, drop_last=True)) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_seeded_shuffle_is_a_reproducible_permutation(frame):
+    first = rows(iter_batches(frame, 3, shuffle=True, seed=1))
+    assert first == rows(iter_batches(frame, 3, shuffle=True, seed=1))
+    assert sorted(sum(first, [])) == list(range(10))
+    assert first != rows(iter_batches(frame, 3, shuffle=True, seed=2))
+
+
+def test_arrays_and_lists_batch_too():
+    assert [b.tolist() for b in iter_batches(np.arange(5), 2)] == [[0, 1], [2, 3], [4]]
+    assert sorted(sum(iter_batches(list('abcde'), 2, shuffle=True, seed=0), [])) == list('abcde')
+    with pytest.raises(ValueError):
+        list(iter_batches([1], 0))
+
+
+def test_prefetch_keeps_order_and_applies_transform():
+    assert list(prefetch(range(20), 3, transform=lambda x: x * 2)) == list(range(0, 40, 2))
+    assert list(prefetch(range(3), 0, transform=str)) == ['0', '1', '2']
+
+
+def test_prefetch_runs_ahead_on_a_background_thread():
+    threads = []
+    assert list(prefetch(range(3), 2, transform=lambda x: threads.append(threading.current_thread()) or x)) == [0, 1, 2]
+    assert threading.main_thread() not in threads
+
+
+def test_prefetch_raises_source_errors_in_the_consumer():
+    def source():
+        yield 1
+        raise KeyError('broken')
+
+    batches = prefetch(source(), 2)
+    assert next(batches) == 1
+    with pytest.raises(KeyError):
+        next(batches)
+
+
+def test_closing_early_stops_the_producer():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    with Prefetcher(source(), depth=2) as batches:
+        assert next(batches) == 0
+    assert len(produced) < 10
+
+
+def test_dataloader_epochs_reshuffle_reproducibly():
+    def epochs():
+        dataloader = FrameLoader()
+        dataloader.setup(batch_size=4, shuffle=True, seed=7)
+        dataloader.load_data('train')
+        return [rows(dataloader.batch_iter()) for _ in range(2)]
+
+    first = epochs()
+    assert first == epochs()
+    assert first[0] != first[1]
+
+
+def test_batch_iter_needs_loaded_data():
+    dataloader = FrameLoader()
+    dataloader.setup()
+    with pytest.raises(ValueError):
+        dataloader.batch_iter()
@@ -0,0 +1,104 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from common.src.schema_utils.bulk_validation import validate_bulk
+from common.src.schema_utils.yaml_validator import CompiledSchema
+
+
+class Row(BaseModel):
+    a: Optional[int]
+    b: int
+
+
+def alternating(n, odd, even):
+    return np.where(np.arange(n) % 2, odd, even)
+
+
+def test_valid_frame_checks_no_rows():
+    frame = pd.DataFrame({'a': np.arange(1000), 'b': np.arange(1000)})
+    report = validate_bulk(frame, Row)
+    assert report.ok
+    assert report.checked_rows == 0
+
+
+def test_nulls_of_optional_columns_are_not_suspect():
+    # An Optional[int] column with nulls is read as float64
+    frame = pd.DataFrame({'a': alternating(1000, np.nan, 1.0), 'b': np.arange(1000)})
+    report = validate_bulk(frame, Row)
+    assert report.ok
+    assert report.checked_rows == 0
+
+
+def test_nulls_of_required_columns_are_invalid():
+    frame = pd.DataFrame({'a': np.arange(4), 'b': [1.0, np.nan, 3.0, np.nan]})
+    report = validate_bulk(frame, Row)
+    assert not report.ok
+    assert report.invalid_rows == 2
+    assert [entry['rows'] for entry in report.errors.values()] == [[1, 3]]
+
+
+def test_coercible_values_pass_row_checks():
+    frame = pd.DataFrame({'a': [1, None, 3], 'b': ['1', '2', '3']})
+    report = validate_bulk(frame, Row)
+    assert report.ok
+    assert report.checked_rows == 3
+
+
+def test_invalid_rows_keep_their_labels():
+    frame = pd.DataFrame({'a': [1, 2, 3], 'b': ['1', 'x', '3']}, index=['r0', 'r1', 'r2'])
+    report = validate_bulk(frame, Row)
+    assert report.invalid_rows == 1
+    assert [label for label, _ in report.row_errors] == ['r1']
+
+
+def test_rows_past_the_cap_are_unconfirmed_not_invalid():
+    n = 30_000
+    frame = pd.DataFrame({'a': alternating(n, np.nan, 1.0), 'b': alternating(n, '1', '2').astype(object)})
+    report = validate_bulk(frame, Row, max_row_checks=10_000)
+    assert report.ok
+    assert report.invalid_rows == 0
+    assert report.checked_rows == 10_000
+    assert report.unconfirmed_rows == 20_000
+    assert report.unconfirmed[0] == 10_000
+
+
+def test_invalid_rows_within_the_cap_still_fail():
+    frame = pd.DataFrame({'a': np.arange(100), 'b': ['x'] * 100})
+    report = validate_bulk(frame, Row, max_row_checks=10)
+    assert not report.ok
+    assert (report.invalid_rows, report.unconfirmed_rows) == (10, 90)
+
+
+def test_missing_required_column_fails_every_row():
+    report = validate_bulk(pd.DataFrame({'a': [1, 2]}), Row)
+    assert report.invalid_rows == 2
+    assert ('b', 'missing') in report.errors
+
+
+def test_constrained_fields_are_checked_per_row():
+    class Bounded(BaseModel):
+        score: int = Field(ge=0)
+
+    report = validate_bulk(pd.DataFrame({'score': [1, -1, 2]}), Bounded)
+    assert report.checked_rows == 3
+    assert report.invalid_rows == 1
+
+
+def test_schema_with_nested_columns():
+    schema = CompiledSchema('Nested', {'tags': {'type': 'list', 'items': 'str'}})
+    frame = pd.DataFrame({'tags': [['a'], ['b', 'c'], [1]]})
+    report = validate_bulk(frame, schema=schema)
+    assert report.invalid_rows == 1
+    assert report.row_errors[0][0] == 2
+
+
+def test_list_annotations_become_column_checks():
+    class Tagged(BaseModel):
+        tags: List[str]
+
+    report = validate_bulk(pd.DataFrame({'tags': [['a'], []]}), Tagged)
+    assert report.ok
+    assert report.checked_rows == 0
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from shared.dataloaders.my_csv_dataloader import MyCsvDataloader
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / 'rows.csv'
+    path.write_text('name,score\n' + ''.join(f'n{i},{i}\n' for i in range(10)))
+    return path
+
+
+def loader(path, tmp_path, columnar=False, **projection):
+    dataloader = MyCsvDataloader(filepath=str(path), columnar_cache=columnar,
+                                 columnar_cache_dir=str(tmp_path / 'columnar'))
+    dataloader.set_projection(**projection)
+    return dataloader
+
+
+def load(dataloader):
+    dataloader.load_data('train')
+    return dataloader.data
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_projection_and_dtypes(csv, tmp_path, columnar):
+    for _ in range(2):  # the second columnar load is served from the cache
+        data = load(loader(csv, tmp_path, columnar, columns=['score'], dtypes={'score': 'float64'}))
+        assert list(data.columns) == ['score']
+        assert data['score'].dtype == 'float64'
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_mismatched_dtypes_are_ignored(csv, tmp_path, columnar):
+    for _ in range(2):
+        data = load(loader(csv, tmp_path, columnar, dtypes={'name': 'int64', 'score': 'int64'}))
+        assert data['name'].tolist() == [f'n{i}' for i in range(10)]
+
+
+def test_chunks_fall_back_past_a_mismatched_chunk(tmp_path):
+    path = tmp_path / 'rows.csv'
+    path.write_text('score\n' + ''.join(f'{i}\n' for i in range(7)) + 'oops\n' + '8\n9\n')
+    chunks = list(loader(path, tmp_path, dtypes={'score': 'int64'}).read_chunks('train', 3))
+    data = pd.concat(chunks)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert data['score'].astype(str).tolist() == [str(i) for i in range(7)] + ['oops', '8', '9']
+    assert list(data.index) == list(range(10))
+
+
+def test_chunks_with_matching_dtypes(csv, tmp_path):
+    chunks = list(loader(csv, tmp_path, dtypes={'score': 'float64'}).read_chunks('train', 4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert all(chunk['score'].dtype == 'float64' for chunk in chunks)
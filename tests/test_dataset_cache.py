@@ -0,0 +1,99 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.dataloader.dataset_cache import DatasetCache
+
+
+class CountingLoader(BaseDataloader):
+    loads = 0
+
+    def load_data(self, split):
+        type(self).loads += 1
+        self.data = pd.DataFrame({'score': np.arange(10), 'split': split})
+
+
+class Doubler:
+    def process(self, data):
+        return data.assign(score=data['score'] * 2)
+
+
+def loader(cache, preprocessors=(), params=None):
+    dataloader = CountingLoader(preprocessors=list(preprocessors))
+    dataloader.attach_cache(cache, params or {}, [type(p).__name__ for p in preprocessors])
+    return dataloader
+
+
+def test_concurrent_requests_share_one_load():
+    cache = DatasetCache()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'data'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', slow))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['data'] * 8
+    assert len(calls) == 1
+    assert cache.stats() == {'hits': 7, 'misses': 1, 'entries': 1}
+
+
+def test_max_entries_drops_least_recently_used():
+    cache = DatasetCache(max_entries=2)
+    for key in 'ab':
+        cache.get_or_load(key, lambda: key)
+    cache.get_or_load('a', lambda: 'reloaded')
+    cache.get_or_load('c', lambda: 'c')
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+
+def test_release_and_invalidate():
+    cache = DatasetCache()
+    for split in ('train', 'eval'):
+        cache.get_or_load(DatasetCache.make_key(CountingLoader, {}, split), lambda: split)
+    cache.release(DatasetCache.make_key(CountingLoader, {}, 'train'))
+    assert len(cache) == 1
+    assert cache.invalidate(CountingLoader, 'eval') == 1
+    assert len(cache) == 0
+
+
+def test_make_key_ignores_preprocessor_instances():
+    assert (DatasetCache.make_key(CountingLoader, {'a': 1, 'preprocessors': [object()]}, 's')
+            == DatasetCache.make_key(CountingLoader, {'a': 1}, 's'))
+
+
+def test_dataloaders_share_raw_data_across_chains():
+    cache = DatasetCache()
+    CountingLoader.loads = 0
+    plain = loader(cache)
+    doubled = loader(cache, [Doubler()])
+    assert plain.load('train')['score'].sum() == 45
+    assert doubled.load('train')['score'].sum() == 90
+    assert CountingLoader.loads == 1
+    # The preprocessed split is cached too
+    assert loader(cache, [Doubler()]).load('train') is doubled.data
+    assert CountingLoader.loads == 1
+
+
+def test_different_params_load_separately():
+    cache = DatasetCache()
+    CountingLoader.loads = 0
+    loader(cache, params={'path': 'a'}).load('train')
+    loader(cache, params={'path': 'b'}).load('train')
+    assert CountingLoader.loads == 2
+
+
+def test_cached_output_is_not_mutated_by_preprocessing():
+    cache = DatasetCache()
+    raw = loader(cache).load('train')
+    loader(cache, [Doubler()]).load('train')
+    assert raw['score'].sum() == 45
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.preprocessor.expression_preprocessor import ExpressionPreprocessor
+from shared.preprocessors.double_score_preprocessor import DoubleScorePreprocessor
+from shared.preprocessors.score_to_letter_preprocessor import ScoreToLetterPreprocessor
+from shared.preprocessors.uppercase_name_preprocessor import UppercaseNamePreprocessor
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'score': [79, 80, 89, 90, 100], 'name': ['ann', 'bo', ' cy', 'di', 'ed']})
+
+
+def test_shared_preprocessors(frame):
+    data = frame
+    for preproc in (DoubleScorePreprocessor(), ScoreToLetterPreprocessor(), UppercaseNamePreprocessor()):
+        data = preproc.process(data)
+    assert data['score'].tolist() == [158, 160, 178, 180, 200]
+    assert data['grade'].tolist() == ['A'] * 5
+    assert data['name'].tolist() == ['ANN', 'BO', ' CY', 'DI', 'ED']
+
+
+def test_bin_thresholds_are_inclusive(frame):
+    assert ScoreToLetterPreprocessor().process(frame)['grade'].tolist() == ['C', 'B', 'B', 'A', 'A']
+
+
+def test_conditional_first_match_wins(frame):
+    preproc = ExpressionPreprocessor([{'op': 'conditional', 'output': 'band', 'requires': ['score'],
+                                       'conditions': [['score >= 90', 'high'], ['score >= 80', 'mid']],
+                                       'default': 'low'}])
+    assert preproc.process(frame)['band'].tolist() == ['low', 'mid', 'mid', 'high', 'high']
+
+
+def test_input_is_left_untouched(frame):
+    before = frame.copy()
+    data = DoubleScorePreprocessor().process(frame)
+    pd.testing.assert_frame_equal(frame, before)
+    # Columns it does not write are shared, not copied
+    assert np.shares_memory(data['name'].to_numpy(), frame['name'].to_numpy())
+
+
+def test_operations_without_their_columns_are_skipped():
+    frame = pd.DataFrame({'other': [1]})
+    assert DoubleScorePreprocessor().process(frame).equals(frame)
+
+
+def test_declared_columns():
+    assert (DoubleScorePreprocessor().input_columns, DoubleScorePreprocessor().output_columns) == (['score'], ['score'])
+    assert ScoreToLetterPreprocessor().output_columns == ['grade']
+    # Expressions without 'requires' read unknown columns
+    assert ExpressionPreprocessor([{'op': 'eval', 'output': 'x', 'expr': 'a + b'}]).input_columns is None
+
+
+@pytest.mark.parametrize('spec', [
+    {'op': 'bin', 'column': 'score', 'thresholds': [80, 90], 'labels': ['C', 'B']},
+    {'op': 'bin', 'column': 'score', 'thresholds': [90, 80], 'labels': ['C', 'B', 'A']},
+    {'op': 'string', 'column': 'name', 'method': 'zfill'},
+    {'op': 'unknown'},
+])
+def test_invalid_operations_are_rejected(spec):
+    with pytest.raises(ValueError):
+        ExpressionPreprocessor([spec])
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.model.fused_model import FUSED_MODEL_CLASS, FusedModel, fused_model_conf, model_confs
+from common.src.workflow.registry import import_class
+
+MODELS = [
+    {'class': 'shared.models.mean_score_model.MeanScoreModel'},
+    {'class': 'shared.models.sum_score_model.SumScoreModel'},
+    {'class': 'shared.models.row_count_model.RowCountModel'},
+    {'class': 'shared.models.grade_count_model.GradeCountModel'},
+    {'class': 'shared.models.quantile_model.QuantileModel', 'params': {'column': 'score'}},
+]
+
+
+class FrameLoader(BaseDataloader):
+    def load_data(self, split):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({'score': rng.integers(0, 100, 5000),
+                                  'grade': rng.choice(['A', 'B', 'C'], 5000)})
+
+
+def separately(dataloader, predict):
+    results = {}
+    for conf in MODELS:
+        model = import_class(conf['class'])(dataloader, split='train', **(conf.get('params') or {}))
+        results[conf['class'].rsplit('.', 1)[-1]] = predict(model)
+    return results
+
+
+def assert_same(fused, expected):
+    assert list(fused) == list(expected)
+    for name, predictions in expected.items():
+        pd.testing.assert_frame_equal(fused[name], predictions)
+
+
+def test_fused_predictions_equal_each_model_alone():
+    dataloader = FrameLoader()
+    fused = FusedModel(dataloader, models=MODELS)
+    assert_same(fused.predict(), separately(dataloader, lambda model: model.predict()))
+    # mean and sum share the sum of score
+    assert len(fused.planner.plan) < fused.planner.requested()
+
+
+def test_fused_chunks_and_partitions_equal_each_model_alone():
+    dataloader = FrameLoader()
+    fused = FusedModel(dataloader, models=MODELS)
+    dataloader.load('train')
+    chunks = [dataloader.data.iloc[i:i + 700] for i in range(0, len(dataloader.data), 700)]
+    expected = separately(dataloader, lambda model: model.aggregate(chunks))
+    assert_same(fused.aggregate(chunks), expected)
+    # Partials combined in order, as the partitioned executor does
+    state = fused.init_state()
+    for partial in [fused.partial(chunk) for chunk in chunks]:
+        state = fused.combine(state, partial)
+    assert_same(fused.finalize(state), expected)
+
+
+def test_state_round_trip():
+    fused = FusedModel(FrameLoader(), models=MODELS)
+    restored = FusedModel(FrameLoader(), split='eval', models=[dict(conf, split='eval') for conf in MODELS])
+    restored.set_state(fused.get_state())
+    assert restored.split == 'train'
+    assert all(member.split == 'train' for member in restored.members.values())
+
+
+def test_invalid_model_lists():
+    with pytest.raises(ValueError, match='twice'):
+        FusedModel(FrameLoader(), models=MODELS[:1] * 2)
+    with pytest.raises(ValueError, match='split'):
+        FusedModel(FrameLoader(), models=[dict(MODELS[0], split='eval')])
+    with pytest.raises(ValueError):
+        fused_model_conf([])
+
+
+def test_model_list_config():
+    conf = fused_model_conf([dict(MODELS[0], split='eval'), dict(MODELS[1], name='total')])
+    assert conf['class'] == FUSED_MODEL_CLASS
+    assert conf['name'] == 'MeanScoreModel+total'
+    assert conf['split'] == 'eval'
+    assert model_confs({'model': conf})[1]['name'] == 'total'
+    assert model_confs({'model': MODELS[0]}) == [MODELS[0]]
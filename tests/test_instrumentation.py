@@ -0,0 +1,82 @@
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from common.src.workflow.instrumentation import InstrumentationHook, RunInstrumentation, count_rows, measure
+
+
+class Collect(InstrumentationHook):
+    def __init__(self):
+        self.stages = []
+        self.reports = []
+
+    def on_stage(self, metrics):
+        self.stages.append(metrics)
+
+    def on_report(self, report):
+        self.reports.append(report)
+
+
+class Broken(InstrumentationHook):
+    def on_stage(self, metrics):
+        raise RuntimeError('collector down')
+
+
+def test_repeated_stages_are_summed():
+    run = RunInstrumentation()
+    for rows in (3, 4):
+        with run.measure('preprocess', 'Doubler', rows_in=rows) as record:
+            record.rows_out = rows
+    entry = run.stages['preprocess:Doubler']
+    assert (entry['calls'], entry['rows_in'], entry['rows_out']) == (2, 7, 7)
+
+
+def test_discarded_records_are_not_counted():
+    run = RunInstrumentation()
+    with run.measure('load', 'Reader') as record:
+        record.discard = True
+    assert run.stages == {}
+
+
+def test_errors_still_record_the_stage():
+    run = RunInstrumentation()
+    with pytest.raises(KeyError):
+        with run.measure('train', 'Model'):
+            raise KeyError('x')
+    assert run.stages['train:Model']['calls'] == 1
+
+
+def test_nested_stages_keep_the_enclosing_peak():
+    run = RunInstrumentation(trace_memory=True)
+    run.start()
+    try:
+        with run.measure('outer'):
+            big = np.ones(4 * 1024 ** 2 // 8)
+            del big
+            with run.measure('inner'):
+                pass
+    finally:
+        tracemalloc.stop()
+    peaks = {stage['stage']: stage['tracemalloc_peak_mb'] for stage in run.report()['stages']}
+    assert peaks['outer'] >= 4 > peaks['inner']
+
+
+def test_report_and_hooks(tmp_path):
+    hook = Collect()
+    run = RunInstrumentation(hooks=[Broken(), hook])
+    run.start()
+    with run.measure('evaluate', 'PrintEvaluator'):
+        pass
+    report = run.write_report(str(tmp_path), result={'metric': 1})
+    assert json.loads((tmp_path / 'run_report.json').read_text())['result'] == {'metric': 1}
+    assert [stage['name'] for stage in report['stages']] == ['PrintEvaluator']
+    assert len(hook.stages) == 1 and hook.reports == [report]
+
+
+def test_disabled_instrumentation():
+    assert RunInstrumentation.from_config({'instrumentation': {'enabled': False}}) is None
+    with measure(None, 'load', rows_in=5) as record:
+        record.rows_out = 5
+    assert count_rows([1, 2]) == 2 and count_rows(object()) is None
@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.dataloader.dataset_cache import DatasetCache
+from common.src.dataloader.spill import SpilledFrame, estimate_size
+from common.src.workflow.memory_budget import MemoryBudget
+
+
+def frame(rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'score': rng.integers(0, 100, rows), 'ratio': rng.random(rows)})
+
+
+def assert_same(loaded, expected):
+    # Spilled numeric columns load as memmaps, which assert_frame_equal tells apart from ndarrays
+    assert loaded.equals(expected)
+    assert list(loaded.dtypes) == list(expected.dtypes)
+    assert loaded.index.equals(expected.index) and loaded.index.name == expected.index.name
+
+
+@pytest.fixture
+def budget(tmp_path):
+    budget = MemoryBudget(3 * estimate_size(frame()), spill_dir=str(tmp_path / 'spill'))
+    yield budget
+    budget.close()
+
+
+def test_spilled_frame_round_trip(tmp_path):
+    original = pd.DataFrame({
+        'int': np.arange(4),
+        'float': [0.5, np.nan, 1.5, 2.5],
+        'bool': [True, False, True, True],
+        'when': pd.date_range('2024-01-01', periods=4),
+        'name': pd.array(['a', None, 'b', 'a'], dtype='str'),
+        'grade': pd.Categorical(['A', 'B', 'A', 'C']),
+        'count': pd.array([1, None, 3, 4], dtype='Int64'),
+        'mixed': [1, 'x', None, (2,)],
+    }, index=pd.Index(list('wxyz'), name='key'))
+    spilled = SpilledFrame.write(original, str(tmp_path / 'frame'))
+    loaded = spilled.load()
+    assert_same(loaded, original)
+    # Copy-on-write maps: edits stay in memory
+    loaded.loc['w', 'int'] = 100
+    assert spilled.load().loc['w', 'int'] == 0
+    spilled.delete()
+    assert not os.path.exists(spilled.path)
+
+
+def test_least_recently_used_frames_spill_first(budget):
+    spilled = {}
+    for name in 'abc':
+        budget.admit(name, frame(), on_spill=lambda s, name=name: spilled.setdefault(name, s))
+    budget.touch('a')
+    budget.admit('d', frame())
+    assert list(spilled) == ['b']
+    assert_same(spilled['b'].load(), frame())
+    assert budget.stats()['spilled'] == 1
+    assert budget.resident <= budget.limit
+
+
+def test_release_deletes_spill_files(budget):
+    spilled = {}
+    for name in 'abcd':
+        budget.admit(name, frame(), on_spill=lambda s, name=name: spilled.setdefault(name, s))
+    budget.release('a')
+    assert not os.path.exists(spilled['a'].path)
+    assert [e['action'] for e in budget.events] == ['spilled', 'released']
+    assert budget.events[-1]['was_spilled']
+
+
+def test_oversized_frame_goes_straight_to_disk(budget):
+    big = frame(10_000)
+    loaded = budget.admit('big', big)
+    assert_same(loaded, big)
+    assert budget.resident == 0
+    assert budget.peak >= estimate_size(big)
+
+
+def test_non_frames_are_held_but_never_spilled(budget):
+    budget.admit('state', {'rows': np.zeros(100_000)})
+    assert budget.resident > budget.limit
+    assert not budget.events
+
+
+def test_close_removes_the_run_spill_dir(budget):
+    for name in 'abcd':
+        budget.admit(name, frame())
+    assert os.path.isdir(budget.spill_dir)
+    budget.close()
+    assert not os.path.exists(budget.spill_dir)
+    assert budget.resident == 0
+
+
+def test_dataset_cache_serves_spilled_entries(budget):
+    cache = DatasetCache()
+    cache.attach_budget(budget)
+    for key in 'abcd':
+        cache.get_or_load(key, lambda: frame(seed=ord(key)))
+    assert budget.stats()['spilled'] == 1
+    assert_same(cache.get_or_load('a', lambda: None), frame(seed=ord('a')))
+    cache.detach_budget()
+    assert 'a' not in cache
+
+
+class FrameLoader(BaseDataloader):
+    def load_data(self, split):
+        self.data = frame(seed=len(split))
+
+
+class Doubler:
+    def process(self, data):
+        return data.assign(score=data['score'] * 2)
+
+
+def test_dataloader_reads_its_spilled_split_back(budget):
+    cache = DatasetCache()
+    cache.attach_budget(budget)
+    dataloader = FrameLoader(preprocessors=[Doubler()])
+    dataloader.keep_raw = False
+    dataloader.attach_cache(cache, {}, ['Doubler'])
+    expected = Doubler().process(frame(seed=len('train')))
+    dataloader.load('train')
+    # Only the preprocessed split is held without keep_raw
+    assert len(cache) == 1
+    for split in ('a', 'bb', 'ccc'):
+        cache.get_or_load(split, lambda split=split: frame(seed=len(split)))
+    assert dataloader._data is None
+    assert_same(dataloader.data, expected)
+    dataloader.release('train')
+    assert dataloader.data is None
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.workflow.output_sinks import RunOutputs
+from shared.evaluators.print_evaluator import PrintEvaluator
+
+
+@pytest.fixture
+def predictions():
+    return pd.DataFrame({'id': np.arange(25), 'score': np.arange(25) * 1.5})
+
+
+def outputs(tmp_path, *confs):
+    return RunOutputs.from_config({'output': list(confs)}, str(tmp_path))
+
+
+def test_csv_and_jsonl_write_every_batch(tmp_path, predictions):
+    run = outputs(tmp_path, {'format': 'csv', 'params': {'batch_rows': 10}},
+                  {'format': 'jsonl', 'params': {'batch_rows': 7}})
+    run.write_predictions('predictions', predictions)
+    run.write_result('PrintEvaluator', {'dummy_metric': 1.0, 'passed': np.True_})
+    paths = run.close()
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'predictions.csv'), predictions)
+    pd.testing.assert_frame_equal(pd.read_json(tmp_path / 'predictions.jsonl', lines=True), predictions)
+    results = [json.loads(line) for line in (tmp_path / 'results.jsonl').read_text().splitlines()]
+    assert results == [{'name': 'PrintEvaluator', 'result': {'dummy_metric': 1.0, 'passed': True}}]
+    assert pd.read_csv(tmp_path / 'results.csv').to_dict('records') == [
+        {'name': 'PrintEvaluator', 'dummy_metric': 1.0, 'passed': True}]
+    assert len(paths) == 4
+
+
+def test_fused_predictions_get_one_stream_per_model(tmp_path, predictions):
+    run = outputs(tmp_path, {'format': 'csv'})
+    run.write_predictions('predictions', {'mean': predictions.head(1), 'count': predictions['id']})
+    run.close()
+    assert sorted(p.name for p in tmp_path.glob('*.csv')) == ['predictions_count.csv', 'predictions_mean.csv']
+
+
+def test_console_prints_a_head(tmp_path, predictions, capsys):
+    run = outputs(tmp_path, {'format': 'console', 'params': {'rows': 3, 'batch_rows': 2}})
+    run.write_predictions('predictions', predictions)
+    assert run.close() == []
+    out = capsys.readouterr().out
+    assert 'predictions (25 rows, first 3):' in out
+    assert len(out.strip().splitlines()) == 5
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        outputs(tmp_path, {'format': 'xml'})
+
+
+def test_print_evaluator_prints_a_head(predictions, capsys):
+    evaluator = PrintEvaluator(predictions, None)
+    evaluator.params = {'rows': 3}
+    assert evaluator.evaluate() == {'dummy_metric': 1.0}
+    out = capsys.readouterr().out
+    assert 'Predictions (25 rows, first 3):' in out
+    assert len(out.strip().splitlines()) == 5
+
+
+def test_print_evaluator_prints_small_predictions_whole(capsys):
+    PrintEvaluator(pd.DataFrame({'mean_score': [2.0]}), None).evaluate()
+    assert 'mean_score' in capsys.readouterr().out
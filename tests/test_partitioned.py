@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.dataloader import shared_dataset
+from common.src.dataloader.shared_dataset import SharedFrame, SharedFrameRegistry, row_partitions
+from common.src.workflow.partitioned import PartitionedExecutor
+from shared.dataloaders.my_csv_dataloader import MyCsvDataloader
+from shared.models.mean_score_model import MeanScoreModel
+from shared.models.sum_score_model import SumScoreModel
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'score': rng.integers(0, 100, 5000),
+        'ratio': rng.random(5000),
+        'name': rng.choice(['a', 'b', 'ü'], 5000),
+        'count': pd.array([None if i % 7 == 0 else i for i in range(5000)], dtype='Int64'),
+        'mixed': [1, 'x', None, 2.5, ('t',)] * 1000,
+    })
+
+
+def config(path, **execution):
+    return {
+        'dataloader': {'class': 'shared.dataloaders.my_csv_dataloader.MyCsvDataloader',
+                       'params': {'filepath': str(path)}},
+        'preprocessors': [],
+        'model': {'class': 'shared.models.mean_score_model.MeanScoreModel', 'split': 'train', 'params': {}},
+        'execution': execution,
+    }
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / 'scores.csv'
+    pd.DataFrame({'score': np.arange(20_000) % 97, 'name': 'x'}).to_csv(path, index=False)
+    return path
+
+
+def test_shared_frame_round_trip(frame):
+    shared = SharedFrame(frame)
+    try:
+        with shared.handle.attach() as view:
+            pd.testing.assert_series_equal(view['score'], frame['score'])
+            pd.testing.assert_series_equal(view['count'], frame['count'])
+            assert list(view['name'].astype(object)) == list(frame['name'])
+            assert list(view['mixed']) == list(frame['mixed'])
+            assert view['score'].to_numpy().flags.writeable is False
+    finally:
+        shared.release()
+
+
+def test_row_partitions_cover_every_row_once(frame):
+    shared = SharedFrame(frame)
+    try:
+        parts = row_partitions(shared, shared.nbytes // 7)
+        assert len(parts) > 1
+        rows = pd.concat([part.load() for part in parts])
+        pd.testing.assert_series_equal(rows['score'], frame['score'])
+    finally:
+        shared_dataset.detach(shared.token)
+        shared.release()
+
+
+def test_registry_shares_and_detaches_views(frame):
+    registry = SharedFrameRegistry()
+    loads = []
+    first = registry.publish('k', lambda: loads.append(1) or frame)
+    assert registry.publish('k', lambda: loads.append(1) or frame) is first
+    assert len(loads) == 1
+    row_partitions(first, 1 << 20)[0].load()
+    assert first.token in shared_dataset._views
+    registry.release('k')
+    assert first.token in shared_dataset._views
+    registry.release('k')
+    # The last release drops the view this process attached
+    assert first.token not in shared_dataset._views
+    with pytest.raises(RuntimeError):
+        first.acquire()
+
+
+def run_partitioned(path, model_class=MeanScoreModel, **execution):
+    dataloader = MyCsvDataloader(filepath=str(path))
+    model = model_class(dataloader, split='train')
+    executor = PartitionedExecutor.from_config(config(path, **execution))
+    return executor.run(model, executor.partitions(dataloader, 'train'))
+
+
+@pytest.mark.parametrize('execution', [
+    {'partitioned': True, 'partition_size': '16KB'},
+    {'workers': 2, 'partition_size': '16KB'},
+    {'partitioned': True, 'shared_memory': True, 'partition_size': '16KB'},
+    {'workers': 2, 'shared_memory': True, 'partition_size': '16KB'},
+])
+def test_combined_partitions_match_whole_run(csv, execution):
+    expected = (np.arange(20_000) % 97).mean()
+    assert run_partitioned(csv, **execution)['mean_score'][0] == pytest.approx(expected)
+    assert not shared_dataset._views
+
+
+def test_failed_partitions_are_reported(csv, tmp_path):
+    dataloader = MyCsvDataloader(filepath=str(csv))
+    executor = PartitionedExecutor.from_config(config(csv, partitioned=True, partition_size='16KB'))
+    partitions = executor.partitions(dataloader, 'train') + [(str(tmp_path / 'missing.csv'), 0, 10)]
+    with pytest.raises(RuntimeError, match=f"1 of {len(partitions)} partitions failed"):
+        executor.run(MeanScoreModel(dataloader, split='train'), partitions)
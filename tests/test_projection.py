@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from common.src.dataloader.projection import apply_pushdown, optimize_dtypes, required_columns, schema_dtypes
+from shared.dataloaders.my_csv_dataloader import MyCsvDataloader
+from shared.evaluators.print_evaluator import PrintEvaluator
+from shared.models.grade_count_model import GradeCountModel
+from shared.models.mean_score_model import MeanScoreModel
+from shared.preprocessors.double_score_preprocessor import DoubleScorePreprocessor
+from shared.preprocessors.score_to_letter_preprocessor import ScoreToLetterPreprocessor
+
+
+class Opaque:
+    def process(self, data):
+        return data
+
+
+def test_required_columns_walk_the_chain_backwards():
+    chain = [DoubleScorePreprocessor(), ScoreToLetterPreprocessor()]
+    # grade is written by the chain, so only score is read from the source
+    assert required_columns(chain, GradeCountModel(None), PrintEvaluator(None, None)) == {'score'}
+    assert required_columns([], MeanScoreModel(None)) == {'score'}
+
+
+def test_undeclared_components_disable_projection():
+    assert required_columns([Opaque()], MeanScoreModel(None)) is None
+    model = MeanScoreModel(None)
+    model.input_columns = None
+    assert required_columns([], model) is None
+
+
+def test_schema_dtypes(tmp_path):
+    schema = tmp_path / 'Rows.yaml'
+    schema.write_text('Rows:\n  type: dataframe\n  columns:\n    score: int\n    name: str\n'
+                      '    tags: {type: list, items: str}\n    extra: Any\n')
+    assert schema_dtypes(str(schema)) == {'score': 'int64', 'name': 'str'}
+    assert schema_dtypes(str(schema), ['score']) == {'score': 'int64'}
+    assert schema_dtypes(str(tmp_path / 'missing.yaml')) == {}
+
+
+def test_optimize_dtypes():
+    frame = pd.DataFrame({'small': np.arange(10, dtype=np.int64), 'big': np.arange(10, dtype=np.int64) << 40,
+                          'ratio': np.linspace(0, 1, 10), 'flag': [True] * 10,
+                          'grade': ['A', 'B'] * 5, 'name': [f'n{i}' for i in range(10)]})
+    optimized = optimize_dtypes(frame, category_threshold=0.5)
+    assert {col: str(dtype) for col, dtype in optimized.dtypes.items()} == {
+        'small': 'int32', 'big': 'int64', 'ratio': 'float32', 'flag': 'bool', 'grade': 'category', 'name': 'str'}
+    assert frame['small'].dtype == np.int64
+
+
+def test_apply_pushdown_reads_only_needed_columns(tmp_path):
+    path = tmp_path / 'rows.csv'
+    pd.DataFrame({'score': [1, 2], 'name': ['a', 'b'], 'unused': [0.5, 1.5]}).to_csv(path, index=False)
+    dataloader = MyCsvDataloader(filepath=str(path))
+    config = {'dataloader': {}, 'execution': {'optimize_dtypes': True}}
+    apply_pushdown(config, dataloader, [DoubleScorePreprocessor()], MeanScoreModel(dataloader))
+    dataloader.load_data('train')
+    assert list(dataloader.data.columns) == ['score']
+    assert dataloader.data['score'].dtype == np.int32
@@ -0,0 +1,81 @@
+import sys
+import textwrap
+
+import pytest
+
+from common.src.workflow import registry as registry_module
+from common.src.workflow.registry import ComponentRegistry
+
+
+@pytest.fixture
+def components(tmp_path, monkeypatch):
+    package = 'regtest_components'
+
+    def write(rel, source):
+        path = tmp_path / package / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+        return path
+
+    write('__init__.py', 'from .models.mean import Mean\n')
+    write('models/__init__.py', '')
+    write('models/mean.py', 'class Mean:\n    pass\n')
+    write('models/heavy.py', 'import no_such_dependency\n\nclass Heavy:\n    pass\n')
+    write('loaders/__init__.py', '')
+    write('loaders/csv.py', 'class CsvLoader:\n    pass\n\nclass Mean:\n    pass\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package, write
+    for name in [name for name in sys.modules if name.startswith(package)]:
+        del sys.modules[name]
+
+
+def make(tmp_path, package):
+    return ComponentRegistry(root=str(tmp_path), package=package, index_path=str(tmp_path / 'index.json'))
+
+
+def test_resolves_only_the_defining_module(tmp_path, components):
+    package, _ = components
+    registry = make(tmp_path, package)
+    assert registry.resolve('CsvLoader').__name__ == 'CsvLoader'
+    assert registry.resolve(f'{package}.loaders.CsvLoader') is registry.resolve('CsvLoader')
+    assert f'{package}.models.heavy' not in sys.modules
+
+
+def test_ambiguous_names_need_a_module(tmp_path, components):
+    package, _ = components
+    registry = make(tmp_path, package)
+    with pytest.raises(ValueError, match='ambiguous'):
+        registry.resolve('Mean')
+    assert registry.resolve(f'{package}.models.Mean').__module__ == f'{package}.models.mean'
+
+
+def test_check_reports_without_importing(tmp_path, components):
+    package, _ = components
+    registry = make(tmp_path, package)
+    assert registry.check('Heavy') is None
+    assert 'no class' in registry.check(f'{package}.models.mean.Heavy')
+    assert 'No component class' in registry.check('Missing')
+    assert registry.check('collections.OrderedDict') is None
+    assert 'No module' in registry.check('not_a_module.Thing')
+    assert f'{package}.models.heavy' not in sys.modules
+
+
+def test_index_reparses_only_changed_files(tmp_path, components, monkeypatch):
+    package, write = components
+    make(tmp_path, package).refresh()
+    parsed = []
+    module_classes = registry_module._module_classes
+    monkeypatch.setattr(registry_module, '_module_classes', lambda path: parsed.append(path) or module_classes(path))
+    registry = make(tmp_path, package)
+    registry.refresh()
+    assert parsed == []
+    write('models/median.py', 'class Median:\n    pass\n')
+    registry.refresh()
+    assert [path.rpartition('/')[2] for path in parsed] == ['median.py']
+    assert registry.modules_for('Median') == [f'{package}.models.median']
+
+
+def test_unreadable_index_is_rebuilt(tmp_path, components):
+    package, _ = components
+    (tmp_path / 'index.json').write_text('{not json')
+    assert make(tmp_path, package).modules_for('CsvLoader') == [f'{package}.loaders.csv']
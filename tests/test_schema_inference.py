@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.schema_utils.schema_inference import SchemaInferrer, infer_schema
+
+
+def chunks(frame, size):
+    return [frame.iloc[i:i + size] for i in range(0, len(frame), size)]
+
+
+def test_scalar_types():
+    frame = pd.DataFrame({'i': [1, 2], 'f': [0.5, 1.5], 'b': [True, False], 's': ['a', 'b'],
+                          'c': pd.Categorical(['x', 'y']), 'o': pd.Series([1, 'a'], dtype=object)})
+    columns, report = infer_schema([frame])
+    assert columns == {'i': 'int', 'f': 'float', 'b': 'bool', 's': 'str', 'c': 'str', 'o': 'Any'}
+    assert report['o']['mixed'] and not report['i']['mixed']
+
+
+def test_types_widen_across_chunks():
+    # The second chunk's nulls turn the int column float
+    frame = pd.DataFrame({'score': [1.0, 2.0, np.nan, 4.0]})
+    columns, report = infer_schema([frame.iloc[:2].astype(int), frame.iloc[2:]], mode='full')
+    assert columns == {'score': 'float'}
+    assert report['score']['nullable'] and report['score']['nulls'] == 1
+
+
+def test_container_element_types():
+    frame = pd.DataFrame({'tags': [['a'], [], None], 'attrs': [{'k': 1}, {'k': 2.5}, {}]})
+    columns, _ = infer_schema([frame])
+    assert columns == {'tags': {'type': 'list', 'items': 'str'}, 'attrs': {'type': 'dict', 'values': 'float'}}
+
+
+def test_head_mode_stops_reading():
+    frame = pd.DataFrame({'v': pd.Series(['a'] * 10 + [1] * 10, dtype=object)})
+    read = []
+
+    def stream():
+        for chunk in chunks(frame, 5):
+            read.append(len(chunk))
+            yield chunk
+
+    columns, report = infer_schema(stream(), mode='head', rows=8)
+    assert columns == {'v': 'str'}
+    assert read == [5, 5]
+    assert report['v']['rows'] == 8
+
+
+def test_reservoir_mode_counts_every_row_but_samples_values():
+    n = 50_000
+    values = pd.Series(np.where(np.arange(n) == n - 1, 'late', 'x'), dtype=object)
+    frame = pd.DataFrame({'v': values, 'n': np.arange(n)})
+    columns, report = infer_schema(chunks(frame, 7_000), mode='reservoir', rows=1_000)
+    assert columns == {'v': 'str', 'n': 'int'}
+    assert report['v']['rows'] == n
+
+
+def test_full_mode_sees_late_values():
+    values = pd.Series(['a'] * 999 + [1], dtype=object)
+    assert infer_schema(chunks(pd.DataFrame({'v': values}), 100), mode='full')[0] == {'v': 'Any'}
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        SchemaInferrer(mode='sample')
@@ -0,0 +1,39 @@
+import json
+
+from common.src.workflow.server import PipelineServer, _read_jsonl
+
+
+def write_lines(path, lines, end='\n'):
+    path.write_text('\n'.join(lines) + end)
+    return str(path)
+
+
+def test_line_numbers_are_physical(tmp_path):
+    path = write_lines(tmp_path / 'requests.jsonl', ['{"a": 1}', '', 'not json', '{"a": 2}'])
+    assert list(_read_jsonl(path, follow=False, poll_interval=0)) == [(1, {'a': 1}), (4, {'a': 2})]
+
+
+def test_invalid_last_line_without_newline_is_skipped(tmp_path):
+    path = write_lines(tmp_path / 'requests.jsonl', ['{"a": 1}', '{"a": '], end='')
+    assert list(_read_jsonl(path, follow=False, poll_interval=0)) == [(1, {'a': 1})]
+    path = write_lines(tmp_path / 'requests.jsonl', ['{"a": 1}', '{"a": 2}'], end='')
+    assert list(_read_jsonl(path, follow=False, poll_interval=0)) == [(1, {'a': 1}), (2, {'a': 2})]
+
+
+def test_serve_file_ids_survive_edits_to_earlier_lines(tmp_path):
+    server = PipelineServer(max_concurrent=1)
+    server.run_request = lambda request, queued_at=None: {'id': request['id'], 'event': 'done'}
+    requests = tmp_path / 'requests.jsonl'
+    output = tmp_path / 'requests.results.jsonl'
+    write_lines(requests, ['{"config": "a.yml"}', 'broken', '{"config": "b.yml"}'])
+    server.serve_file(str(requests), follow=False)
+    events = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {e['id'] for e in events if e['event'] == 'done'} == {'line-1', 'line-3'}
+
+    # Fixing the broken line runs only that request on restart
+    write_lines(requests, ['{"config": "a.yml"}', '{"config": "fixed.yml"}', '{"config": "b.yml"}'])
+    server = PipelineServer(max_concurrent=1)
+    server.run_request = lambda request, queued_at=None: {'id': request['id'], 'event': 'done'}
+    server.serve_file(str(requests), follow=False)
+    events = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [e['id'] for e in events if e['event'] == 'done'] == ['line-1', 'line-3', 'line-2']
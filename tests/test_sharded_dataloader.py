@@ -0,0 +1,69 @@
+import json
+
+import pandas as pd
+import pytest
+
+from shared.dataloaders.sharded_csv_dataloader import ShardedCsvDataloader
+
+
+@pytest.fixture
+def shards(tmp_path):
+    paths = []
+    for i, compression in enumerate(['', '.gz', '.bz2']):
+        path = tmp_path / 'train' / f"part{i}.csv{compression}"
+        path.parent.mkdir(exist_ok=True)
+        pd.DataFrame({'score': range(i * 5, i * 5 + 5), 'name': 'x'}).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def loader(**params):
+    dataloader = ShardedCsvDataloader(**params)
+    dataloader.setup()
+    return dataloader
+
+
+def load(dataloader, split='train'):
+    dataloader.load_data(split)
+    return dataloader.data
+
+
+def test_globs_read_every_shard_in_order(tmp_path, shards):
+    data = load(loader(files=str(tmp_path / '{split}' / 'part*'), io_workers=2))
+    assert data['score'].tolist() == list(range(15))
+    assert list(data.index) == list(range(15))
+
+
+def test_unordered_reads_keep_every_row(tmp_path, shards):
+    data = load(loader(files=str(tmp_path / 'train' / 'part*'), ordered=False, io_workers=3))
+    assert sorted(data['score']) == list(range(15))
+
+
+def test_manifest_paths_are_relative_to_it(tmp_path, shards):
+    manifest = tmp_path / 'train.manifest'
+    manifest.write_text('# shards\n' + 'train/part2.csv.bz2\n' + json.dumps({'path': str(shards[0])}) + '\n')
+    assert load(loader(manifest=str(manifest)))['score'].tolist() == list(range(10, 15)) + list(range(5))
+
+
+def test_shards_are_partitions_and_chunks(tmp_path, shards):
+    dataloader = loader(files=str(tmp_path / 'train' / 'part*'))
+    partitions = dataloader.partitions('train', 1)
+    assert len(partitions) == 3
+    assert dataloader.load_partition(partitions[1])['score'].tolist() == list(range(5, 10))
+    assert [len(chunk) for chunk in dataloader.read_chunks('train', 3)] == [3, 2] * 3
+
+
+def test_projection_and_mismatched_dtypes(tmp_path, shards):
+    dataloader = loader(files=str(tmp_path / 'train' / 'part*'))
+    dataloader.set_projection(columns=['score'], dtypes={'score': 'float64'})
+    data = load(dataloader)
+    assert list(data.columns) == ['score'] and data['score'].dtype == 'float64'
+    dataloader.set_projection(dtypes={'name': 'int64'})
+    assert load(dataloader)['name'].eq('x').all()
+
+
+def test_missing_shards(tmp_path):
+    with pytest.raises(ValueError):
+        ShardedCsvDataloader()
+    with pytest.raises(FileNotFoundError):
+        load(loader(files=str(tmp_path / 'none' / '*.csv')))
@@ -0,0 +1,161 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.model.sketches import HyperLogLog, KLLSketch, SpaceSaving
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def chunked(make, values, chunksize):
+    """Fold ``values`` chunk by chunk into one sketch, as streaming runs do."""
+    sketch = make()
+    for start in range(0, len(values), chunksize):
+        sketch = sketch.merge(make().update(values[start:start + chunksize]))
+    return sketch
+
+
+def rank_error(sorted_values, estimates, qs):
+    n = len(sorted_values)
+    errors = []
+    for q, estimate in zip(qs, estimates):
+        low = np.searchsorted(sorted_values, estimate, side='left') / n
+        high = np.searchsorted(sorted_values, estimate, side='right') / n
+        errors.append(0.0 if low <= q <= high else min(abs(q - low), abs(q - high)))
+    return max(errors)
+
+
+def round_trip(sketch):
+    # States travel as JSON (worker results, the stage cache), so they must survive it
+    state = json.loads(json.dumps(sketch.to_dict()))
+    return type(sketch).from_dict(state)
+
+
+@pytest.fixture(scope='module')
+def scores():
+    return pd.Series(np.random.default_rng(0).normal(50, 15, 200_000))
+
+
+@pytest.fixture(scope='module')
+def names():
+    # Zipf-distributed names: a few heavy hitters and a long tail
+    ranks = np.random.default_rng(1).zipf(1.3, 200_000) % 50_000
+    return pd.Series([f"name_{r}" for r in ranks])
+
+
+class TestKLLSketch:
+    @pytest.mark.parametrize('error', [0.05, 0.01])
+    def test_rank_error_within_bound(self, scores, error):
+        sketch = KLLSketch(error).update(scores)
+        assert rank_error(np.sort(scores.to_numpy()), sketch.quantiles(QS), QS) <= error
+
+    def test_merged_chunks_within_bound(self, scores):
+        sketch = chunked(lambda: KLLSketch(0.01), scores, 10_000)
+        assert sketch.n == len(scores)
+        assert rank_error(np.sort(scores.to_numpy()), sketch.quantiles(QS), QS) <= 0.01
+
+    def test_extremes_are_exact(self, scores):
+        sketch = chunked(lambda: KLLSketch(0.01), scores, 30_000)
+        assert sketch.quantiles([0, 1]) == [scores.min(), scores.max()]
+
+    def test_size_stays_bounded(self, scores):
+        sketch = KLLSketch(0.01).update(scores)
+        assert sketch._size() <= 3 * sketch.k
+
+    def test_ignores_nulls(self):
+        sketch = KLLSketch().update(pd.Series([1.0, np.nan, 3.0, None]))
+        assert sketch.n == 2
+        assert KLLSketch().quantiles([0.5]) == [None]
+
+    def test_round_trip(self, scores):
+        sketch = chunked(lambda: KLLSketch(0.01), scores, 50_000)
+        restored = round_trip(sketch)
+        assert (restored.n, restored.min, restored.max) == (sketch.n, sketch.min, sketch.max)
+        assert restored.quantiles(QS) == sketch.quantiles(QS)
+        # A restored sketch keeps merging like the original
+        more = KLLSketch(0.01).update(scores[:1000])
+        assert restored.merge(more).n == sketch.merge(more).n
+
+
+class TestHyperLogLog:
+    @pytest.mark.parametrize('distinct', [1_000, 100_000])
+    def test_relative_error_within_bound(self, distinct):
+        values = pd.Series(np.arange(distinct)).sample(frac=1, random_state=0)
+        sketch = HyperLogLog(0.01).update(values)
+        # 3 standard errors
+        assert abs(sketch.count() - distinct) / distinct <= 0.03
+
+    def test_small_counts_are_nearly_exact(self):
+        assert round(HyperLogLog(0.01).update(pd.Series(['a', 'b', 'a', 'c'])).count()) == 3
+        assert HyperLogLog().count() == 0
+
+    def test_merge_equals_union(self, names):
+        whole = HyperLogLog(0.01).update(names)
+        merged = chunked(lambda: HyperLogLog(0.01), names, 25_000)
+        np.testing.assert_array_equal(merged.registers, whole.registers)
+        assert abs(merged.count() - names.nunique()) / names.nunique() <= 0.03
+
+    def test_equal_numbers_hash_alike_across_dtypes(self):
+        ints = HyperLogLog().update(pd.Series([1, 2, 3]))
+        floats = HyperLogLog().update(pd.Series([1.0, 2.0, np.nan]))
+        assert round(ints.merge(floats).count()) == 3
+        narrow = HyperLogLog().update(pd.Series([1, 2, 3], dtype=np.int32))
+        nullable = HyperLogLog().update(pd.Series([1, None, 3], dtype='Int64'))
+        np.testing.assert_array_equal(narrow.merge(nullable).registers, ints.registers)
+        assert round(HyperLogLog().update(pd.Series([1, 1.0, 1.5], dtype=object)).count()) == 2
+
+    def test_precision_mismatch_is_rejected(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(0.01).merge(HyperLogLog(0.1))
+
+    def test_round_trip(self, names):
+        sketch = HyperLogLog(0.01).update(names)
+        restored = round_trip(sketch)
+        np.testing.assert_array_equal(restored.registers, sketch.registers)
+        assert restored.count() == sketch.count()
+        more = HyperLogLog(0.01).update(pd.Series(['new']))
+        np.testing.assert_array_equal(restored.merge(more).registers, sketch.merge(more).registers)
+
+
+class TestSpaceSaving:
+    def check_bounds(self, sketch, values, error, k=20):
+        exact = values.value_counts()
+        top = sketch.top(k)
+        true = exact.reindex(top['value']).fillna(0).to_numpy()
+        # Never below the true count, and over it by at most max_error <= error * n
+        assert (top['count'].to_numpy() >= true).all()
+        assert (top['count'].to_numpy() - true <= top['max_error'].to_numpy()).all()
+        assert (top['max_error'] <= error * len(values)).all()
+        # Every value more frequent than error * n is among the counters
+        frequent = exact[exact > error * len(values)].index
+        assert set(frequent) <= set(sketch.counts.index)
+
+    @pytest.mark.parametrize('error', [0.01, 0.001])
+    def test_bounds(self, names, error):
+        self.check_bounds(SpaceSaving(error).update(names), names, error)
+
+    def test_merged_chunks_keep_bounds(self, names):
+        sketch = chunked(lambda: SpaceSaving(0.001), names, 20_000)
+        assert sketch.n == len(names)
+        assert len(sketch.counts) <= sketch.capacity
+        self.check_bounds(sketch, names, 0.001)
+
+    def test_top_order(self, names):
+        top = SpaceSaving(0.001).update(names).top(10)
+        assert list(top['value']) == list(names.value_counts().index[:10])
+        assert top['count'].is_monotonic_decreasing
+
+    def test_categorical_counts_only_present_values(self):
+        column = pd.Series(['a', 'a', 'b'], dtype=pd.CategoricalDtype(['a', 'b', 'c']))
+        top = SpaceSaving(0.1).update(column).top(5)
+        assert dict(zip(top['value'], top['count'])) == {'a': 2, 'b': 1}
+
+    def test_round_trip(self, names):
+        sketch = chunked(lambda: SpaceSaving(0.001), names, 50_000)
+        restored = round_trip(sketch)
+        assert restored.n == sketch.n
+        pd.testing.assert_frame_equal(restored.top(20), sketch.top(20))
+        more = SpaceSaving(0.001).update(names[:1000])
+        pd.testing.assert_frame_equal(restored.merge(more).top(20), sketch.merge(more).top(20))
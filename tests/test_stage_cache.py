@@ -0,0 +1,153 @@
+import os
+import threading
+
+import pytest
+
+from common.src.workflow.stage_cache import PipelineStageKeys, StageCache
+
+
+class Loader:
+    def __init__(self, source='a'):
+        self.source = source
+
+    def fingerprint(self, split, content_hash=False):
+        return {'source': self.source, 'split': split}
+
+    def projection_key(self):
+        return {'columns': None}
+
+
+class Doubler:
+    pass
+
+
+class Model:
+    pass
+
+
+def stage_keys(tmp_path, loader=None, model_params=None, schema=None):
+    config = {'dataloader': {'params': {}, 'output_schema': schema},
+              'preprocessors': [{'params': {}}], 'model': {'params': model_params or {}}}
+    return PipelineStageKeys(config, loader or Loader(), [Doubler()], Model())
+
+
+def test_put_then_get(tmp_path):
+    cache = StageCache(str(tmp_path))
+    assert cache.get('k', 0) == (False, None)
+    cache.put('k', {'rows': [1, 2]})
+    assert cache.get('k', 0) == (True, {'rows': [1, 2]})
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'writes': 1}
+
+
+def test_refresh_from_skips_later_stages(tmp_path):
+    StageCache(str(tmp_path)).put('early', 1)
+    StageCache(str(tmp_path)).put('late', 2)
+    cache = StageCache(str(tmp_path), refresh_from=1)
+    assert cache.get('early', 0) == (True, 1)
+    assert cache.get('late', 1) == (False, None)
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    (tmp_path / 'bad.pkl').write_bytes(b'not a pickle')
+    assert StageCache(str(tmp_path)).get('bad', 0) == (False, None)
+
+
+def test_evict_keeps_most_recently_used(tmp_path):
+    cache = StageCache(str(tmp_path), max_size=10 ** 9)
+    for i, key in enumerate(['old', 'used', 'new']):
+        cache.put(key, b'x' * 1000)
+        os.utime(cache._path(key), ns=(i * 10 ** 9, i * 10 ** 9))
+    cache.get('used', 0)
+    cache.max_size = 2500
+    cache.evict()
+    assert sorted(p.stem for p in tmp_path.glob('*.pkl')) == ['new', 'used']
+
+
+def test_evict_tolerates_entries_removed_meanwhile(tmp_path, monkeypatch):
+    cache = StageCache(str(tmp_path), max_size=0)
+    for key in 'abc':
+        cache.put(key, b'x' * 100)
+    for key in 'abc':
+        (tmp_path / f"{key}.pkl").write_bytes(b'x' * 100)
+    remove = os.remove
+
+    def racing_remove(path):
+        # Another process evicted it first
+        remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'remove', racing_remove)
+    cache.evict()
+    assert not list(tmp_path.glob('*.pkl'))
+
+
+def test_concurrent_puts_and_evictions(tmp_path):
+    errors = []
+
+    def worker(n):
+        cache = StageCache(str(tmp_path), max_size=2000)
+        try:
+            for i in range(50):
+                cache.put(f"{n}_{i}", b'x' * 500)
+                cache.get(f"{n}_{i - 1}", 0)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+def test_keys_chain_through_stages(tmp_path):
+    keys = stage_keys(tmp_path)
+    data_keys = keys.data_keys('train')
+    assert len(data_keys) == 2 and len(set(data_keys)) == 2
+    assert keys.predictions_key('train') != keys.model_key('train')
+    assert stage_keys(tmp_path).data_keys('train') == data_keys
+    assert keys.data_keys('eval') != data_keys
+
+
+def test_upstream_changes_invalidate_downstream(tmp_path):
+    keys = stage_keys(tmp_path)
+    changed_source = stage_keys(tmp_path, loader=Loader('b'))
+    assert set(changed_source.data_keys('train')).isdisjoint(keys.data_keys('train'))
+    assert changed_source.model_key('train') != keys.model_key('train')
+    changed_model = stage_keys(tmp_path, model_params={'alpha': 1})
+    assert changed_model.data_keys('train') == keys.data_keys('train')
+    assert changed_model.model_key('train') != keys.model_key('train')
+
+
+def test_schema_edits_change_keys(tmp_path):
+    schema = tmp_path / 'Loader.yaml'
+    schema.write_text('Loader:\n  columns:\n    a: int\n')
+    before = stage_keys(tmp_path, schema=str(schema)).data_keys('train')
+    schema.write_text('Loader:\n  columns:\n    a: str\n')
+    after = stage_keys(tmp_path, schema=str(schema)).data_keys('train')
+    assert before[0] != after[0]
+
+
+def test_predictions_key_of_a_model_trained_elsewhere(tmp_path):
+    keys = stage_keys(tmp_path)
+    own = keys.predictions_key('eval')
+    trained = keys.predictions_key('eval', model_key=stage_keys(tmp_path).model_key('train'))
+    retrained = keys.predictions_key('eval', model_key=stage_keys(tmp_path, Loader('b')).model_key('train'))
+    assert len({own, trained, retrained}) == 3
+
+
+def test_unfingerprintable_source_disables_keys(tmp_path):
+    loader = Loader()
+    loader.fingerprint = lambda split, content_hash=False: None
+    keys = stage_keys(tmp_path, loader=loader)
+    assert keys.data_keys('train') is None
+    assert keys.predictions_key('train') is None
+
+
+def test_stage_ordinals(tmp_path):
+    keys = stage_keys(tmp_path)
+    assert [keys.stage_ordinal(name) for name in ('dataloader', 'preprocessor:0', 'Doubler', 'model',
+                                                  'predictions')] == [0, 1, 1, 2, 3]
+    with pytest.raises(ValueError):
+        keys.stage_ordinal('unknown')
@@ -0,0 +1,74 @@
+import threading
+
+import pandas as pd
+import pytest
+import yaml
+
+from common.src.workflow.orchestrator import Orchestrator
+from common.src.workflow.stage_dag import StageScheduler, StageTask
+
+
+def test_tasks_get_their_dependencies_results():
+    calls = []
+
+    def task(name, value):
+        def fn(*deps):
+            calls.append(name)
+            return value + sum(deps)
+        return fn
+
+    scheduler = StageScheduler([StageTask('load', task('load', 1)),
+                                StageTask('train', task('train', 10), ['load']),
+                                StageTask('eval', task('eval', 100), ['load', 'train'])])
+    assert scheduler.run() == {'load': 1, 'train': 11, 'eval': 112}
+    # The shared load ran once
+    assert calls == ['load', 'train', 'eval']
+    assert scheduler.critical_path() == ['load', 'train', 'eval']
+
+
+def test_independent_tasks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    scheduler = StageScheduler([StageTask('a', barrier.wait), StageTask('b', barrier.wait)], workers=2)
+    scheduler.run()
+    assert scheduler.timeline['a'][2] != scheduler.timeline['b'][2]
+
+
+def test_invalid_graphs():
+    with pytest.raises(ValueError, match='unknown'):
+        StageScheduler([StageTask('a', lambda x: x, ['missing'])])
+    with pytest.raises(ValueError, match='cycle'):
+        StageScheduler([StageTask('a', lambda x: x, ['b']), StageTask('b', lambda x: x, ['a'])]).run()
+
+
+def test_failures_name_the_task():
+    def fail():
+        raise KeyError('boom')
+
+    with pytest.raises(RuntimeError, match='Stage task broken failed'):
+        StageScheduler([StageTask('broken', fail)]).run()
+
+
+def test_stage_section_end_to_end(tmp_path):
+    data = tmp_path / 'scores.csv'
+    pd.DataFrame({'score': [50, 95, 100]}).to_csv(data, index=False)
+    config = {
+        'dataloader': {'class': 'shared.dataloaders.my_csv_dataloader.MyCsvDataloader',
+                       'params': {'filepath': str(data)}},
+        'preprocessors': [{'class': 'shared.preprocessors.double_score_preprocessor.DoubleScorePreprocessor'}],
+        'model': {'name': 'MeanScoreModel', 'class': 'shared.models.mean_score_model.MeanScoreModel'},
+        'models': [{'class': 'shared.models.sum_score_model.SumScoreModel'}],
+        'evaluator': {'class': 'shared.evaluators.print_evaluator.PrintEvaluator'},
+        'evaluators': [{'class': 'shared.evaluators.score_threshold_evaluator.ScoreThresholdEvaluator'}],
+        'stage': {
+            'train': {'model': 'MeanScoreModel', 'dataloader_args': {'split': 'train'}},
+            'eval': {'model': 'MeanScoreModel', 'dataloader_args': {'split': 'eval'},
+                     'evaluator': [{'name': 'PrintEvaluator'}, {'name': 'ScoreThresholdEvaluator'}]},
+            'eval_raw': {'model': 'SumScoreModel', 'preprocessors': [], 'dataloader_args': {'split': 'eval'}},
+        },
+    }
+    path = tmp_path / 'config.yml'
+    path.write_text(yaml.safe_dump(config))
+    results = Orchestrator(str(path), use_cache=False, output_dir=str(tmp_path / 'out')).run()
+    assert set(results) == {'train', 'eval', 'eval_raw'}
+    assert set(results['eval']) == {'PrintEvaluator', 'ScoreThresholdEvaluator'}
+    assert (tmp_path / 'out' / 'run_report.json').exists()
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from common.src.dataloader.base_dataloader import BaseDataloader
+from common.src.schema_utils.yaml_validator import SchemaValidationError
+from common.src.workflow.instrumentation import RunInstrumentation
+from common.src.workflow.stage_validation import StageSchemaValidator
+
+
+class FrameLoader(BaseDataloader):
+    def load_data(self, split):
+        self.data = pd.DataFrame({'score': [1, 2, 3], 'name': ['a', 'b', 'c']})
+
+
+class Doubler:
+    output_columns = ['doubled']
+
+    def process(self, data):
+        return data.assign(doubled=data['score'] * 2)
+
+
+@pytest.fixture
+def schema(tmp_path):
+    def write(name, columns):
+        path = tmp_path / f"{name}.yaml"
+        path.write_text(f"{name}:\n  type: dataframe\n  columns:\n"
+                        + ''.join(f"    {column}: {kind}\n" for column, kind in columns.items()))
+        return str(path)
+    return write
+
+
+def run(loader_schema=None, doubler_schema=None):
+    config = {'dataloader': {'output_schema': loader_schema},
+              'preprocessors': [{'output_schema': doubler_schema}]}
+    dataloader = FrameLoader(preprocessors=[Doubler()])
+    dataloader.instrumentation = RunInstrumentation()
+    dataloader.add_stage_listener(StageSchemaValidator(config, verbose=False, dataloader=dataloader))
+    dataloader.load('train')
+    return dataloader.instrumentation.stages
+
+
+def test_only_stages_with_schemas_are_timed_as_validation(schema):
+    stages = run(doubler_schema=schema('Doubled', {'doubled': 'int'}))
+    assert [key for key in stages if key.startswith('validation')] == ['validation:preprocessor:0']
+    assert not [key for key in run() if key.startswith('validation')]
+
+
+def test_invalid_stage_output_raises(schema):
+    with pytest.raises(SchemaValidationError):
+        run(loader_schema=schema('Loaded', {'name': 'int'}))
+
+
+def test_plain_listeners_still_run_unmeasured():
+    calls = []
+    dataloader = FrameLoader(preprocessors=[Doubler()])
+    dataloader.instrumentation = RunInstrumentation()
+    dataloader.add_stage_listener(lambda stage, index, data: calls.append((stage, index)))
+    dataloader.load('train')
+    assert calls == [('dataloader', None), ('preprocessor', 0)]
+    assert not [key for key in dataloader.instrumentation.stages if key.startswith('validation')]
+
+
+def test_expected_columns_follow_the_projection():
+    dataloader = FrameLoader(preprocessors=[Doubler()])
+    validator = StageSchemaValidator({'dataloader': {}, 'preprocessors': [{}]}, dataloader=dataloader)
+    assert validator.expected_columns('dataloader', None) is None
+    dataloader.set_projection(columns=['score'])
+    assert validator.expected_columns('dataloader', None) == ['score']
+    assert validator.expected_columns('preprocessor', 0) == ['score', 'doubled']
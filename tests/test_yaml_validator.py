@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.src.dataloader.projection import schema_dtypes
+from common.src.schema_utils.yaml_validator import CompiledSchema, SchemaValidationError, load_schema
+from shared.dataloaders.my_csv_dataloader import MyCsvDataloader
+
+SCHEMA = CompiledSchema('Rows', {'name': 'str', 'score': 'int'})
+
+
+def kinds(frame):
+    return sorted((v.column, v.kind) for v in SCHEMA.validate(frame))
+
+
+def test_valid_frame():
+    assert kinds(pd.DataFrame({'name': ['a', None], 'score': [1, 2]})) == []
+
+
+def test_all_null_object_column_is_a_string_column():
+    assert kinds(pd.DataFrame({'name': pd.Series([None, None], dtype=object), 'score': [1, 2]})) == []
+
+
+def test_all_null_float_column_is_not_a_string_column():
+    assert kinds(pd.DataFrame({'name': [np.nan, np.nan], 'score': [1, 2]})) == [('name', 'dtype')]
+
+
+def test_category_of_strings_is_a_string_column():
+    assert kinds(pd.DataFrame({'name': pd.Categorical(['a', 'b']), 'score': [1, 2]})) == []
+
+
+def test_whole_float_values_pass_as_int_and_report_bad_rows():
+    assert kinds(pd.DataFrame({'name': ['a', 'b'], 'score': [1.0, 2.0]})) == [('score', 'dtype')]
+    violations = SCHEMA.validate(pd.DataFrame({'name': ['a', 'b', 'c'], 'score': [1.0, 2.5, np.nan]}))
+    assert violations[0].rows == [1, 2]
+
+
+def test_missing_columns_respect_the_projection():
+    frame = pd.DataFrame({'score': [1]})
+    assert kinds(frame) == [('name', 'missing')]
+    assert SCHEMA.validate(frame, columns=['score']) == []
+    with pytest.raises(SchemaValidationError):
+        SCHEMA.check(frame)
+
+
+def test_streamed_chunks_with_only_nulls_pass(tmp_path):
+    schema = tmp_path / 'Rows.yaml'
+    schema.write_text('Rows:\n  type: dataframe\n  columns:\n    name: str\n    score: int\n')
+    path = tmp_path / 'rows.csv'
+    path.write_text('name,score\n,1\n,2\nc,3\nd,4\n')
+    dataloader = MyCsvDataloader(filepath=str(path))
+    dataloader.set_projection(dtypes=schema_dtypes(str(schema)))
+    for chunk in dataloader.read_chunks('train', 2):
+        load_schema(str(schema)).check(chunk)